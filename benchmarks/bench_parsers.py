@@ -0,0 +1,237 @@
+"""
+Benchmark du parsing sur des pages enregistrées.
+
+Les fixtures sont un dossier d'enregistrement (voir common/recorder.py). Celles de
+benchmarks/fixtures sont générées depuis le faux job board par :
+  python benchmarks/record_fixtures.py
+ou enregistrées sur les vrais sites par :
+  RECORD_MODE=record RECORDINGS_DIR=benchmarks/fixtures python srcs/main.py
+
+Usage:
+  python benchmarks/bench_parsers.py                    # compare aux baselines
+  python benchmarks/bench_parsers.py --save-baseline    # enregistre les mesures comme baselines
+  python benchmarks/bench_parsers.py --site welcome_to_the_jungle --repeat 5 --threshold 0.3
+
+Mesures :
+  - listing : parsing de la page, recherche des cartes et extraction de chaque
+    carte (_parse_job_card), en pages/s et cartes/s, avec le détail par _extract_*
+  - fiches : analyze_job_page, extract_technologies_from_text et extract_remote_days
+    sur le corpus de fiches de poste, en pages/s
+
+Le script sort en erreur si une mesure est plus lente que sa baseline de plus
+de --threshold (20 % par défaut), si aucun parser n'a pu être mesuré (fixtures
+absentes) ou si une mesure n'a pas de baseline. Les baselines (benchmarks/baselines.json)
+dépendent de la machine et des fixtures : les régénérer quand l'une des deux change.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+os.environ['RECORD_MODE'] = 'replay'
+os.environ.setdefault('RECORDINGS_DIR', os.path.join(BENCH_DIR, 'fixtures'))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'srcs'))
+
+from bs4 import BeautifulSoup
+
+from common.job_analyzer import analyze_job_page, extract_remote_days, extract_technologies_from_text
+from common.recorder import JOB_PAGES_SITE, page_recorder, site_slug
+from websites.apec import APEC
+from websites.cadremploi import Cadremploi
+from websites.indeed import Indeed
+from websites.jobteaser import JobTeaser
+from websites.lesjeudis import LesJeudis
+from websites.linkedin import LinkedIn
+from websites.stationf import StationF
+from websites.wttj import WTTJ
+
+SITES = [WTTJ, JobTeaser, StationF, APEC, LesJeudis, Cadremploi, LinkedIn, Indeed]
+BASELINES_PATH = os.path.join(BENCH_DIR, 'baselines.json')
+DEFAULT_THRESHOLD = 0.2
+
+
+def _load_pages(site):
+    """Latest recording of each URL of `site`."""
+    urls = dict.fromkeys(entry['url'] for entry in page_recorder.entries(site))
+    return [page_recorder.load(site, url) for url in urls]
+
+
+def _time_extractors(website, timings):
+    """Wrap the _extract_* methods of `website` to add their time to `timings`."""
+    for name in dir(website):
+        if not name.startswith('_extract_'):
+            continue
+        method = getattr(website, name)
+
+        def timed(*args, _name=name, _method=method, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                timings[_name] = timings.get(_name, 0) + time.perf_counter() - start
+
+        setattr(website, name, timed)
+
+
+def bench_listing(site_class, repeat):
+    pages = _load_pages(site_class().name)
+    if not pages:
+        return None
+
+    best = None
+    for _ in range(repeat):
+        website = site_class()
+        extractors = {}
+        _time_extractors(website, extractors)
+        cards = 0
+        card_time = 0.0
+        start = time.perf_counter()
+        # Les scrapers sont bavards, les print fausseraient la mesure
+        with contextlib.redirect_stdout(io.StringIO()):
+            for page in pages:
+                job_cards = website._find_job_cards(BeautifulSoup(page, 'html.parser'))
+                card_start = time.perf_counter()
+                for card in job_cards:
+                    website._parse_job_card(card)
+                card_time += time.perf_counter() - card_start
+                cards += len(job_cards)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best['seconds']:
+            best = {'seconds': elapsed, 'cards': cards, 'card_seconds': card_time, 'extractors': extractors}
+
+    return {
+        'pages': len(pages),
+        'cards': best['cards'],
+        'pages_per_s': len(pages) / best['seconds'] if best['seconds'] else 0,
+        'cards_per_s': best['cards'] / best['card_seconds'] if best['card_seconds'] else 0,
+        'extractors_ms_per_card': {
+            name: 1000 * seconds / best['cards'] for name, seconds in sorted(best['extractors'].items())
+        } if best['cards'] else {},
+    }
+
+
+def _best_rate(items, func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for item in items:
+                func(item)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(items) / best if best else 0
+
+
+def bench_job_pages(repeat):
+    urls = list(dict.fromkeys(entry['url'] for entry in page_recorder.entries(JOB_PAGES_SITE)))
+    if not urls:
+        return None
+    texts = [BeautifulSoup(page_recorder.load(JOB_PAGES_SITE, url), 'html.parser').get_text(' ') for url in urls]
+    return {
+        'pages': len(urls),
+        'analyze_job_page_per_s': _best_rate(urls, analyze_job_page, repeat),
+        'extract_technologies_per_s': _best_rate(texts, extract_technologies_from_text, repeat),
+        'extract_remote_days_per_s': _best_rate(texts, extract_remote_days, repeat),
+    }
+
+
+def _rates(results):
+    """Flatten the throughput figures (higher is better) to compare with the baselines."""
+    rates = {}
+    for name, result in results.items():
+        for key, value in result.items():
+            if key.endswith('_per_s'):
+                rates[f'{name}.{key}'] = value
+    return rates
+
+
+def compare(rates, baselines, threshold):
+    """Return (mesures plus lentes que leur baseline, mesures sans baseline)."""
+    regressions = []
+    missing = []
+    for key, value in sorted(rates.items()):
+        baseline = baselines.get(key)
+        if not baseline:
+            print(f"  {key:55} {value:12.1f}   (pas de baseline) ❌")
+            missing.append(key)
+            continue
+        change = value / baseline - 1
+        flag = '❌' if change < -threshold else '✅'
+        print(f"  {key:55} {value:12.1f}   baseline {baseline:12.1f}   {change:+.0%} {flag}")
+        if change < -threshold:
+            regressions.append(key)
+    return regressions, missing
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark du parsing sur les pages enregistrées')
+    parser.add_argument('--site', action='append', help='Nom ou slug du site (répétable, tous par défaut)')
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de passes, la meilleure est gardée')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Ralentissement toléré par rapport à la baseline (0.2 = 20%%)')
+    parser.add_argument('--save-baseline', action='store_true', help='Enregistre les mesures comme baselines')
+    args = parser.parse_args()
+
+    print(f"Fixtures: {os.environ['RECORDINGS_DIR']}")
+    wanted = {site_slug(name) for name in args.site or []}
+    results = {}
+    for site_class in SITES:
+        name = site_class().name
+        if wanted and site_slug(name) not in wanted:
+            continue
+        result = bench_listing(site_class, args.repeat)
+        if result is None:
+            print(f"⚠️ {name}: aucune page enregistrée")
+            continue
+        results[name] = result
+        print(f"📄 {name}: {result['pages']} pages, {result['cards']} cartes — "
+              f"{result['pages_per_s']:.1f} pages/s, {result['cards_per_s']:.0f} cartes/s")
+        for extractor, ms in result['extractors_ms_per_card'].items():
+            print(f"     {extractor:40} {ms:.3f} ms/carte")
+
+    if not args.site:
+        result = bench_job_pages(args.repeat)
+        if result is None:
+            print("⚠️ Aucune fiche de poste enregistrée")
+        else:
+            results['job_pages'] = result
+            print(f"📄 Fiches: {result['pages']} pages — analyze_job_page {result['analyze_job_page_per_s']:.1f} pages/s, "
+                  f"technologies {result['extract_technologies_per_s']:.1f} pages/s, "
+                  f"télétravail {result['extract_remote_days_per_s']:.1f} pages/s")
+
+    if not any(name != 'job_pages' for name in results):
+        # Sans fixtures, rien n'est mesuré : le test de régression ne doit pas passer à vide
+        print("❌ Aucun parser mesuré, générer les fixtures avec benchmarks/record_fixtures.py")
+        sys.exit(1)
+
+    rates = _rates(results)
+    if args.save_baseline:
+        baselines = {}
+        if os.path.exists(BASELINES_PATH):
+            with open(BASELINES_PATH) as f:
+                baselines = json.load(f)
+        baselines.update(rates)
+        with open(BASELINES_PATH, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"✅ {len(rates)} baselines écrites dans {BASELINES_PATH}")
+        sys.exit(0)
+
+    baselines = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH) as f:
+            baselines = json.load(f)
+    print("\nComparaison aux baselines:")
+    regressions, missing = compare(rates, baselines, args.threshold)
+    if missing:
+        print(f"❌ {len(missing)} mesure(s) sans baseline, les enregistrer avec --save-baseline")
+    if regressions:
+        print(f"❌ {len(regressions)} régression(s) de plus de {args.threshold:.0%}")
+    if missing or regressions:
+        sys.exit(1)
+    print("✅ Pas de régression")
@@ -0,0 +1,86 @@
+"""
+Génère les fixtures de bench_parsers.py à partir du faux job board.
+
+Le faux board (scripts/fake_job_board.py) est lancé dans le process, sur un port
+libre. Pour chaque site, les premières pages de listing (toutes les cartes dans le
+HTML, sans scroll) sont enregistrées sous le nom du site, puis les fiches de poste
+des premières offres sous JOB_PAGES_SITE, au format de common/recorder.py. Les URLs
+enregistrées pointent vers FIXTURES_BASE_URL quel que soit le port utilisé, pour que
+les fixtures ne changent pas d'une génération à l'autre.
+
+Usage:
+  python benchmarks/record_fixtures.py                # remplace benchmarks/fixtures
+  python benchmarks/record_fixtures.py --pages 5 --job-pages 20
+  python benchmarks/bench_parsers.py --save-baseline  # puis regénérer les baselines
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import requests
+from bs4 import BeautifulSoup
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+FIXTURES_BASE_URL = 'http://localhost:8800'
+os.environ['JOB_BOARD_BASE_URL'] = FIXTURES_BASE_URL  # Avant l'import des constantes
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'srcs'))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'scripts'))
+
+from fake_job_board import SITES as BOARD_SITES, JobBoardHandler
+from common.recorder import JOB_PAGES_SITE, PageRecorder, site_slug
+from bench_parsers import SITES
+
+
+def record_fixtures(directory, pages, job_pages):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), JobBoardHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    local_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    def fetch(url):
+        response = requests.get(url.replace(FIXTURES_BASE_URL, local_url, 1), timeout=10)
+        response.raise_for_status()
+        return response.text
+
+    recorder = PageRecorder(directory)
+    try:
+        for site_class in SITES:
+            website = site_class()
+            # Numérotation des pages du site (première page, pas), telle que le faux board l'attend
+            _, first, step = BOARD_SITES[site_slug(website.name)]['page']
+            links = []
+            for page in range(pages):
+                url = website.url.format(first + page * step)
+                html = fetch(url)
+                recorder.record(website.name, url, html)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    jobs = [website._parse_job_card(card)
+                            for card in website._find_job_cards(BeautifulSoup(html, 'html.parser'))]
+                links += [job['link'] for job in jobs if job and job.get('link')]
+            for link in links[:job_pages]:
+                recorder.record(JOB_PAGES_SITE, link, fetch(link))
+            print(f"📄 {website.name}: {pages} pages, {len(links)} cartes, {min(len(links), job_pages)} fiches")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Génère les fixtures du benchmark avec le faux job board')
+    parser.add_argument('--output', default=FIXTURES_DIR, help='Dossier des fixtures (remplacé)')
+    parser.add_argument('--pages', type=int, default=3, help='Pages de listing par site')
+    parser.add_argument('--job-pages', type=int, default=10, help='Fiches de poste par site')
+    args = parser.parse_args()
+
+    # Toutes les cartes dans le HTML : le replay ne scrolle pas
+    JobBoardHandler.initial_cards = JobBoardHandler.cards
+    if os.path.isdir(args.output):
+        shutil.rmtree(args.output)
+    os.makedirs(args.output)
+    record_fixtures(args.output, args.pages, args.job_pages)
+    print(f"✅ Fixtures écrites dans {args.output}")
@@ -1,20 +1,79 @@
-from flask import Flask, render_template, jsonify, request
-from pymongo import MongoClient
+from flask import Flask, Response, render_template, jsonify, request, g
+from pymongo import MongoClient, monitoring
+from prometheus_client import CONTENT_TYPE_LATEST, Counter as MetricCounter, Histogram, generate_latest
 from datetime import datetime, timedelta
 from collections import Counter
+from bson import ObjectId
+from bson.errors import InvalidId
 import os
+import time
+import zlib
 from dotenv import load_dotenv
 
 load_dotenv()
 
 app = Flask(__name__)
 
+# Prometheus metrics, exposed on /metrics
+HTTP_SECONDS = Histogram(
+    'dashboard_http_request_seconds', 'HTTP handler latency', ['endpoint', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+HTTP_RESPONSES = MetricCounter('dashboard_http_responses_total', 'HTTP responses', ['endpoint', 'method', 'status'])
+MONGO_SECONDS = Histogram(
+    'dashboard_mongo_command_seconds', 'MongoDB command latency', ['command'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_SECONDS.labels(command=event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_SECONDS.labels(command=event.command_name).observe(event.duration_micros / 1e6)
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.monotonic()
+
+@app.after_request
+def record_request_metrics(response):
+    # The route pattern, not the path, so /api/jobs/<job_id>/content is one series
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    if endpoint != '/metrics':
+        HTTP_SECONDS.labels(endpoint, request.method).observe(time.monotonic() - g.request_start)
+        HTTP_RESPONSES.labels(endpoint, request.method, response.status_code).inc()
+    return response
+
 # MongoDB connection
 MONGO_URL = os.getenv('MONGO_URL', 'mongodb://localhost:27017/')
-client = MongoClient(MONGO_URL)
+client = MongoClient(MONGO_URL, event_listeners=[MongoCommandMetrics()])
 db = client.jobs_database
 jobs_collection = db.jobs_collection
 logs_collection = db.logs
+job_contents_collection = db.job_contents
+runs_collection = db.runs
+
+# Only the fields the jobs list renders, never the page text
+JOB_LIST_PROJECTION = {
+    'name': 1,
+    'company': 1,
+    'location': 1,
+    'url': 1,
+    'thumbnail': 1,
+    'technologies': 1,
+    'seniority': 1,
+    'contract_type': 1,
+    'remote': 1,
+    'remote_days': 1,
+    'source': 1,
+    'date_scraped': 1,
+}
 
 @app.route('/')
 def index():
@@ -28,12 +87,20 @@ def jobs_page():
 def analytics_page():
     return render_template('analytics.html')
 
+@app.route('/runs')
+def runs_page():
+    return render_template('runs.html')
+
+@app.route('/metrics')
+def metrics():
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
 @app.route('/api/debug')
 def debug_data():
     """Debug endpoint to check data"""
     try:
         total = jobs_collection.count_documents({})
-        sample = list(jobs_collection.find().limit(3))
+        sample = list(jobs_collection.find({}, {'full_content': 0, 'description': 0}).limit(3))
         
         for doc in sample:
             doc['_id'] = str(doc['_id'])
@@ -60,7 +127,7 @@ def get_stats():
     last_24h = datetime.now() - timedelta(hours=24)
     jobs_24h = jobs_collection.count_documents({'date_scraped': {'$gte': last_24h}})
     
-    last_job = jobs_collection.find_one(sort=[('date_scraped', -1)])
+    last_job = jobs_collection.find_one({}, {'date_scraped': 1}, sort=[('date_scraped', -1)])
     last_update = last_job['date_scraped'].strftime('%Y-%m-%d %H:%M:%S') if last_job and 'date_scraped' in last_job else 'Jamais'
     
     all_techs = jobs_collection.distinct('technologies')
@@ -226,7 +293,7 @@ def get_jobs_timeline():
 def get_tech_correlation():
     """Get which technologies are often requested together"""
     # Get pairs of technologies that appear together
-    jobs = list(jobs_collection.find({'technologies': {'$exists': True, '$ne': []}}))
+    jobs = list(jobs_collection.find({'technologies': {'$exists': True, '$ne': []}}, {'technologies': 1, '_id': 0}))
     
     from itertools import combinations
     
@@ -320,7 +387,7 @@ def get_jobs():
         query['$or'] = search_or_conditions
     
     total = jobs_collection.count_documents(query)
-    jobs = list(jobs_collection.find(query).sort('date_scraped', -1).skip(skip).limit(per_page))
+    jobs = list(jobs_collection.find(query, JOB_LIST_PROJECTION).sort('date_scraped', -1).skip(skip).limit(per_page))
     
     result = []
     for job in jobs:
@@ -348,6 +415,27 @@ def get_jobs():
         'total_pages': (total + per_page - 1) // per_page
     })
 
+@app.route('/api/jobs/<job_id>/content')
+def get_job_content(job_id):
+    """Get the full text of a job page, loaded on demand from the content store"""
+    try:
+        oid = ObjectId(job_id)
+    except InvalidId:
+        return jsonify({'error': 'invalid job id'}), 400
+
+    doc = job_contents_collection.find_one({'_id': oid})
+    if not doc:
+        # Old documents still carry full_content inline until the migration runs
+        job = jobs_collection.find_one({'_id': oid}, {'full_content': 1})
+        if not job or not job.get('full_content'):
+            return jsonify({'error': 'content not found'}), 404
+        return jsonify({'id': job_id, 'content': job['full_content']})
+
+    return jsonify({
+        'id': job_id,
+        'content': zlib.decompress(doc['content']).decode('utf-8')
+    })
+
 @app.route('/api/filters/options')
 def get_filter_options():
     """Get all available filter options"""
@@ -370,7 +458,8 @@ def get_filter_options():
 @app.route('/api/logs')
 def get_logs():
     """Get recent logs from MongoDB"""
-    logs = list(logs_collection.find().sort('timestamp', -1).limit(100))
+    logs = list(logs_collection.find({}, {'timestamp': 1, 'level': 1, 'message': 1, 'website': 1})
+                .sort('timestamp', -1).limit(100))
     
     result = []
     for log in logs:
@@ -383,5 +472,29 @@ def get_logs():
     
     return jsonify(result)
 
+@app.route('/api/runs')
+def get_runs():
+    """Get the telemetry of the last scraper iterations, oldest first"""
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'error': 'invalid limit'}), 400
+    # limit(0) renverrait tous les runs
+    limit = max(1, min(limit, 500))
+    runs = list(runs_collection.find({}, {'_id': 0}).sort('started_at', -1).limit(limit))
+
+    result = []
+    for run in reversed(runs):
+        result.append({
+            'started_at': run['started_at'].strftime('%Y-%m-%d %H:%M:%S'),
+            'duration': run.get('duration', 0),
+            'totals': run.get('totals', {}),
+            'sites': run.get('sites', []),
+            'pipeline': run.get('pipeline', {}),
+            'discord': run.get('discord', {}),
+        })
+
+    return jsonify(result)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080, debug=True)
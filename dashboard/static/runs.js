@@ -0,0 +1,225 @@
+// Runs Dashboard
+const SITE_COLORS = [
+    'rgba(233, 69, 96, 0.8)',
+    'rgba(52, 152, 219, 0.8)',
+    'rgba(46, 204, 113, 0.8)',
+    'rgba(243, 156, 18, 0.8)',
+    'rgba(155, 89, 182, 0.8)',
+    'rgba(26, 188, 156, 0.8)',
+    'rgba(230, 126, 34, 0.8)',
+    'rgba(149, 165, 166, 0.8)',
+    'rgba(241, 196, 15, 0.8)'
+];
+
+const AXIS_STYLE = {
+    ticks: { color: '#a0a0a0' },
+    grid: { color: '#2d2d44' }
+};
+
+class RunsDashboard {
+    constructor() {
+        this.charts = {};
+        this.init();
+    }
+
+    init() {
+        this.loadRuns();
+    }
+
+    async loadRuns() {
+        try {
+            const response = await fetch('/api/runs?limit=50');
+            const runs = await response.json();
+
+            if (runs.length === 0) {
+                document.getElementById('lastRunTable').innerHTML =
+                    '<p class="loading-chart">Aucune itération enregistrée</p>';
+                return;
+            }
+
+            const lastRun = runs[runs.length - 1];
+            this.renderLastRunStats(lastRun);
+            this.renderDurationChart(runs);
+            this.renderNewJobsChart(runs);
+            this.renderErrorsChart(runs);
+            this.renderStagesChart(lastRun);
+            this.renderLastRunTable(lastRun);
+        } catch (error) {
+            console.error('Error loading runs:', error);
+        }
+    }
+
+    siteNames(runs) {
+        const names = new Set();
+        runs.forEach(run => run.sites.forEach(site => names.add(site.site)));
+        return [...names];
+    }
+
+    siteValue(run, name, getter) {
+        const site = run.sites.find(s => s.site === name);
+        return site ? getter(site) : null;
+    }
+
+    formatBytes(bytes) {
+        if (bytes >= 1024 * 1024) return (bytes / (1024 * 1024)).toFixed(1) + ' Mo';
+        if (bytes >= 1024) return (bytes / 1024).toFixed(0) + ' Ko';
+        return bytes + ' o';
+    }
+
+    renderLastRunStats(run) {
+        document.getElementById('last-duration').textContent = Math.round(run.duration) + 's';
+        document.getElementById('last-cards').textContent = run.totals.cards_seen || 0;
+        document.getElementById('last-new-jobs').textContent = run.totals.new_jobs || 0;
+        document.getElementById('last-bytes').textContent = this.formatBytes(run.totals.bytes_fetched || 0);
+    }
+
+    renderDurationChart(runs) {
+        const labels = runs.map(run => run.started_at);
+        const datasets = this.siteNames(runs).map((name, i) => ({
+            label: name,
+            data: runs.map(run => this.siteValue(run, name, s => Math.round(s.durations.scrap || 0))),
+            borderColor: SITE_COLORS[i % SITE_COLORS.length],
+            backgroundColor: SITE_COLORS[i % SITE_COLORS.length],
+            tension: 0.3,
+            spanGaps: true
+        }));
+
+        const ctx = document.getElementById('durationChart').getContext('2d');
+        this.charts.duration = new Chart(ctx, {
+            type: 'line',
+            data: { labels, datasets },
+            options: {
+                responsive: true,
+                plugins: {
+                    legend: { labels: { color: '#a0a0a0' } }
+                },
+                scales: {
+                    x: { ticks: { color: '#a0a0a0', maxTicksLimit: 10 }, grid: { display: false } },
+                    y: { beginAtZero: true, ...AXIS_STYLE, title: { display: true, text: 'secondes', color: '#a0a0a0' } }
+                }
+            }
+        });
+    }
+
+    renderNewJobsChart(runs) {
+        const labels = runs.map(run => run.started_at);
+        const datasets = this.siteNames(runs).map((name, i) => ({
+            label: name,
+            data: runs.map(run => this.siteValue(run, name, s => s.new_jobs) || 0),
+            backgroundColor: SITE_COLORS[i % SITE_COLORS.length]
+        }));
+
+        const ctx = document.getElementById('newJobsChart').getContext('2d');
+        this.charts.newJobs = new Chart(ctx, {
+            type: 'bar',
+            data: { labels, datasets },
+            options: {
+                responsive: true,
+                plugins: {
+                    legend: { labels: { color: '#a0a0a0' } }
+                },
+                scales: {
+                    x: { stacked: true, ticks: { display: false }, grid: { display: false } },
+                    y: { stacked: true, beginAtZero: true, ...AXIS_STYLE }
+                }
+            }
+        });
+    }
+
+    renderErrorsChart(runs) {
+        const ctx = document.getElementById('errorsChart').getContext('2d');
+        this.charts.errors = new Chart(ctx, {
+            type: 'bar',
+            data: {
+                labels: runs.map(run => run.started_at),
+                datasets: [{
+                    label: 'Erreurs',
+                    data: runs.map(run => run.totals.errors || 0),
+                    backgroundColor: 'rgba(231, 76, 60, 0.8)',
+                    borderColor: 'rgba(231, 76, 60, 1)',
+                    borderWidth: 1
+                }]
+            },
+            options: {
+                responsive: true,
+                plugins: {
+                    legend: { display: false }
+                },
+                scales: {
+                    x: { ticks: { display: false }, grid: { display: false } },
+                    y: { beginAtZero: true, ...AXIS_STYLE }
+                }
+            }
+        });
+    }
+
+    renderStagesChart(run) {
+        // 'scrap' is the whole site loop, the other stages are parts of it or of the pipeline
+        const stages = new Set();
+        run.sites.forEach(site => Object.keys(site.durations).forEach(stage => {
+            if (stage !== 'scrap') stages.add(stage);
+        }));
+
+        const datasets = [...stages].map((stage, i) => ({
+            label: stage,
+            data: run.sites.map(site => +(site.durations[stage] || 0).toFixed(2)),
+            backgroundColor: SITE_COLORS[i % SITE_COLORS.length]
+        }));
+
+        const ctx = document.getElementById('stagesChart').getContext('2d');
+        this.charts.stages = new Chart(ctx, {
+            type: 'bar',
+            data: { labels: run.sites.map(site => site.site), datasets },
+            options: {
+                indexAxis: 'y',
+                responsive: true,
+                plugins: {
+                    legend: { labels: { color: '#a0a0a0' } }
+                },
+                scales: {
+                    x: { stacked: true, beginAtZero: true, ...AXIS_STYLE, title: { display: true, text: 'secondes', color: '#a0a0a0' } },
+                    y: { stacked: true, ticks: { color: '#a0a0a0' }, grid: { display: false } }
+                }
+            }
+        });
+    }
+
+    renderLastRunTable(run) {
+        const rows = run.sites.map(site => {
+            const errorClasses = Object.entries(site.error_classes || {})
+                .map(([name, count]) => `${name} ×${count}`).join(', ');
+            const status = site.status === 'error' ? '❌' : '✅';
+            return `
+                <tr>
+                    <td>${status} ${site.site}</td>
+                    <td>${Math.round(site.durations.scrap || 0)}s</td>
+                    <td>${site.pages || 0}</td>
+                    <td>${site.cards_seen}</td>
+                    <td>${site.new_jobs}</td>
+                    <td>${this.formatBytes(site.bytes_fetched || 0)}</td>
+                    <td>${site.errors}${errorClasses ? ` <span class="run-errors">(${errorClasses})</span>` : ''}</td>
+                </tr>
+            `;
+        }).join('');
+
+        document.getElementById('lastRunTable').innerHTML = `
+            <table class="runs-table">
+                <thead>
+                    <tr>
+                        <th>Site</th>
+                        <th>Durée</th>
+                        <th>Pages</th>
+                        <th>Offres vues</th>
+                        <th>Nouveaux</th>
+                        <th>Téléchargé</th>
+                        <th>Erreurs</th>
+                    </tr>
+                </thead>
+                <tbody>${rows}</tbody>
+            </table>
+        `;
+    }
+}
+
+// Initialize
+const runsDashboard = new RunsDashboard();
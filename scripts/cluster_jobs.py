@@ -0,0 +1,114 @@
+"""
+Regroupement des doublons inter-sites déjà présents dans jobs_collection.
+Les jobs sont parcourus du plus ancien au plus récent avec le même MinHash / LSH
+que le pipeline (common/dedup.py), avec un index LSH en mémoire ; seuls des jobs de
+sites différents sont regroupés. Le plus ancien job d'un groupe le représente : les
+doublons lui sont rattachés (duplicate_urls, duplicate_sources) puis supprimés avec
+leur texte complet. L'index job_signatures est ensuite reconstruit avec les
+représentants des groupes : à relancer quand le texte des signatures change.
+
+Usage: python scripts/cluster_jobs.py [--dry-run]
+"""
+
+import os
+import sys
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'srcs'))
+from common.constants import DEDUP_THRESHOLD
+from common.database import job_contents_collection, job_signatures_collection, jobs_collection
+from common.dedup import (
+    TITLE_SIMILARITY, job_text, lsh_bands, minhash, normalize, shingles, similarity, title_similarity,
+)
+from pymongo import UpdateOne
+
+
+def cluster_jobs():
+    """Return (représentants, doublons par représentant, jobs sans texte)."""
+    total = jobs_collection.count_documents({})
+    print(f"📊 {total} jobs à regrouper")
+
+    heads = {}  # url du représentant -> (signature, titre, source)
+    buckets = defaultdict(list)  # bande LSH -> urls des représentants
+    duplicates = defaultdict(list)  # url du représentant -> jobs rattachés
+    skipped = 0
+    projection = {'url': 1, 'name': 1, 'company': 1, 'location': 1, 'description': 1, 'source': 1,
+                  'duplicate_urls': 1, 'duplicate_sources': 1}
+    for i, job in enumerate(jobs_collection.find({}, projection).sort('date_added', 1), 1):
+        if i % 500 == 0:
+            print(f"  [{i}/{total}] traités...")
+        signature = minhash(shingles(job_text(job)))
+        if signature is None or not job.get('url'):
+            skipped += 1
+            continue
+        title = normalize(job.get('name'))
+        bands = lsh_bands(signature)
+
+        best, best_score = None, DEDUP_THRESHOLD
+        for candidate in {url for band in bands for url in buckets[band]}:
+            candidate_signature, candidate_title, candidate_source = heads[candidate]
+            if candidate_source == job.get('source'):
+                continue  # Deux offres d'un même site sont distinctes
+            score = similarity(signature, candidate_signature)
+            if score >= best_score and title_similarity(title, candidate_title) >= TITLE_SIMILARITY:
+                best, best_score = candidate, score
+
+        if best is None:
+            heads[job['url']] = (signature, title, job.get('source'))
+            for band in bands:
+                buckets[band].append(job['url'])
+        else:
+            duplicates[best].append(job)
+            print(f"  🔗 {job.get('name')} @ {job.get('company')} ({job.get('source')}) -> {best}")
+    return heads, duplicates, skipped
+
+
+def merge_duplicates(duplicates):
+    """Rattache les doublons à leur représentant et les supprime."""
+    for head, jobs in duplicates.items():
+        urls, sources = [], []
+        for job in jobs:
+            urls += [job['url']] + job.get('duplicate_urls', [])
+            sources += [job.get('source')] + job.get('duplicate_sources', [])
+        jobs_collection.update_one(
+            {'url': head},
+            {'$addToSet': {'duplicate_urls': {'$each': urls}, 'duplicate_sources': {'$each': sources}}},
+        )
+        ids = [job['_id'] for job in jobs]
+        jobs_collection.delete_many({'_id': {'$in': ids}})
+        job_contents_collection.delete_many({'_id': {'$in': ids}})
+
+
+def rebuild_index(heads):
+    """Remplace le contenu de job_signatures par les représentants des groupes."""
+    job_signatures_collection.delete_many({})
+    now = datetime.now()
+    operations = [
+        UpdateOne({'_id': url}, {'$set': {'bands': lsh_bands(signature), 'signature': signature, 'title': title,
+                                          'source': source, 'indexed_at': now}}, upsert=True)
+        for url, (signature, title, source) in heads.items()
+    ]
+    for start in range(0, len(operations), 1000):
+        job_signatures_collection.bulk_write(operations[start:start + 1000], ordered=False)
+
+
+if __name__ == '__main__':
+    dry_run = len(sys.argv) > 1 and sys.argv[1] == '--dry-run'
+    print("🚀 Démarrage du regroupement des doublons...")
+    if dry_run:
+        print("🔍 Mode simulation: aucune écriture")
+    print()
+
+    heads, duplicates, skipped = cluster_jobs()
+    merged = sum(len(jobs) for jobs in duplicates.values())
+    if not dry_run:
+        merge_duplicates(duplicates)
+        rebuild_index(heads)
+
+    print(f"\n{'='*50}")
+    print("📊 Regroupement terminé:")
+    print(f"  ✅ Jobs uniques: {len(heads)}")
+    print(f"  🔗 Doublons rattachés: {merged} (dans {len(duplicates)} groupes)")
+    print(f"  ⏭ Jobs sans texte: {skipped}")
+    print(f"{'='*50}")
@@ -0,0 +1,116 @@
+"""
+Faux serveur de webhooks Discord pour tester l'envoi sans toucher à Discord.
+Il applique une limite de débit par webhook comme Discord (5 messages / 2 s par
+défaut), renvoie les en-têtes X-RateLimit-* et répond 429 avec Retry-After
+quand le bucket est vide.
+
+Usage:
+  python scripts/fake_discord_webhook.py                 # Serveur seul sur le port 8099
+  python scripts/fake_discord_webhook.py --demo 50       # Envoie 50 messages via DiscordSender
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class RateLimitedWebhookHandler(BaseHTTPRequestHandler):
+    limit = 5
+    window = 2.0
+    buckets = {}  # path -> [remaining, reset_at]
+    lock = threading.Lock()
+    received = 0
+    rejected = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if data:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+
+        cls = type(self)
+        now = time.monotonic()
+        with cls.lock:
+            bucket = cls.buckets.get(self.path)
+            if bucket is None or now >= bucket[1]:
+                bucket = cls.buckets[self.path] = [cls.limit, now + cls.window]
+            reset_after = max(0.0, bucket[1] - now)
+            if bucket[0] <= 0:
+                cls.rejected += 1
+                self._reply(429, {'message': 'You are being rate limited.', 'retry_after': round(reset_after, 3), 'global': False}, {
+                    'Retry-After': f'{reset_after:.3f}',
+                    'X-RateLimit-Limit': str(cls.limit),
+                    'X-RateLimit-Remaining': '0',
+                    'X-RateLimit-Reset-After': f'{reset_after:.3f}',
+                    'X-RateLimit-Bucket': self.path,
+                })
+                return
+            bucket[0] -= 1
+            remaining = bucket[0]
+            cls.received += 1
+
+        if len(payload.get('embeds', [])) > 10:
+            self._reply(400, {'message': 'Invalid Form Body', 'code': 50035})
+            return
+
+        self._reply(204, headers={
+            'X-RateLimit-Limit': str(cls.limit),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset-After': f'{reset_after:.3f}',
+            'X-RateLimit-Bucket': self.path,
+        })
+
+
+def run_demo(port, count):
+    """Envoie `count` messages au faux serveur et affiche le débit obtenu."""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'srcs'))
+    from common.webhook import DiscordSender
+
+    sender = DiscordSender()
+    url = f'http://127.0.0.1:{port}/api/webhooks/1/demo'
+    start = time.monotonic()
+    for i in range(count):
+        sender.submit(url, {'username': 'demo', 'embeds': [{'title': f'Job #{i}'}]})
+    sender.flush(timeout=count)
+    elapsed = time.monotonic() - start
+
+    print(f"{count} messages en {elapsed:.1f}s ({count / elapsed:.2f} msg/s)")
+    print(f"Serveur: {RateLimitedWebhookHandler.received} acceptés, {RateLimitedWebhookHandler.rejected} refusés (429)")
+    print(f"Sender: {sender.stats()}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--limit', type=int, default=5, help='Messages autorisés par fenêtre')
+    parser.add_argument('--window', type=float, default=2.0, help='Durée de la fenêtre en secondes')
+    parser.add_argument('--demo', type=int, metavar='N', help='Envoyer N messages puis quitter')
+    args = parser.parse_args()
+
+    RateLimitedWebhookHandler.limit = args.limit
+    RateLimitedWebhookHandler.window = args.window
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), RateLimitedWebhookHandler)
+
+    if args.demo:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        run_demo(args.port, args.demo)
+        server.shutdown()
+    else:
+        print(f"Faux webhook Discord sur http://127.0.0.1:{args.port}/api/webhooks/<id>/<token>")
+        server.serve_forever()
@@ -0,0 +1,370 @@
+"""
+Faux job board local pour mesurer le débit du scraper de bout en bout, sans
+dépendre des vrais sites (anti-bot, contenu qui change, limites de débit).
+
+Chaque site est servi sous http://HOST:PORT/<site>/..., <site> étant le nom du
+site en minuscules (welcome_to_the_jungle, job_teaser, station_f, apec, lesjeudis,
+cadremploi, linkedin, indeed_france). Les pages de listing reprennent le balisage
+attendu par les parsers de srcs/websites, avec des offres générées de façon
+déterministe ; les fiches de poste contiennent technologies, télétravail et
+contrat pour job_analyzer. Une partie des cartes n'est ajoutée qu'au scroll,
+comme sur les sites qui chargent les résultats en JavaScript.
+
+Usage:
+  python scripts/fake_job_board.py                               # Port 8800
+  python scripts/fake_job_board.py --latency 0.3 --jitter 0.2    # Latence simulée
+  python scripts/fake_job_board.py --rate-limit 30 --rate-window 10
+  python scripts/fake_job_board.py --recordings recordings       # Sert les pages enregistrées
+
+Puis lancer le scraper sur le faux board :
+  JOB_BOARD_BASE_URL=http://localhost:8800 python srcs/main.py
+
+Avec --rotate N, les offres changent toutes les N secondes : chaque itération
+trouve alors de nouveaux jobs, ce qui charge aussi l'analyse, Mongo et Discord
+(à combiner avec scripts/fake_discord_webhook.py). Le débit (pages/min, durées
+par étape) se lit ensuite dans la télémétrie des runs ou sur /metrics.
+"""
+
+import argparse
+import html
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+COMPANIES = ['Doctolib', 'Alan', 'Qonto', 'Back Market', 'Swile', 'Ledger', 'Mirakl', 'Contentsquare',
+             'Pennylane', 'Spendesk', 'Algolia', 'Dataiku', 'Payfit', 'Malt', 'Ornikar', 'Lydia']
+TITLES = ['Développeur Backend Python', 'Développeur Fullstack React / Node', 'Software Engineer Go',
+          'Développeur Frontend Vue.js', 'Data Engineer', 'DevOps Engineer Kubernetes',
+          'Développeur Java Spring', 'Lead Developer TypeScript', 'Développeur PHP Symfony',
+          'Ingénieur Logiciel C++', 'Développeur Mobile Flutter', 'Software Engineer Rust']
+TECHNOLOGIES = ['Python', 'Django', 'React', 'Node.js', 'TypeScript', 'Go', 'Java', 'Spring', 'Vue.js',
+                'PostgreSQL', 'MongoDB', 'Docker', 'Kubernetes', 'AWS', 'GCP', 'Kafka', 'Redis', 'Rust']
+CITIES = ['Paris', 'Paris 75009', 'Lyon', 'Bordeaux', 'Nantes', 'Lille', 'Toulouse']
+CONTRACTS = ['CDI', 'CDI', 'CDI', 'CDD', 'Freelance', 'Stage']
+REMOTE = ['2 jours de télétravail par semaine', 'Télétravail 3 jours par semaine',
+          'Full remote possible', 'Présentiel sur site', '1 jour de télétravail par semaine']
+
+
+def _slug(text):
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def _wttj_card(job):
+    return f'''<li data-testid="jobs-results-list-list-item-wrapper"><div>
+  <div data-testid="job-thumb-logo-{job['id']}"><img data-testid="job-thumb-logo-{job['id']}" alt="{job['company']}" src="{job['logo']}"></div>
+  <a href="/fr/companies/{_slug(job['company'])}/jobs/{job['slug']}" aria-label="Consultez l'offre {job['title']}"><h2>{job['title']}</h2></a>
+  <p class="wui-text">{job['summary']}</p>
+  <span class="sc-ldnNiw wui-text">{job['city']}</span><span>{job['contract']}</span>
+</div></li>'''
+
+
+def _jobteaser_card(job):
+    return f'''<li data-testid="jobad-card"><img src="{job['logo']}" alt="">
+  <a href="/fr/job-offers/{job['id']}-{job['slug']}">{job['title']}</a>
+  <p data-testid="jobad-card-company-name">{job['company']}</p><span>{job['city']} · {job['contract']}</span>
+</li>'''
+
+
+def _stationf_card(job):
+    return f'''<li class="ais-Hits-item"><a class="jobs-item-link" href="/companies/{_slug(job['company'])}/jobs/{job['slug']}">
+  <div class="company-logo" style="background-image: url({job['logo']});"></div>
+  <h4 class="job-title">{job['title']}</h4>
+  <ul><li class="job-company">{job['company']}</li><li class="job-office">{job['city']}</li></ul>
+</a></li>'''
+
+
+def _apec_card(job):
+    return f'''<article class="card-offer"><a href="/candidat/recherche-emploi.html/emploi/detail-offre/{job['id']}">
+  <h2 class="card-offer__title">{job['title']}</h2></a>
+  <span class="card-offer__company-name">{job['company']}</span><span class="card-offer__location">{job['city']}</span>
+  <p>{job['summary']}</p>
+</article>'''
+
+
+def _lesjeudis_card(job):
+    return f'''<article class="job-card"><img src="{job['logo']}" alt="">
+  <h2 class="job-title"><a href="/job/{job['id']}-{job['slug']}">{job['title']}</a></h2>
+  <span class="company-name">{job['company']}</span><span class="location">{job['city']}</span>
+</article>'''
+
+
+def _cadremploi_card(job):
+    return f'''<article class="job-card"><img src="{job['logo']}" alt="">
+  <h2 class="job-title"><a href="/emploi/offre/{job['id']}-{job['slug']}">{job['title']}</a></h2>
+  <span class="company-name">{job['company']}</span><span class="location">{job['city']}</span>
+</article>'''
+
+
+def _linkedin_card(job):
+    return f'''<li><div class="base-card job-search-card" data-job-id="{job['id']}">
+  <a class="base-card__full-link" href="/jobs/view/{job['slug']}-{job['id']}"><span class="sr-only">{job['title']}</span></a>
+  <img class="artdeco-entity-image" src="{job['logo']}" alt="{job['company']}">
+  <h3 class="base-search-card__title">{job['title']}</h3>
+  <h4 class="base-search-card__subtitle"><a class="hidden-nested-link">{job['company']}</a></h4>
+  <span class="job-search-card__location">{job['city']}</span>
+</div></li>'''
+
+
+def _indeed_card(job):
+    return f'''<li><div class="job_seen_beacon">
+  <h2 class="jobTitle"><a href="/viewjob?jk={job['id']}"><span title="{job['title']}">{job['title']}</span></a></h2>
+  <span data-testid="company-name">{job['company']}</span>
+  <div data-testid="text-location">{job['city']}</div>
+  <div class="job-snippet"><ul><li>{job['summary']}</li></ul></div>
+</div></li>'''
+
+
+# Par site : origine réelle, chemin du listing (regex), paramètre de page (regex, premier
+# numéro, pas), conteneur des cartes et rendu d'une carte
+SITES = {
+    'welcome_to_the_jungle': {
+        'origin': 'https://www.welcometothejungle.com', 'listing': r'^/fr/pages/',
+        'page': (r'[?&]page=(\d+)', 1, 1), 'list': '<ul>{}</ul>', 'card': _wttj_card,
+    },
+    'job_teaser': {
+        'origin': 'https://www.jobteaser.com', 'listing': r'^/fr/job-offers$',
+        'page': (r'[?&]p=(\d+)', 0, 1), 'list': '<ul data-testid="job-ads-wrapper">{}</ul>', 'card': _jobteaser_card,
+    },
+    'station_f': {
+        'origin': 'https://jobs.stationf.co', 'listing': r'^/search$',
+        'page': (r'[?&]page=(\d+)', 1, 1), 'list': '<ol class="ais-Hits-list">{}</ol>', 'card': _stationf_card,
+    },
+    'apec': {
+        'origin': 'https://www.apec.fr', 'listing': r'^/candidat/recherche-emploi\.html/emploi$',
+        'page': (r'[?&]page=(\d+)', 0, 1), 'list': '<div class="container-result">{}</div>', 'card': _apec_card,
+    },
+    'lesjeudis': {
+        'origin': 'https://www.lesjeudis.com', 'listing': r'^/recherche$',
+        'page': (r'[?&]p=(\d+)', 1, 1), 'list': '<section>{}</section>', 'card': _lesjeudis_card,
+    },
+    'cadremploi': {
+        'origin': 'https://www.cadremploi.fr', 'listing': r'^/emploi/[^/]+_\d+$',
+        'page': (r'_(\d+)$', 1, 1), 'list': '<section>{}</section>', 'card': _cadremploi_card,
+    },
+    'linkedin': {
+        'origin': 'https://www.linkedin.com', 'listing': r'^/jobs/search$',
+        'page': (r'[?&]start=(\d+)', 0, 25), 'list': '<ul class="jobs-search__results-list">{}</ul>', 'card': _linkedin_card,
+    },
+    'indeed_france': {
+        'origin': 'https://fr.indeed.com', 'listing': r'^/jobs$',
+        'page': (r'[?&]start=(\d+)', 0, 10), 'list': '<ul class="css-zu9cdh">{}</ul>', 'card': _indeed_card,
+    },
+}
+
+LISTING_PAGE = '''<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>{site} - page {page}</title></head>
+<body><main id="results">{cards}</main>{pagination}
+<script>
+// Les cartes restantes ne sont ajoutées qu'au scroll, comme sur les vrais sites
+const pending = {pending};
+const list = document.getElementById('results').firstElementChild;
+window.addEventListener('scroll', () => {{
+  if (pending.length && window.innerHeight + window.scrollY >= document.body.scrollHeight - 400) {{
+    list.insertAdjacentHTML('beforeend', pending.splice(0, {batch}).join(''));
+  }}
+}});
+</script></body></html>'''
+
+JOB_PAGE = '''<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8"><title>{title} - {company}</title></head>
+<body><main><h1>{title}</h1><h2>{company}</h2><p>{city} · {contract}</p>
+<section class="description">
+<p>{company} recrute un(e) {title} pour renforcer son équipe produit.</p>
+<p>Stack technique : {technologies}.</p>
+<p>Profil recherché : {experience} ans d'expérience minimum en développement.</p>
+<p>Contrat : {contract}. Salaire : {salary}k€ - {salary_max}k€ brut annuel. {remote}.</p>
+</section></main></body></html>'''
+
+
+class JobBoardHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    pages = 5
+    cards = 20
+    initial_cards = 8
+    latency = 0.0
+    jitter = 0.0
+    rotate = 0
+    rate_limit = 0
+    rate_window = 10.0
+    recorder = None
+    hits = {}  # client -> deque des instants de requête
+    lock = threading.Lock()
+    served = 0
+    rejected = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body='', content_type='text/html; charset=utf-8', headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _rate_limited(self):
+        """Fenêtre glissante par client ; renvoie le délai d'attente, ou None."""
+        cls = type(self)
+        if not cls.rate_limit:
+            return None
+        now = time.monotonic()
+        with cls.lock:
+            hits = cls.hits.setdefault(self.client_address[0], deque())
+            while hits and hits[0] <= now - cls.rate_window:
+                hits.popleft()
+            if len(hits) >= cls.rate_limit:
+                cls.rejected += 1
+                return hits[0] + cls.rate_window - now
+            hits.append(now)
+        return None
+
+    def do_GET(self):
+        cls = type(self)
+        retry_after = self._rate_limited()
+        if retry_after is not None:
+            self._reply(429, 'Too Many Requests', 'text/plain', {'Retry-After': str(max(1, round(retry_after)))})
+            return
+        if cls.latency or cls.jitter:
+            time.sleep(max(0.0, cls.latency + random.uniform(-cls.jitter, cls.jitter)))
+
+        parts = urlsplit(self.path)
+        if parts.path == '/stats':
+            self._reply(200, json.dumps({'served': cls.served, 'rejected': cls.rejected}), 'application/json')
+            return
+        site, _, rest = parts.path.lstrip('/').partition('/')
+        config = SITES.get(site)
+        if config is None:
+            self._reply(404, 'Unknown site')
+            return
+        path = '/' + rest
+        full_path = path + (f'?{parts.query}' if parts.query else '')
+
+        body = self._recorded_page(site, config, full_path)
+        if body is None:
+            if re.match(config['listing'], path):
+                body = self._listing_page(site, config, full_path)
+            else:
+                body = self._job_page(site, full_path)
+        with cls.lock:
+            cls.served += 1
+        self._reply(200, body)
+
+    def _recorded_page(self, site, config, full_path):
+        """Page enregistrée pour l'URL réelle correspondante, avec les liens réécrits vers le faux board."""
+        cls = type(self)
+        if cls.recorder is None:
+            return None
+        url = config['origin'] + full_path
+        page = cls.recorder.load(site, url) or cls.recorder.load(JOB_PAGES_SITE, url)
+        if page is None:
+            return None
+        local = f'http://{self.headers.get("Host")}/{site}'
+        return page.replace(config['origin'], local)
+
+    def _page_number(self, config, full_path):
+        pattern, first, step = config['page']
+        match = re.search(pattern, full_path)
+        return (int(match.group(1)) - first) // step if match else 0
+
+    def _jobs(self, site, page):
+        cls = type(self)
+        epoch = int(time.time() // cls.rotate) if cls.rotate else 0
+        return [_job(site, epoch, page * cls.cards + i) for i in range(cls.cards)]
+
+    def _listing_page(self, site, config, full_path):
+        cls = type(self)
+        page = self._page_number(config, full_path)
+        cards = [config['card'](job) for job in self._jobs(site, page)] if 0 <= page < cls.pages else []
+        pagination = ''
+        if page + 1 < cls.pages:
+            pagination = f'<nav aria-label="jobs-pagination"><a href="?page={page + 2}">Suivant</a></nav>'
+        return LISTING_PAGE.format(
+            site=site, page=page,
+            cards=config['list'].format(''.join(cards[:cls.initial_cards])),
+            pending=json.dumps(cards[cls.initial_cards:]),
+            batch=max(1, cls.initial_cards // 2),
+            pagination=pagination,
+        )
+
+    def _job_page(self, site, full_path):
+        rng = random.Random(f'{site}:{full_path}')
+        title = rng.choice(TITLES)
+        salary = rng.randrange(40, 70, 5)
+        return JOB_PAGE.format(
+            title=html.escape(title),
+            company=rng.choice(COMPANIES),
+            city=rng.choice(CITIES),
+            contract=rng.choice(CONTRACTS),
+            technologies=', '.join(rng.sample(TECHNOLOGIES, 5)),
+            experience=rng.randint(1, 8),
+            salary=salary,
+            salary_max=salary + 10,
+            remote=rng.choice(REMOTE),
+        )
+
+
+def _job(site, epoch, index):
+    """Offre déterministe : même site, période et rang donnent la même offre."""
+    rng = random.Random(f'{site}:{epoch}:{index}')
+    title = rng.choice(TITLES)
+    job_id = f'{epoch:x}{index:05d}'
+    return {
+        'id': job_id,
+        'slug': f'{_slug(title)}-{job_id}',
+        'title': html.escape(title),
+        'company': rng.choice(COMPANIES),
+        'city': rng.choice(CITIES),
+        'contract': rng.choice(CONTRACTS),
+        'logo': f'https://logos.example.com/{job_id}.png',
+        'summary': f"Rejoignez l'équipe pour travailler avec {', '.join(rng.sample(TECHNOLOGIES, 3))}.",
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Faux job board local pour les tests de débit')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--pages', type=int, default=JobBoardHandler.pages, help='Pages de listing par site')
+    parser.add_argument('--cards', type=int, default=JobBoardHandler.cards, help='Offres par page')
+    parser.add_argument('--initial-cards', type=int, default=JobBoardHandler.initial_cards,
+                        help='Offres présentes dans le HTML, les autres arrivent au scroll')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latence ajoutée à chaque réponse (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Variation aléatoire de la latence (s)')
+    parser.add_argument('--rate-limit', type=int, default=0, help='Requêtes par client et par fenêtre (0 = illimité)')
+    parser.add_argument('--rate-window', type=float, default=10.0, help='Durée de la fenêtre de limite (s)')
+    parser.add_argument('--rotate', type=int, default=0, help='Renouvelle les offres toutes les N secondes')
+    parser.add_argument('--recordings', help='Dossier d\'enregistrements (RECORD_MODE=record) à servir en priorité')
+    args = parser.parse_args()
+
+    JobBoardHandler.pages = args.pages
+    JobBoardHandler.cards = args.cards
+    JobBoardHandler.initial_cards = args.initial_cards
+    JobBoardHandler.latency = args.latency
+    JobBoardHandler.jitter = args.jitter
+    JobBoardHandler.rate_limit = args.rate_limit
+    JobBoardHandler.rate_window = args.rate_window
+    JobBoardHandler.rotate = args.rotate
+    if args.recordings:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'srcs'))
+        from common.recorder import JOB_PAGES_SITE, PageRecorder
+        JobBoardHandler.recorder = PageRecorder(args.recordings)
+
+    server = ThreadingHTTPServer((args.host, args.port), JobBoardHandler)
+    print(f"🧪 Faux job board sur http://{args.host}:{args.port}/<site>/ — {', '.join(SITES)}")
+    print(f"   JOB_BOARD_BASE_URL=http://{args.host}:{args.port} python srcs/main.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {JobBoardHandler.served} pages servies, {JobBoardHandler.rejected} requêtes limitées (429)")
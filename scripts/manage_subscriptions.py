@@ -0,0 +1,85 @@
+"""
+Gestion des abonnements d'alertes (un webhook Discord par abonné).
+
+Usage:
+  python scripts/manage_subscriptions.py list
+  python scripts/manage_subscriptions.py add "React senior remote" https://discord.com/api/webhooks/... \
+      --tech react --seniority senior --seniority lead --min-remote-days 2
+  python scripts/manage_subscriptions.py add "Stage python" https://... --tech python --contract internship
+  python scripts/manage_subscriptions.py add "Paris" https://... --location paris
+  python scripts/manage_subscriptions.py disable <id>
+  python scripts/manage_subscriptions.py remove <id>
+"""
+
+import argparse
+import os
+import sys
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'srcs'))
+from common.database import subscriptions_collection
+
+
+def list_subscriptions():
+    for sub in subscriptions_collection.find():
+        status = '✅' if sub.get('active', True) else '⏸️'
+        print(f"{status} {sub['_id']}  {sub.get('name', '')}")
+        for field, value in sub.get('rules', {}).items():
+            print(f"      {field}: {value}")
+
+
+def add_subscription(args):
+    rules = {}
+    if args.tech:
+        rules['technologies'] = [t.lower() for t in args.tech]
+    if args.seniority:
+        rules['seniority'] = [s.lower() for s in args.seniority]
+    if args.contract:
+        rules['contract_type'] = [c.lower() for c in args.contract]
+    if args.min_remote_days is not None:
+        rules['min_remote_days'] = args.min_remote_days
+    if args.location:
+        rules['locations'] = args.location
+    if args.keyword:
+        rules['keywords'] = args.keyword
+
+    result = subscriptions_collection.insert_one({
+        'name': args.name,
+        'webhook_url': args.webhook_url,
+        'active': True,
+        'rules': rules,
+    })
+    print(f"✅ Abonnement créé: {result.inserted_id}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gestion des abonnements d'alertes")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list')
+
+    add = commands.add_parser('add')
+    add.add_argument('name')
+    add.add_argument('webhook_url')
+    add.add_argument('--tech', action='append', help='Technologie requise (répétable, toutes requises)')
+    add.add_argument('--seniority', action='append', help='junior, mid, senior, lead (répétable, une parmi)')
+    add.add_argument('--contract', action='append', help='cdi, cdd, freelance, internship, apprenticeship')
+    add.add_argument('--min-remote-days', type=int, help="Jours de télétravail minimum ('full' compte pour 5)")
+    add.add_argument('--location', action='append', help='Sous-chaîne de la localisation (répétable)')
+    add.add_argument('--keyword', action='append', help='Sous-chaîne du titre (répétable)')
+
+    for command in ('disable', 'remove'):
+        commands.add_parser(command).add_argument('id')
+
+    args = parser.parse_args()
+    if args.command == 'list':
+        list_subscriptions()
+    elif args.command == 'add':
+        add_subscription(args)
+    elif args.command == 'disable':
+        subscriptions_collection.update_one({'_id': ObjectId(args.id)}, {'$set': {'active': False}})
+        print("⏸️ Abonnement désactivé")
+    elif args.command == 'remove':
+        subscriptions_collection.delete_one({'_id': ObjectId(args.id)})
+        print("🗑️ Abonnement supprimé")
@@ -0,0 +1,92 @@
+"""
+Script de migration des URLs de jobs vers leur forme canonique (common/urls.py).
+Les jobs enregistrés avec une URL de listing (paramètres de recherche et de
+tracking) sont ré-indexés sur l'URL canonique. Quand plusieurs documents donnent
+la même URL canonique, le plus ancien est gardé (avec la date d'ajout la plus
+ancienne) et les doublons sont supprimés avec leur texte complet. Les claims de
+discovered_urls sont ré-indexés de la même façon.
+
+Usage: python scripts/migrate_canonical_urls.py [--dry-run]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'srcs'))
+from common.database import discovered_urls_collection, job_contents_collection, jobs_collection
+from common.urls import canonical_url
+from pymongo.errors import DuplicateKeyError
+
+
+def migrate_jobs(dry_run):
+    """Ré-indexe les jobs sur leur URL canonique et fusionne les doublons."""
+    total = jobs_collection.count_documents({})
+    print(f"📊 {total} jobs à vérifier")
+
+    rekeyed = 0
+    merged = 0
+    failed = 0
+    projection = {'url': 1, 'source': 1, 'date_added': 1}
+    for i, job in enumerate(jobs_collection.find({}, projection).sort('date_added', 1), 1):
+        url = job.get('url')
+        canonical = canonical_url(url, job.get('source'))
+        if i % 500 == 0:
+            print(f"  [{i}/{total}] vérifiés...")
+        if not url or canonical == url:
+            continue
+        try:
+            # Le premier document rencontré pour une URL canonique garde le job
+            kept = jobs_collection.find_one({'url': canonical, '_id': {'$ne': job['_id']}}, projection)
+            if kept:
+                print(f"  🔗 Doublon: {url} -> {canonical}")
+                if not dry_run:
+                    if job.get('date_added') and (not kept.get('date_added') or job['date_added'] < kept['date_added']):
+                        jobs_collection.update_one({'_id': kept['_id']}, {'$set': {'date_added': job['date_added']}})
+                    jobs_collection.delete_one({'_id': job['_id']})
+                    job_contents_collection.delete_one({'_id': job['_id']})
+                merged += 1
+            else:
+                if not dry_run:
+                    jobs_collection.update_one({'_id': job['_id']}, {'$set': {'url': canonical}})
+                rekeyed += 1
+        except Exception as e:
+            print(f"  ❌ Erreur sur {job['_id']}: {e}")
+            failed += 1
+    return rekeyed, merged, failed
+
+
+def migrate_claims(dry_run):
+    """Remplace les claims de discovered_urls par des claims sur l'URL canonique."""
+    rekeyed = 0
+    for claim in discovered_urls_collection.find({}):
+        canonical = canonical_url(claim['_id'], claim.get('source'))
+        if canonical == claim['_id']:
+            continue
+        rekeyed += 1
+        if dry_run:
+            continue
+        try:
+            discovered_urls_collection.insert_one({**claim, '_id': canonical})
+        except DuplicateKeyError:
+            pass
+        discovered_urls_collection.delete_one({'_id': claim['_id']})
+    return rekeyed
+
+
+if __name__ == '__main__':
+    dry_run = len(sys.argv) > 1 and sys.argv[1] == '--dry-run'
+    print("🚀 Démarrage de la migration des URLs canoniques...")
+    if dry_run:
+        print("🔍 Mode simulation: aucune écriture")
+    print()
+
+    rekeyed, merged, failed = migrate_jobs(dry_run)
+    claims = migrate_claims(dry_run)
+
+    print(f"\n{'='*50}")
+    print("📊 Migration terminée:")
+    print(f"  ✅ Jobs ré-indexés: {rekeyed}")
+    print(f"  🔗 Doublons fusionnés: {merged}")
+    print(f"  🗂 Claims ré-indexés: {claims}")
+    print(f"  ❌ Échecs: {failed}")
+    print(f"{'='*50}")
@@ -0,0 +1,53 @@
+"""
+Script de migration pour sortir le champ full_content des documents de jobs.
+Le texte complet est compressé et déplacé dans la collection job_contents,
+les documents de jobs ne gardent que le résumé affiché par le dashboard.
+"""
+
+import sys
+
+# Import des fonctions de stockage
+sys.path.insert(0, '/app/srcs')
+from common.database import jobs_collection, save_job_content
+
+
+def migrate_full_content():
+    """
+    Déplace full_content de chaque job vers job_contents puis le supprime du job.
+    """
+    query = {'full_content': {'$exists': True}}
+    total = jobs_collection.count_documents(query)
+    print(f"📊 Trouvé {total} jobs avec full_content")
+
+    if total == 0:
+        print("✅ Tous les jobs sont déjà migrés !")
+        return
+
+    moved = 0
+    failed = 0
+
+    for i, job in enumerate(jobs_collection.find(query, {'full_content': 1}), 1):
+        try:
+            text = job.get('full_content') or ''
+            if text:
+                save_job_content(job['_id'], text)
+            jobs_collection.update_one({'_id': job['_id']}, {'$unset': {'full_content': ''}})
+            moved += 1
+            if i % 100 == 0:
+                print(f"  [{i}/{total}] migrés...")
+        except Exception as e:
+            print(f"  ❌ Erreur sur {job['_id']}: {e}")
+            failed += 1
+
+    print(f"\n{'='*50}")
+    print("📊 Migration terminée:")
+    print(f"  ✅ Migrés: {moved}")
+    print(f"  ❌ Échecs: {failed}")
+    print(f"{'='*50}")
+
+
+if __name__ == '__main__':
+    print("🚀 Démarrage de la migration de full_content...")
+    print()
+
+    migrate_full_content()
@@ -0,0 +1,71 @@
+"""
+Rejoue les scrapers sur les pages enregistrées, sans Chrome ni réseau.
+
+Enregistrer une itération (pages de listing et fiches de poste) :
+  RECORD_MODE=record python srcs/main.py
+
+Rejouer :
+  python scripts/replay_scrap.py                         # tous les sites
+  python scripts/replay_scrap.py --site welcome_to_the_jungle --output /tmp/wttj.json
+  python scripts/replay_scrap.py --site "Station F" --site apec
+
+Les jobs trouvés sont analysés mais ni notifiés ni sauvegardés. Le JSON de sortie
+permet de comparer le résultat d'un changement de parser, et les durées par étape
+affichées de mesurer son coût.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ['RECORD_MODE'] = 'replay'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'srcs'))
+from common.recorder import site_slug
+from common.run_summary import start_run
+from main import WEBSITES_TO_SCRAP
+
+
+def replay(websites):
+    run = start_run()
+    results = {}
+    for website in websites:
+        website.replayed_jobs = []
+        run.site_started(website.name)
+        start = time.monotonic()
+        try:
+            website.run_scrap()
+            run.site_finished(website.name)
+        except Exception as e:
+            run.site_finished(website.name, error=e)
+            print(f"❌ {website.name}: {e}")
+        finally:
+            run.add_duration(website.name, 'scrap', time.monotonic() - start)
+        results[website.name] = website.replayed_jobs
+
+    for site in run.to_document()['sites']:
+        durations = ', '.join(f"{stage} {seconds:.3f}s" for stage, seconds in sorted(site['durations'].items()))
+        print(f"📊 {site['site']}: {site['cards_seen']} offres, {len(results[site['site']])} analysées, "
+              f"{site['errors']} erreurs — {durations}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rejoue les scrapers sur les pages enregistrées')
+    parser.add_argument('--site', action='append', help='Nom ou slug du site (répétable, tous par défaut)')
+    parser.add_argument('--output', help='Fichier JSON des jobs extraits')
+    args = parser.parse_args()
+
+    # Même correspondance que main.py --bootstrap : "Station F" ou station_f
+    wanted = {site_slug(name) for name in args.site or []}
+    websites = [w for w in WEBSITES_TO_SCRAP if not wanted or site_slug(w.name) in wanted]
+    if not websites:
+        print(f"❌ Aucun site ne correspond à {args.site}: {', '.join(site_slug(w.name) for w in WEBSITES_TO_SCRAP)}")
+        sys.exit(1)
+    results = replay(websites)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True, default=str)
+        print(f"✅ Résultats écrits dans {args.output}")
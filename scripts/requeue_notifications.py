@@ -0,0 +1,49 @@
+"""
+Notifications de l'outbox abandonnées après OUTBOX_MAX_ATTEMPTS essais.
+
+Usage:
+  python scripts/requeue_notifications.py list
+  python scripts/requeue_notifications.py requeue            # toutes
+  python scripts/requeue_notifications.py requeue --webhook https://discord.com/api/webhooks/...
+  python scripts/requeue_notifications.py requeue --id <clé de la notification>
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'srcs'))
+from common.outbox import failed_notifications, requeue_failed
+
+
+def list_failed(limit):
+    docs = failed_notifications(limit)
+    if not docs:
+        print("✅ Aucune notification abandonnée")
+        return
+    for doc in docs:
+        title = doc.get('embed', {}).get('description', '')
+        print(f"❌ {doc['_id']}  {doc.get('failed_at')}  {doc.get('attempts', 0)} essais  {title}")
+        print(f"      {doc['webhook_url'][:80]}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Notifications abandonnées de l'outbox")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list').add_argument('--limit', type=int, default=100)
+
+    requeue = commands.add_parser('requeue')
+    requeue.add_argument('--webhook', help="Seulement les notifications de ce webhook")
+    requeue.add_argument('--id', help="Seulement cette notification")
+
+    args = parser.parse_args()
+    if args.command == 'list':
+        list_failed(args.limit)
+    elif args.command == 'requeue':
+        query = {}
+        if args.webhook:
+            query['webhook_url'] = args.webhook
+        if args.id:
+            query['_id'] = args.id
+        print(f"🔁 {requeue_failed(query)} notifications remises en file")
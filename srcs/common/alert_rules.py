@@ -0,0 +1,138 @@
+"""
+Subscriber alert rules.
+A subscription sends the jobs matching its rules to its own Discord webhook.
+Rules are stored in the `subscriptions` collection:
+
+    {
+        'name': 'React senior remote',
+        'webhook_url': 'https://discord.com/api/webhooks/...',
+        'active': True,
+        'rules': {
+            'technologies': ['react'],          # toutes requises
+            'seniority': ['senior', 'lead'],    # une parmi
+            'contract_type': ['cdi'],           # une parmi
+            'min_remote_days': 2,               # 'full' compte pour 5, 'hybrid' pour 1
+            'locations': ['paris'],             # sous-chaîne de la localisation, une parmi
+            'keywords': ['python'],             # sous-chaîne du titre, une parmi
+        }
+    }
+
+The rules are compiled into an inverted index keyed by technology, seniority and
+contract type: each subscription is filed under the most selective of its
+conditions, so a job only gets checked against the subscriptions that share one
+of its keys instead of all of them.
+"""
+
+import threading
+import time
+
+from common.database import subscriptions_collection
+
+INDEXED_FIELDS = ('technologies', 'contract_type', 'seniority')  # Par ordre de sélectivité
+REMOTE_DAYS_VALUES = {'full': 5, 'hybrid': 1}
+RELOAD_INTERVAL = 300
+
+
+def _remote_days_value(remote_days):
+    if remote_days is None:
+        return 0
+    if isinstance(remote_days, int):
+        return remote_days
+    return REMOTE_DAYS_VALUES.get(remote_days, 0)
+
+
+class Subscription:
+
+    def __init__(self, doc):
+        rules = doc.get('rules', {})
+        self.id = str(doc['_id'])
+        self.name = doc.get('name', self.id)
+        self.webhook_url = doc['webhook_url']
+        self.technologies = {t.lower() for t in rules.get('technologies', [])}
+        self.seniority = {s.lower() for s in rules.get('seniority', [])}
+        self.contract_type = {c.lower() for c in rules.get('contract_type', [])}
+        self.min_remote_days = rules.get('min_remote_days')
+        self.locations = [l.lower() for l in rules.get('locations', [])]
+        self.keywords = [k.lower() for k in rules.get('keywords', [])]
+
+    def index_keys(self, postings):
+        """Keys to file this subscription under, or [] if no indexed condition."""
+        if self.technologies:
+            # All technologies are required: the rarest one is enough
+            tech = min(sorted(self.technologies), key=lambda t: len(postings.get(('technologies', t), ())))
+            return [('technologies', tech)]
+        if self.contract_type:
+            return [('contract_type', c) for c in self.contract_type]
+        if self.seniority:
+            return [('seniority', s) for s in self.seniority]
+        return []
+
+    def matches(self, job):
+        if self.technologies and not self.technologies.issubset(job.get('technologies') or []):
+            return False
+        if self.seniority and job.get('seniority') not in self.seniority:
+            return False
+        if self.contract_type and job.get('contract_type') not in self.contract_type:
+            return False
+        if self.min_remote_days is not None and _remote_days_value(job.get('remote_days')) < self.min_remote_days:
+            return False
+        if self.locations:
+            location = (job.get('location') or '').lower()
+            if not any(l in location for l in self.locations):
+                return False
+        if self.keywords:
+            name = (job.get('name') or '').lower()
+            if not any(k in name for k in self.keywords):
+                return False
+        return True
+
+
+class RuleIndex:
+    """Inverted index of subscriptions over the job fields."""
+
+    def __init__(self, subscriptions):
+        self.subscriptions = {}
+        self.postings = {}  # (field, value) -> [subscription id]
+        self.unindexed = []
+        for sub in subscriptions:
+            self.subscriptions[sub.id] = sub
+            keys = sub.index_keys(self.postings)
+            if not keys:
+                self.unindexed.append(sub.id)
+            for key in keys:
+                self.postings.setdefault(key, []).append(sub.id)
+
+    def _job_keys(self, job):
+        keys = [('technologies', t) for t in job.get('technologies') or []]
+        keys.append(('contract_type', job.get('contract_type')))
+        keys.append(('seniority', job.get('seniority')))
+        return keys
+
+    def match(self, job):
+        """Return the subscriptions matching the job."""
+        candidates = set(self.unindexed)
+        for key in self._job_keys(job):
+            candidates.update(self.postings.get(key, ()))
+        return [self.subscriptions[sub_id] for sub_id in sorted(candidates)
+                if self.subscriptions[sub_id].matches(job)]
+
+
+class SubscriptionRouter:
+    """Keeps a RuleIndex of the active subscriptions, reloaded from MongoDB every few minutes."""
+
+    def __init__(self, reload_interval=RELOAD_INTERVAL):
+        self.reload_interval = reload_interval
+        self._index = None
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+
+    def _get_index(self):
+        with self._lock:
+            if self._index is None or time.monotonic() - self._loaded_at > self.reload_interval:
+                docs = subscriptions_collection.find({'active': {'$ne': False}})
+                self._index = RuleIndex([Subscription(doc) for doc in docs])
+                self._loaded_at = time.monotonic()
+            return self._index
+
+    def match(self, job):
+        return self._get_index().match(job)
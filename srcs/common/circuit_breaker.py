@@ -0,0 +1,99 @@
+"""
+Per-site circuit breaker.
+A site whose runs keep failing (error, timeout, or no job card at all) stops being
+scraped: after BREAKER_FAILURES consecutive failed runs the breaker opens for
+BREAKER_COOLDOWN seconds. When the cooldown is over, one half-open run is allowed;
+if it succeeds the breaker closes, otherwise it opens again for twice as long, up
+to BREAKER_MAX_COOLDOWN. The state is kept in the `site_state` collection.
+"""
+
+from datetime import datetime, timedelta
+
+from common.constants import BREAKER_COOLDOWN, BREAKER_FAILURES, BREAKER_MAX_COOLDOWN
+from common.database import get_site_states, update_site_state
+from common.metrics import observe_breaker
+from common.run_summary import run_failed
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreakers:
+
+    def __init__(self, websites):
+        try:
+            states = get_site_states()
+        except Exception as e:
+            print(f"Could not load circuit breakers: {e}")
+            states = {}
+        self.breakers = {}
+        for website in websites:
+            self.load(website.name, states.get(website.name, {}))
+
+    def load(self, site, state):
+        """Set the breaker of `site` from its state document (other nodes may have run it)."""
+        breaker = state.get('breaker') or {}
+        self.breakers[site] = {
+            'state': breaker.get('state', CLOSED),
+            'failures': breaker.get('failures', 0),
+            'cooldown': breaker.get('cooldown', 0),
+            'open_until': breaker.get('open_until'),
+        }
+        observe_breaker(site, self.breakers[site]['state'])
+
+    def _save(self, site):
+        breaker = self.breakers[site]
+        observe_breaker(site, breaker['state'])
+        try:
+            update_site_state(site, {'breaker': breaker})
+        except Exception as e:
+            print(f"Could not save circuit breaker of {site}: {e}")
+
+    def blocked_until(self, site):
+        """End of the cooldown of an open breaker, else None."""
+        breaker = self.breakers[site]
+        return breaker['open_until'] if breaker['state'] == OPEN else None
+
+    def allow(self, site, now=None):
+        """Return True if `site` may run; an open breaker past its cooldown goes half-open."""
+        now = now or datetime.now()
+        breaker = self.breakers[site]
+        if breaker['state'] != OPEN:
+            return True
+        if now < breaker['open_until']:
+            return False
+        breaker['state'] = HALF_OPEN
+        self._save(site)
+        print(f"🔌 {site}: circuit half-open, trying one run")
+        return True
+
+    def site_ran(self, site, failed, now=None):
+        now = now or datetime.now()
+        breaker = self.breakers[site]
+        if not failed:
+            if breaker['state'] != CLOSED or breaker['failures']:
+                if breaker['state'] != CLOSED:
+                    print(f"🔌 {site}: circuit closed")
+                breaker.update(state=CLOSED, failures=0, cooldown=0, open_until=None)
+                self._save(site)
+            return
+
+        breaker['failures'] += 1
+        if breaker['state'] == HALF_OPEN:
+            cooldown = min(BREAKER_MAX_COOLDOWN, max(breaker['cooldown'], BREAKER_COOLDOWN) * 2)
+        elif breaker['failures'] >= BREAKER_FAILURES:
+            cooldown = BREAKER_COOLDOWN
+        else:
+            self._save(site)
+            return
+        breaker.update(state=OPEN, cooldown=cooldown, open_until=now + timedelta(seconds=cooldown))
+        print(f"🔌 {site}: circuit open after {breaker['failures']} failed runs, "
+              f"next try in {cooldown / 60:.0f} min")
+        self._save(site)
+
+    def update(self, run):
+        """Count the outcome of every site of a finished run summary document."""
+        for stats in run['sites']:
+            if stats['site'] in self.breakers:
+                self.site_ran(stats['site'], run_failed(stats))
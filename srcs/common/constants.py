@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,3 +14,44 @@ DISCORD_WEBHOOK = os.getenv("WEBHOOK_URL")
 DISCORD_LOG_WEBHOOK = os.getenv("LOG_WEBHOOK_URL")  # Webhook pour les logs
 CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "/usr/bin/chromedriver")
 GOOGLE_CHROME_BIN = os.getenv("GOOGLE_CHROME_BIN", "/usr/bin/chromium")
+LOGS_TTL_DAYS = int(os.getenv("LOGS_TTL_DAYS") or 30)  # Durée de rétention des logs MongoDB
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE") or 1000)
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL") or 2)  # Secondes d'accumulation avant écriture
+DISCORD_MAX_EMBEDS = 10  # Limite Discord d'embeds par message
+NOTIFY_MAX_AGE = float(os.getenv("NOTIFY_MAX_AGE") or 5)  # Intervalle (s) de relève de l'outbox de notifications
+DISCORD_SEND_RETRIES = int(os.getenv("DISCORD_SEND_RETRIES") or 5)  # Nouvelles tentatives sur 429 / 5xx
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE") or 100)  # Taille max de chaque file du pipeline
+PIPELINE_NOTIFY_WORKERS = int(os.getenv("PIPELINE_NOTIFY_WORKERS") or 1)
+PIPELINE_ENRICH_WORKERS = int(os.getenv("PIPELINE_ENRICH_WORKERS") or 4)  # Analyses de fiches en parallèle
+PIPELINE_PERSIST_WORKERS = int(os.getenv("PIPELINE_PERSIST_WORKERS") or 2)
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE") or 50)  # Notifications réclamées par passage
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS") or 8)
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS") or 30)  # Conservation des notifications envoyées
+METRICS_PORT = int(os.getenv("METRICS_PORT") or 9100)  # Port de l'endpoint Prometheus /metrics, 0 pour désactiver
+METRICS_ADDR = os.getenv("METRICS_ADDR") or "127.0.0.1"
+RECORD_MODE = (os.getenv("RECORD_MODE") or "").lower()  # 'record' enregistre les pages, 'replay' les rejoue sans réseau
+RECORDINGS_DIR = os.getenv("RECORDINGS_DIR") or "recordings"
+JOB_BOARD_BASE_URL = os.getenv("JOB_BOARD_BASE_URL")  # Serveur local de test (scripts/fake_job_board.py) à la place des vrais sites
+PROFILE = (os.getenv("PROFILE") or "").lower() in ("1", "true", "yes")  # cProfile + tracemalloc par site et par itération
+PROFILE_DIR = os.getenv("PROFILE_DIR") or "profiles"
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP") or 5)  # Nombre d'itérations profilées conservées
+PROFILE_TOP = int(os.getenv("PROFILE_TOP") or 30)  # Lignes des rapports (fonctions, allocations)
+SCHEDULE_DEFAULT_INTERVAL = int(os.getenv("SCHEDULE_DEFAULT_INTERVAL") or 900)  # Intervalle (s) d'un site sans historique
+SCHEDULE_MIN_INTERVAL = int(os.getenv("SCHEDULE_MIN_INTERVAL") or 300)
+SCHEDULE_MAX_INTERVAL = int(os.getenv("SCHEDULE_MAX_INTERVAL") or 6 * 3600)
+SCHEDULE_TARGET_NEW_JOBS = float(os.getenv("SCHEDULE_TARGET_NEW_JOBS") or 3)  # Nouveaux jobs visés par passage sur un site
+CRAWL_KNOWN_PAGES_STOP = int(os.getenv("CRAWL_KNOWN_PAGES_STOP") or 1)  # Pages consécutives sans nouveau job avant d'arrêter la pagination
+CRAWL_DEEP_INTERVAL = float(os.getenv("CRAWL_DEEP_INTERVAL") or 24)  # Heures entre deux crawls complets
+LISTING_PROBE = (os.getenv("LISTING_PROBE") or "1") != "0"  # Sonde HTTP de la 1re page, le site est sauté si elle n'a pas changé
+LISTING_PROBE_CARDS = int(os.getenv("LISTING_PROBE_CARDS") or 10)  # Cartes dont les liens forment l'empreinte
+SITE_DEADLINE = int(os.getenv("SITE_DEADLINE") or 1800)  # Durée max (s) du scrap d'un site, 0 pour désactiver
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES") or 3)  # Échecs consécutifs avant d'ouvrir le circuit d'un site
+BREAKER_COOLDOWN = int(os.getenv("BREAKER_COOLDOWN") or 3600)  # Première pause (s), doublée à chaque essai raté
+BREAKER_MAX_COOLDOWN = int(os.getenv("BREAKER_MAX_COOLDOWN") or 7 * 24 * 3600)
+NODE_ID = os.getenv("NODE_ID") or f"{socket.gethostname()}-{os.getpid()}"  # Identifiant du nœud pour les baux des sites
+CLAIM_RETENTION_DAYS = int(os.getenv("CLAIM_RETENTION_DAYS") or 90)  # Conservation des URLs réclamées à la découverte
+CLAIM_TIMEOUT = int(os.getenv("CLAIM_TIMEOUT") or 1800)  # Délai (s) après lequel un claim jamais sauvegardé est repris
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD") or 0.7)  # Similarité à partir de laquelle deux offres sont la même, 0 pour désactiver
+BOOTSTRAP_BATCH_SIZE = int(os.getenv("BOOTSTRAP_BATCH_SIZE") or 100)  # Jobs écrits par bulk_write pendant un bootstrap
+SITE_QUERIES = os.getenv("SITE_QUERIES")  # JSON {"<slug du site>": [{"champ": "valeur"}, ...]}, remplace les recherches par défaut
+LEASE_TTL = int(os.getenv("LEASE_TTL") or 300)  # Durée (s) d'un bail sans heartbeat avant qu'un autre nœud reprenne le site
@@ -1,25 +1,145 @@
-from common.constants import MONGO_URL
+from common.constants import MONGO_URL, LOGS_TTL_DAYS, OUTBOX_RETENTION_DAYS, CLAIM_RETENTION_DAYS, CLAIM_TIMEOUT, NODE_ID
+from common.metrics import MongoCommandMetrics
+from common.urls import canonical_url
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
-from datetime import datetime
+from datetime import datetime, timedelta
+import zlib
 
 # client = pymongo.MongoClient(MONGO_URL)
 uri = MONGO_URL
-client = MongoClient(uri, server_api=ServerApi('1'), tlsAllowInvalidCertificates=True)
+client = MongoClient(uri, server_api=ServerApi('1'), tlsAllowInvalidCertificates=True,
+                     event_listeners=[MongoCommandMetrics()])
 
 db = client.jobs_database
 jobs_collection = db.jobs_collection
 logs_collection = db.logs
+job_contents_collection = db.job_contents
+outbox_collection = db.notification_outbox
+subscriptions_collection = db.subscriptions
+runs_collection = db.runs
+site_state_collection = db.site_state
+site_leases_collection = db.site_leases
+# Une entrée par URL découverte, _id = URL : l'insertion unique sert de verrou
+discovered_urls_collection = db.discovered_urls
+# Signatures MinHash du premier job de chaque groupe de doublons (common/dedup.py)
+job_signatures_collection = db.job_signatures
+
+# Fields the UI needs to list jobs. The page text lives in job_contents_collection
+# and the 2000 chars `description` is only kept for the search filter.
+JOB_SUMMARY_PROJECTION = {
+    'url': 1,
+    'name': 1,
+    'company': 1,
+    'location': 1,
+    'thumbnail': 1,
+    'technologies': 1,
+    'seniority': 1,
+    'years_experience': 1,
+    'contract_type': 1,
+    'remote': 1,
+    'remote_days': 1,
+    'salary': 1,
+    'source': 1,
+    'date_scraped': 1,
+    'date_added': 1,
+}
+
+def ensure_indexes():
+    """Create the indexes the scraper relies on. Safe to call at every startup."""
+    try:
+        # Les logs expirent au lieu de grossir sans limite
+        logs_collection.create_index('timestamp', expireAfterSeconds=LOGS_TTL_DAYS * 24 * 3600)
+    except Exception as e:
+        print(f"Could not create TTL index on logs: {e}")
+
+    # Outbox: file des notifications à envoyer, les envoyées expirent
+    outbox_collection.create_index([('status', 1), ('next_attempt', 1)])
+    outbox_collection.create_index('created_at')
+    outbox_collection.create_index('delivered_at', expireAfterSeconds=OUTBOX_RETENTION_DAYS * 24 * 3600)
+    # Les notifications abandonnées restent le même temps, pour pouvoir les remettre en file
+    outbox_collection.create_index('failed_at', expireAfterSeconds=OUTBOX_RETENTION_DAYS * 24 * 3600)
+
+    runs_collection.create_index('started_at')
+
+    # Clé des upserts de jobs (save_job, save_jobs par lots)
+    jobs_collection.create_index('url')
+
+    # Un document d'état par site (planification, profondeur de crawl...)
+    site_state_collection.create_index('site', unique=True)
+    # Baux des sites entre nœuds : les baux expirés sont libres, Mongo finit par les supprimer
+    site_leases_collection.create_index('expires_at', expireAfterSeconds=0)
+    # Passé ce délai, jobs_collection suffit à reconnaître les URLs déjà traitées
+    discovered_urls_collection.create_index('discovered_at', expireAfterSeconds=CLAIM_RETENTION_DAYS * 24 * 3600)
+    # Recherche des candidats doublons par bande LSH
+    job_signatures_collection.create_index('bands')
+
+def get_site_states():
+    """Return the persisted state of every site, by site name."""
+    return {doc['site']: doc for doc in site_state_collection.find({}, {'_id': 0})}
+
+def get_site_state(site):
+    """Return the persisted state of `site` (empty dict if none)."""
+    return site_state_collection.find_one({'site': site}, {'_id': 0}) or {}
+
+def update_site_state(site, fields):
+    """Set `fields` (dotted paths allowed) in the state document of `site`."""
+    site_state_collection.update_one({'site': site}, {'$set': fields}, upsert=True)
 
 def is_url_in_database(url):
     """Return True if the given URL is already in our MongoDB database."""
-    return jobs_collection.find_one({'url': url}) is not None
+    return jobs_collection.find_one({'url': canonical_url(url)}) is not None
 
 def add_url_in_database(url):
     """Add an URL into our MongoDB database (minimal entry, will be enriched later)."""
     # Ne rien faire ici - le save_job s'en chargera avec toutes les données
     pass
 
+def claim_url(url, source=''):
+    """
+    Atomically claim a newly discovered job URL. Return True only for the caller
+    whose insert created the claim: any other worker or node seeing the same card
+    gets False, so a job is notified and enriched once.
+    The claim stays 'claimed' until the job is saved (complete_claims) or dropped as
+    a duplicate. A claim still 'claimed' after CLAIM_TIMEOUT seconds belongs to a job
+    lost on the way (process killed, deadline) and is taken over by the next caller.
+    """
+    now = datetime.now()
+    try:
+        discovered_urls_collection.insert_one({
+            '_id': url,
+            'source': source,
+            'node': NODE_ID,
+            'status': 'claimed',
+            'claimed_at': now,
+            'discovered_at': now,
+        })
+    except DuplicateKeyError:
+        taken_over = discovered_urls_collection.find_one_and_update(
+            {'_id': url, 'status': 'claimed', 'claimed_at': {'$lt': now - timedelta(seconds=CLAIM_TIMEOUT)}},
+            {'$set': {'node': NODE_ID, 'claimed_at': now}},
+        )
+        if taken_over is None:
+            return False
+    # Jobs sauvegardés avant les claims, ou dont le claim a expiré
+    if jobs_collection.find_one({'url': url}, {'_id': 1}) is not None:
+        complete_claims([url])
+        return False
+    return True
+
+def complete_claims(urls):
+    """Mark the claims of jobs that went through the pipeline (saved or linked as duplicates)."""
+    discovered_urls_collection.update_many(
+        {'_id': {'$in': list(urls)}},
+        {'$set': {'status': 'done', 'done_at': datetime.now()}}
+    )
+
+def release_claim(url):
+    """Drop the claim of a job the pipeline failed on, so the next run picks it up again."""
+    discovered_urls_collection.delete_one({'_id': url, 'status': 'claimed'})
+
 def save_job(job_data):
     """
     Save a complete job with all details.
@@ -31,21 +151,111 @@ def save_job(job_data):
     job_data['date_scraped'] = datetime.now()
     if 'date_added' not in job_data:
         job_data['date_added'] = datetime.now()
-    
+
+    # Le texte complet part dans job_contents, pas dans le document du job
+    full_content = job_data.pop('full_content', None)
+    # Même clé que le claim de la découverte
+    job_data['url'] = canonical_url(job_data.get('url'), job_data.get('source'))
+
     # Upsert: met à jour si existe, insère sinon
-    existing = jobs_collection.find_one({'url': job_data.get('url')})
+    existing = jobs_collection.find_one({'url': job_data.get('url')}, {'_id': 1})
     if existing:
         # Met à jour avec les données enrichies
         jobs_collection.update_one(
-            {'url': job_data.get('url')},
+            {'_id': existing['_id']},
             {'$set': job_data}
         )
-        return True
+        job_id = existing['_id']
     else:
         # Insère nouveau
-        jobs_collection.insert_one(job_data)
-        return True
-    return False
+        job_id = jobs_collection.insert_one(job_data).inserted_id
+
+    if full_content:
+        save_job_content(job_id, full_content)
+    merge_duplicates([job_data['url']])
+    return True
+
+def save_jobs(jobs_data):
+    """
+    Save a batch of complete jobs with one bulk write (bootstrap runs).
+    Same fields as save_job(); the date_added of an existing job is kept.
+    """
+    now = datetime.now()
+    operations = []
+    urls = []
+    contents = {}
+    for job_data in jobs_data:
+        job_data = dict(job_data, date_scraped=now)
+        date_added = job_data.pop('date_added', now)
+        full_content = job_data.pop('full_content', None)
+        job_data['url'] = canonical_url(job_data.get('url'), job_data.get('source'))
+        urls.append(job_data['url'])
+        operations.append(UpdateOne(
+            {'url': job_data['url']},
+            {'$set': job_data, '$setOnInsert': {'date_added': date_added}},
+            upsert=True
+        ))
+        if full_content:
+            contents[job_data['url']] = full_content
+    if not operations:
+        return 0
+    jobs_collection.bulk_write(operations, ordered=False)
+
+    if contents:
+        ids = {doc['url']: doc['_id'] for doc in jobs_collection.find({'url': {'$in': list(contents)}}, {'url': 1})}
+        content_operations = [
+            UpdateOne({'_id': ids[url]}, {'$set': _content_fields(text)}, upsert=True)
+            for url, text in contents.items() if url in ids
+        ]
+        if content_operations:
+            job_contents_collection.bulk_write(content_operations, ordered=False)
+    merge_duplicates(urls)
+    return len(operations)
+
+def merge_duplicates(urls):
+    """
+    Copy to the jobs of `urls` the duplicates linked to their cluster signature
+    (dedup.link_duplicate) while they were still in the pipeline. Read after the job
+    is written, so a duplicate linked at the same time is never missed.
+    """
+    operations = [
+        UpdateOne({'url': signature['_id']}, {'$addToSet': {
+            'duplicate_urls': {'$each': signature['duplicate_urls']},
+            'duplicate_sources': {'$each': signature.get('duplicate_sources', [])},
+        }})
+        for signature in job_signatures_collection.find(
+            {'_id': {'$in': list(urls)}, 'duplicate_urls': {'$exists': True}},
+            {'duplicate_urls': 1, 'duplicate_sources': 1})
+    ]
+    if operations:
+        jobs_collection.bulk_write(operations, ordered=False)
+
+def is_database_empty():
+    """Return True if no job is saved yet (fresh install), from the collection metadata."""
+    return jobs_collection.estimated_document_count() == 0
+
+def _content_fields(text):
+    return {
+        'content': zlib.compress(text.encode('utf-8'), 6),
+        'codec': 'zlib',
+        'size': len(text),
+        'date_updated': datetime.now(),
+    }
+
+def save_job_content(job_id, text):
+    """Store the full text of a job page, zlib-compressed, under the job's _id."""
+    job_contents_collection.update_one(
+        {'_id': job_id},
+        {'$set': _content_fields(text)},
+        upsert=True
+    )
+
+def get_job_content(job_id):
+    """Return the full text of a job page, or None if it was never stored."""
+    doc = job_contents_collection.find_one({'_id': job_id})
+    if not doc:
+        return None
+    return zlib.decompress(doc['content']).decode('utf-8')
 
 def get_jobs(filters=None, limit=100, skip=0):
     """
@@ -88,7 +298,7 @@ def get_jobs(filters=None, limit=100, skip=0):
                 {'company': {'$regex': filters['search'], '$options': 'i'}}
             ]
     
-    cursor = jobs_collection.find(query).sort('date_scraped', -1).skip(skip).limit(limit)
+    cursor = jobs_collection.find(query, JOB_SUMMARY_PROJECTION).sort('date_scraped', -1).skip(skip).limit(limit)
     return list(cursor)
 
 def get_distinct_values(field):
@@ -122,7 +332,9 @@ def get_stats():
     }
 
 def log_to_db(level, message, website='', extra_data=None):
-    """Save a log entry to MongoDB"""
+    """Queue a log entry for MongoDB, written in batches by the log sink"""
+    from common.log_sink import log_sink
+
     log_entry = {
         'timestamp': datetime.now(),
         'level': level,
@@ -130,7 +342,11 @@ def log_to_db(level, message, website='', extra_data=None):
         'website': website,
         'extra_data': extra_data or {}
     }
-    logs_collection.insert_one(log_entry)
+    log_sink.put_entry(log_entry)
+
+def insert_logs(log_entries):
+    """Write a batch of log entries to MongoDB"""
+    logs_collection.insert_many(log_entries, ordered=False)
 
 def get_logs(limit=100, level=None, website=None):
     """Get recent logs with optional filters"""
@@ -0,0 +1,136 @@
+"""
+Cross-site near-duplicate detection of jobs.
+The same offer is often published on several sites under different URLs. Each
+enriched job gets a MinHash signature over the word 3-grams of its normalized
+title, company, location and description. The signature is cut into LSH bands: two
+jobs sharing a band are candidates, and a candidate is a duplicate when it comes
+from another site, the similarity estimated from the signatures reaches
+DEDUP_THRESHOLD and the titles are close. Two offers of the same site are never
+merged: a site lists an offer once, so look-alikes there (same role in two cities,
+reposted templates) are distinct offers.
+Only the first job of each cluster is indexed, in the `job_signatures` collection
+(_id = its URL, multikey index on the bands), so a lookup is a single indexed query
+whatever the size of the corpus. A duplicate is not notified nor saved again: its
+URL and source are recorded on the signature of its cluster, and copied to the job
+of the cluster, now if it is saved or by save_job() when it is (the first job of a
+cluster may still be in the pipeline when its duplicate reaches the dedup stage).
+"""
+
+import hashlib
+import random
+import re
+import unicodedata
+from datetime import datetime
+
+from common.constants import DEDUP_THRESHOLD
+from common.database import job_signatures_collection, jobs_collection
+
+NUM_PERMUTATIONS = 128
+BANDS = 16  # 16 bandes de 8 lignes : candidats à partir d'environ 0.7 de similarité
+ROWS = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+TITLE_SIMILARITY = 0.5  # Titres trop différents : deux postes d'une même entreprise au descriptif commun
+
+_PRIME = (1 << 61) - 1
+_random = random.Random(42)  # Graine fixe : les signatures doivent rester comparables d'un lancement à l'autre
+_PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation."""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+def shingles(text):
+    """Word n-grams of a normalized text, hashed to 64-bit integers."""
+    words = normalize(text).split()
+    if len(words) < SHINGLE_SIZE:
+        grams = {' '.join(words)} if words else set()
+    else:
+        grams = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return {int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'big') for gram in grams}
+
+
+def minhash(hashed_shingles):
+    """MinHash signature of a set of hashed shingles (None for an empty set)."""
+    if not hashed_shingles:
+        return None
+    return [min((a * h + b) % _PRIME for h in hashed_shingles) for a, b in _PERMUTATIONS]
+
+
+def lsh_bands(signature):
+    """One key per band of the signature."""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(repr(rows).encode('ascii'), digest_size=8).hexdigest()
+        keys.append(f'{band}:{digest}')
+    return keys
+
+
+def similarity(signature, other):
+    """Jaccard similarity estimated from two signatures."""
+    return sum(a == b for a, b in zip(signature, other)) / NUM_PERMUTATIONS
+
+
+def title_similarity(title, other):
+    words, other_words = set(title.split()), set(other.split())
+    if not words or not other_words:
+        return 0.0
+    return len(words & other_words) / len(words | other_words)
+
+
+def job_text(job_data):
+    return ' '.join(job_data.get(field) or '' for field in ('name', 'company', 'location', 'description'))
+
+
+class DedupIndex:
+
+    def __init__(self, collection=job_signatures_collection, threshold=DEDUP_THRESHOLD):
+        self.collection = collection
+        self.threshold = threshold
+
+    def find_cluster(self, signature, title, source=None):
+        """URL of the indexed job of another source than `source` that `signature` duplicates, or None."""
+        best, best_score = None, self.threshold
+        query = {'bands': {'$in': lsh_bands(signature)}, 'source': {'$ne': source}}
+        for candidate in self.collection.find(query, {'signature': 1, 'title': 1}):
+            score = similarity(signature, candidate['signature'])
+            if score >= best_score and title_similarity(title, candidate.get('title', '')) >= TITLE_SIMILARITY:
+                best, best_score = candidate['_id'], score
+        return best
+
+    def add(self, url, signature, title, source):
+        self.collection.update_one(
+            {'_id': url},
+            {'$set': {'bands': lsh_bands(signature), 'signature': signature, 'title': title,
+                      'source': source, 'indexed_at': datetime.now()}},
+            upsert=True,
+        )
+
+    def check(self, job_data):
+        """
+        Return the URL of the cluster `job_data` belongs to, or None if the job is the
+        first of its cluster (it is then indexed).
+        """
+        signature = minhash(shingles(job_text(job_data)))
+        if signature is None:
+            return None
+        title = normalize(job_data.get('name'))
+        cluster = self.find_cluster(signature, title, job_data.get('source'))
+        if cluster is None or cluster == job_data['url']:
+            self.add(job_data['url'], signature, title, job_data.get('source'))
+            return None
+        return cluster
+
+
+def link_duplicate(cluster_url, job_data):
+    """Add the URL and source of a duplicate to the signature and the job of its cluster."""
+    duplicate = {'$addToSet': {'duplicate_urls': job_data['url'], 'duplicate_sources': job_data.get('source')}}
+    # La signature d'abord : un job pas encore sauvegardé la relira dans save_job()
+    job_signatures_collection.update_one({'_id': cluster_url}, duplicate)
+    jobs_collection.update_one({'url': cluster_url}, duplicate)
+
+
+dedup_index = DedupIndex()
@@ -1,20 +1,23 @@
-from discord_webhook import DiscordWebhook
+from discord_webhook import DiscordEmbed
 from common.constants import DISCORD_LOG_WEBHOOK
 from common.database import log_to_db
+from common.log_sink import log_sink
 import datetime
 
 
-def send_log(message, level="INFO"):
+def send_log(message, level="INFO", website=''):
     """
     Envoie un log vers le channel Discord dédié ET vers MongoDB.
+    L'envoi est asynchrone: le log est mis en file et écrit par le log sink.
     
     Args:
         message: Le message à logger
         level: Niveau de log (INFO, SUCCESS, WARNING, ERROR)
+        website: Nom du site concerné (optionnel)
     """
     
     # Log to MongoDB
-    log_to_db(level, message)
+    log_to_db(level, message, website)
     
     if not DISCORD_LOG_WEBHOOK:
         print(f"[LOG - {level}] {message}")
@@ -47,15 +50,7 @@ def send_log(message, level="INFO"):
     
     color = colors.get(level, "0x95a5a6")
     
-    # Créer le webhook
-    webhook = DiscordWebhook(
-        url=DISCORD_LOG_WEBHOOK,
-        username="Job Scrapper Logger",
-        avatar_url="https://cdn-icons-png.flaticon.com/512/2922/2922506.png"
-    )
-    
     # Créer l'embed
-    from discord_webhook import DiscordEmbed
     embed = DiscordEmbed(
         title=f"{emoji} {level}",
         description=message,
@@ -64,41 +59,50 @@ def send_log(message, level="INFO"):
     embed.set_timestamp()
     embed.set_footer(text=f"Dev Jobs Scrapper • {timestamp}")
     
-    webhook.add_embed(embed)
-    
-    try:
-        response = webhook.execute()
-        if response.status_code != 200:
-            print(f"Erreur envoi log Discord: {response.status_code}")
-    except Exception as e:
-        print(f"Exception envoi log: {e}")
+    # Regroupé avec les autres logs dans un message multi-embeds
+    log_sink.put_embed(embed)
 
 
-def log_scrap_start(website_name):
-    """Log le début d'un scraping"""
-    send_log(f"Démarrage du scraping de **{website_name}**", "SCRAP_START")
-
-
-def log_scrap_end(website_name, jobs_found=0):
-    """Log la fin d'un scraping"""
-    send_log(f"Scraping de **{website_name}** terminé • {jobs_found} job(s) trouvé(s)", "SCRAP_END")
+def log_error(website_name, error_message):
+    """Log une erreur"""
+    send_log(f"Erreur lors du scraping de **{website_name}**:\n```{error_message}```", "ERROR", website_name)
 
 
-def log_job_sent(job_name, job_company, website_name):
-    """Log quand un job est envoyé sur Discord"""
-    send_log(f"Nouveau job envoyé: **{job_name}** chez **{job_company}** (via {website_name})", "JOB_FOUND")
+def log_warning(message):
+    """Log un avertissement"""
+    send_log(message, "WARNING")
 
 
-def log_error(website_name, error_message):
-    """Log une erreur"""
-    send_log(f"Erreur lors du scraping de **{website_name}**:\n```{error_message}```", "ERROR")
+def log_run_summary(run):
+    """Log le résumé d'une itération: un seul embed avec une ligne par site"""
+    totals = run['totals']
+    message = (f"Itération terminée en {run['duration']:.0f}s • {totals['cards_seen']} offre(s) vue(s) • "
+               f"{totals['new_jobs']} nouveau(x) job(s) • {totals['errors']} erreur(s)")
 
+    log_to_db("RUN_SUMMARY", message, extra_data={'totals': totals})
 
-def log_iteration_start():
-    """Log le début d'une itération"""
-    send_log("🚀 Nouvelle itération de scraping lancée", "INFO")
+    if not DISCORD_LOG_WEBHOOK:
+        print(f"[LOG - RUN_SUMMARY] {message}")
+        for site in run['sites']:
+            print(f"  {site['site']}: {site['cards_seen']} vues, {site['new_jobs']} nouveaux, "
+                  f"{site['errors']} erreurs ({site['status']})")
+        return
 
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    embed = DiscordEmbed(
+        title="📊 Résumé de l'itération",
+        description=message,
+        color="0x1abc9c" if not totals['errors'] else "0xf39c12"
+    )
+    # Discord accepte 25 champs par embed
+    for site in run['sites'][:25]:
+        status = "❌" if site['status'] == 'error' else "✅"
+        scrap_time = site['durations'].get('scrap', 0)
+        embed.add_embed_field(
+            name=f"{status} {site['site']}",
+            value=f"🃏 {site['cards_seen']} • 🎯 {site['new_jobs']} • ❌ {site['errors']} • ⏱ {scrap_time:.0f}s"
+        )
+    embed.set_timestamp()
+    embed.set_footer(text=f"Dev Jobs Scrapper • {timestamp}")
 
-def log_warning(message):
-    """Log un avertissement"""
-    send_log(message, "WARNING")
+    log_sink.put_embed(embed)
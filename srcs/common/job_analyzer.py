@@ -9,16 +9,23 @@ import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
+from common.recorder import JOB_PAGES_SITE, is_recording, is_replaying, page_recorder
+
 def fetch_job_page(url, timeout=10):
     """
     Récupère le contenu HTML d'une fiche de poste.
+    En mode replay, la page enregistrée est relue sans accès réseau (None si absente).
     """
+    if is_replaying():
+        return page_recorder.load(JOB_PAGES_SITE, url)
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         response = requests.get(url, headers=headers, timeout=timeout)
         response.raise_for_status()
+        if is_recording():
+            page_recorder.record(JOB_PAGES_SITE, url, response.text)
         return response.text
     except Exception as e:
         print(f"Error fetching job page {url}: {e}")
@@ -332,12 +339,18 @@ def extract_remote_days(text):
     
     return None
 
-def analyze_job_page(url, basic_info=None):
+def analyze_job_page(url, basic_info=None, fetch_stats=None):
     """
     Analyse complète d'une fiche de poste.
+    Si `fetch_stats` est un dict, il reçoit la durée ('fetch_time') et la taille
+    ('bytes') du téléchargement de la page.
     """
     # Récupérer le contenu de la page
+    fetch_start = time.monotonic()
     html_content = fetch_job_page(url)
+    if fetch_stats is not None:
+        fetch_stats['fetch_time'] = time.monotonic() - fetch_start
+        fetch_stats['bytes'] = len(html_content.encode('utf-8')) if html_content else 0
     
     # Nettoyer le nom de l'entreprise
     company_name = clean_company_name(basic_info.get('company', '') if basic_info else '')
@@ -0,0 +1,88 @@
+"""
+Distribution of the sites across several scrapper nodes (docker compose replicas).
+Before running a due site, a node claims its lease in the `site_leases` collection:
+a document per site with an owner and an expiry, taken atomically when it is free
+or expired. While the node runs the site, a heartbeat thread extends its leases
+every LEASE_TTL / 3 seconds; a node that dies stops renewing and its sites are
+claimed by another node once LEASE_TTL has passed. If a lease is taken over while
+the site is still running here, the local run is cancelled so the site never runs
+on two nodes at once.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from common.constants import LEASE_TTL, NODE_ID
+from common.database import site_leases_collection
+
+
+class LeaseManager:
+
+    def __init__(self, node_id=NODE_ID, ttl=LEASE_TTL):
+        self.node_id = node_id
+        self.ttl = ttl
+        self._held = {}  # site -> Website en cours sur ce nœud
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def acquire(self, website):
+        """Claim the lease of `website`. Return False if another node holds it."""
+        now = datetime.now()
+        try:
+            site_leases_collection.find_one_and_update(
+                {'_id': website.name, '$or': [{'owner': self.node_id}, {'expires_at': {'$lt': now}}]},
+                {'$set': {'owner': self.node_id, 'acquired_at': now, 'expires_at': now + timedelta(seconds=self.ttl)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # Le document existe et un autre nœud détient un bail valide
+            return False
+        except Exception as e:
+            # Sans Mongo il n'y a pas de coordination possible : le nœud travaille seul
+            print(f"Could not claim the lease of {website.name}, running anyway: {e}")
+        with self._lock:
+            self._held[website.name] = website
+        self.start()
+        return True
+
+    def release(self, website):
+        with self._lock:
+            self._held.pop(website.name, None)
+        try:
+            site_leases_collection.delete_one({'_id': website.name, 'owner': self.node_id})
+        except Exception as e:
+            print(f"Could not release the lease of {website.name}: {e}")
+
+    def release_all(self):
+        with self._lock:
+            websites = list(self._held.values())
+        for website in websites:
+            self.release(website)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._heartbeat, name='lease-heartbeat', daemon=True)
+            self._thread.start()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.ttl / 3)
+            with self._lock:
+                held = dict(self._held)
+            for site, website in held.items():
+                try:
+                    result = site_leases_collection.update_one(
+                        {'_id': site, 'owner': self.node_id},
+                        {'$set': {'expires_at': datetime.now() + timedelta(seconds=self.ttl)}},
+                    )
+                except Exception as e:
+                    print(f"Could not renew the lease of {site}: {e}")
+                    continue
+                if result.matched_count == 0:
+                    print(f"⚠️ Lease of {site} taken over by another node, cancelling the local run")
+                    with self._lock:
+                        self._held.pop(site, None)
+                    website.cancel()
@@ -0,0 +1,108 @@
+"""
+Background sink for the scraper logs.
+Log entries and Discord log embeds are put in a bounded queue and written by a
+worker thread: MongoDB inserts are batched with insert_many and Discord embeds
+are grouped into multi-embed messages. Callers never wait on the network.
+"""
+
+import queue
+import threading
+import time
+
+from common.constants import DISCORD_LOG_WEBHOOK, DISCORD_MAX_EMBEDS, LOG_QUEUE_SIZE, LOG_FLUSH_INTERVAL
+from common.database import insert_logs
+
+MAX_BATCH_SIZE = 200
+
+
+class LogSink:
+
+    def __init__(self, maxsize=LOG_QUEUE_SIZE, flush_interval=LOG_FLUSH_INTERVAL):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='log-sink', daemon=True)
+                self._thread.start()
+
+    def _put(self, item):
+        self._start()
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # Never block the scraper for a log line
+            self.dropped += 1
+
+    def put_entry(self, entry):
+        """Queue a log document for MongoDB."""
+        self._put(('db', entry))
+
+    def put_embed(self, embed):
+        """Queue a DiscordEmbed for the log channel."""
+        if DISCORD_LOG_WEBHOOK:
+            self._put(('discord', embed))
+
+    def _next_batch(self):
+        """Block for a first item, then gather what arrives during flush_interval."""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < MAX_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"Exception log sink: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _write(self, batch):
+        entries = [payload for kind, payload in batch if kind == 'db']
+        embeds = [payload for kind, payload in batch if kind == 'discord']
+
+        if entries:
+            try:
+                insert_logs(entries)
+            except Exception as e:
+                print(f"Exception insertion logs MongoDB: {e}")
+
+        for i in range(0, len(embeds), DISCORD_MAX_EMBEDS):
+            self._send_embeds(embeds[i:i + DISCORD_MAX_EMBEDS])
+
+    def _send_embeds(self, embeds):
+        # Import tardif: common.webhook importe lui-même le logger
+        from common.webhook import discord_sender, build_payload
+
+        payload = build_payload(
+            embeds,
+            "Job Scrapper Logger",
+            "https://cdn-icons-png.flaticon.com/512/2922/2922506.png"
+        )
+        discord_sender.submit(DISCORD_LOG_WEBHOOK, payload)
+
+    def flush(self, timeout=10):
+        """Wait until everything queued so far is written, at most `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if self.dropped:
+            print(f"Log sink: {self.dropped} log(s) dropped, queue was full")
+
+
+log_sink = LogSink()
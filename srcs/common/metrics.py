@@ -0,0 +1,120 @@
+"""
+Prometheus metrics of the scraper, served on http://METRICS_ADDR:METRICS_PORT/metrics.
+Site counters and stage durations are fed by common.run_summary, Mongo command
+latencies by a pymongo command listener and webhook calls by DiscordSender.
+"""
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from pymongo import monitoring
+
+from common.constants import METRICS_ADDR, METRICS_PORT
+
+# Les compteurs de run_summary, avec le nom exposé à Prometheus
+SITE_COUNTERS = {
+    'pages': Counter('scraper_pages_fetched_total', 'Listing pages fetched', ['site']),
+    'cards_seen': Counter('scraper_cards_parsed_total', 'Job cards parsed on listing pages', ['site']),
+    'new_jobs': Counter('scraper_new_jobs_total', 'New jobs notified', ['site']),
+    'bytes_fetched': Counter('scraper_fetched_bytes_total', 'Bytes of HTML fetched (listing and job pages)', ['site']),
+    'probe_skips': Counter('scraper_probe_skips_total', 'Runs skipped because the first listing page did not change', ['site']),
+    'bootstrapped_jobs': Counter('scraper_bootstrapped_jobs_total', 'Jobs saved without notification by a bootstrap run', ['site']),
+    'duplicates': Counter('scraper_duplicate_jobs_total', 'New jobs found to be a near-duplicate of a known job', ['site']),
+}
+
+ERRORS = Counter('scraper_errors_total', 'Errors while scraping or processing jobs', ['site', 'error'])
+STAGE_SECONDS = Histogram(
+    'scraper_stage_seconds', 'Time spent in a stage (driver_start, page_load, parse, enrich...)', ['site', 'stage'],
+    buckets=(0.005, 0.025, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+MONGO_SECONDS = Histogram(
+    'scraper_mongo_command_seconds', 'MongoDB command latency', ['command', 'collection'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+MONGO_FAILURES = Counter('scraper_mongo_command_failures_total', 'Failed MongoDB commands', ['command'])
+WEBHOOK_SECONDS = Histogram(
+    'scraper_webhook_request_seconds', 'Discord webhook HTTP request latency',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+WEBHOOK_RESPONSES = Counter('scraper_webhook_responses_total', 'Discord webhook responses', ['status'])
+DISCORD_QUEUE_DEPTH = Gauge('scraper_discord_queue_depth', 'Messages waiting in the Discord sender queue')
+PIPELINE_QUEUE_DEPTH = Gauge('scraper_pipeline_queue_depth', 'Jobs waiting in a pipeline stage queue', ['stage'])
+OUTBOX_PENDING = Gauge('scraper_outbox_pending', 'Notifications pending in the outbox, at the end of the last iteration')
+OUTBOX_FAILED = Gauge('scraper_outbox_failed', 'Notifications given up after OUTBOX_MAX_ATTEMPTS, waiting for a requeue or expiry')
+LAST_RUN_SECONDS = Gauge('scraper_last_run_seconds', 'Duration of the last iteration')
+LAST_RUN_CARDS = Gauge('scraper_last_run_cards', 'Job cards parsed by a site during the last iteration', ['site'])
+SITE_INTERVAL = Gauge('scraper_site_interval_seconds', 'Current scheduling interval of a site', ['site'])
+BREAKER_STATE = Gauge('scraper_circuit_state', 'Circuit breaker of a site: 0 closed, 1 half-open, 2 open', ['site'])
+CRAWL_DEPTH = Gauge('scraper_crawl_depth_pages', 'Listing pages crawled by a site during its last run', ['site'])
+
+
+def inc_site_counter(site, counter, n=1):
+    if counter in SITE_COUNTERS:
+        SITE_COUNTERS[counter].labels(site=site).inc(n)
+
+
+def inc_error(site, error_class):
+    ERRORS.labels(site=site, error=error_class).inc()
+
+
+def observe_stage(site, stage, seconds):
+    STAGE_SECONDS.labels(site=site, stage=stage).observe(seconds)
+
+
+def observe_webhook(status, seconds):
+    """Record a webhook call; `status` is the HTTP status or 'error' when no response came back."""
+    WEBHOOK_RESPONSES.labels(status=str(status)).inc()
+    if seconds is not None:
+        WEBHOOK_SECONDS.observe(seconds)
+
+
+def track_queues(discord_sender, pipeline):
+    """Read the queue depths when /metrics is scraped."""
+    DISCORD_QUEUE_DEPTH.set_function(discord_sender.queue_depth)
+    for stage in pipeline.stages:
+        PIPELINE_QUEUE_DEPTH.labels(stage=stage.name).set_function(stage.queue.qsize)
+
+
+def observe_run(run, outbox_pending, outbox_failed=0):
+    """Gauges of the last iteration, so a site silently returning 0 cards can be alerted on."""
+    LAST_RUN_SECONDS.set(run['duration'])
+    for site in run['sites']:
+        LAST_RUN_CARDS.labels(site=site['site']).set(site['cards_seen'])
+    OUTBOX_PENDING.set(outbox_pending)
+    OUTBOX_FAILED.set(outbox_failed)
+
+
+def observe_schedule(site, interval):
+    SITE_INTERVAL.labels(site=site).set(interval)
+
+
+def observe_breaker(site, state):
+    BREAKER_STATE.labels(site=site).set({'closed': 0, 'half_open': 1, 'open': 2}[state])
+
+
+def observe_crawl_depth(site, pages):
+    CRAWL_DEPTH.labels(site=site).set(pages)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command sent by the client."""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._collections[event.request_id] = collection if isinstance(collection, str) else ''
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, '')
+        MONGO_SECONDS.labels(command=event.command_name, collection=collection).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self._collections.pop(event.request_id, None)
+        MONGO_FAILURES.labels(command=event.command_name).inc()
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """Serve /metrics from a background thread. A port of 0 disables the endpoint."""
+    if port:
+        start_http_server(port, addr=METRICS_ADDR)
+        print(f"Metrics served on http://{METRICS_ADDR}:{port}/metrics")
@@ -0,0 +1,194 @@
+"""
+Persistent notification outbox.
+Every notification is written once in MongoDB with an idempotency key, then a
+delivery worker drains the outbox in batches: up to DISCORD_MAX_EMBEDS embeds per
+webhook message, retried with exponential backoff. A notification claimed by a
+process that died is picked up again once its lease expires, so nothing is lost
+across restarts, and the key makes sure a job is never queued twice.
+After OUTBOX_MAX_ATTEMPTS a notification is marked failed: it can be put back in
+the queue with requeue_failed() (scripts/requeue_notifications.py), otherwise it
+expires after OUTBOX_RETENTION_DAYS like the delivered ones.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from common.constants import (
+    DISCORD_MAX_EMBEDS, NOTIFY_MAX_AGE, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS
+)
+from common.database import outbox_collection
+
+LEASE_SECONDS = 120  # Temps laissé à un worker pour envoyer un lot réclamé
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 3600
+
+
+def enqueue_notification(key, webhook_url, username, avatar_url, embed):
+    """
+    Write a notification in the outbox. `embed` is the JSON form of the embed.
+    Return False if a notification with this key was already queued.
+    """
+    try:
+        outbox_collection.insert_one({
+            '_id': key,
+            'webhook_url': webhook_url,
+            'username': username,
+            'avatar_url': avatar_url,
+            'embed': embed,
+            'status': 'pending',
+            'attempts': 0,
+            'created_at': datetime.now(),
+            'next_attempt': datetime.now(),
+        })
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def failed_notifications(limit=100):
+    """Notifications given up after OUTBOX_MAX_ATTEMPTS, most recent first."""
+    return list(outbox_collection.find({'status': 'failed'}).sort('failed_at', -1).limit(limit))
+
+
+def requeue_failed(query=None):
+    """Put failed notifications back in the queue with a fresh attempt count. Return how many."""
+    result = outbox_collection.update_many(
+        {**(query or {}), 'status': 'failed'},
+        {'$set': {'status': 'pending', 'attempts': 0, 'next_attempt': datetime.now()},
+         '$unset': {'failed_at': ''}}
+    )
+    return result.modified_count
+
+
+class OutboxWorker:
+    """
+    Delivers the outbox through `sender`, any object with a blocking
+    send(url, payload) -> (delivered, http_time) method.
+    """
+
+    def __init__(self, sender, build_payload, poll_interval=NOTIFY_MAX_AGE, batch_size=OUTBOX_BATCH_SIZE):
+        self.sender = sender
+        self.build_payload = build_payload
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._enqueued_since_wake = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='outbox', daemon=True)
+                self._thread.start()
+
+    def enqueue(self, key, webhook_url, username, avatar_url, embed):
+        """Queue a notification and make sure the worker is running."""
+        created = enqueue_notification(key, webhook_url, username, avatar_url, embed)
+        if created:
+            self.start()
+            with self._lock:
+                self._enqueued_since_wake += 1
+                # A full Discord message is ready, no need to wait for the poll
+                if self._enqueued_since_wake >= DISCORD_MAX_EMBEDS:
+                    self._wake.set()
+        return created
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=self.poll_interval)
+            self._wake.clear()
+            with self._lock:
+                self._enqueued_since_wake = 0
+            try:
+                while self.deliver_due():
+                    pass
+            except Exception as e:
+                print(f"Exception outbox delivery: {e}")
+
+    def _claim_batch(self):
+        now = datetime.now()
+        claimed = []
+        for _ in range(self.batch_size):
+            doc = outbox_collection.find_one_and_update(
+                {'$or': [
+                    {'status': 'pending', 'next_attempt': {'$lte': now}},
+                    {'status': 'sending', 'lease_until': {'$lt': now}},
+                ]},
+                {'$set': {'status': 'sending', 'lease_until': now + timedelta(seconds=LEASE_SECONDS)}},
+                sort=[('created_at', ASCENDING)],
+            )
+            if doc is None:
+                break
+            claimed.append(doc)
+        return claimed
+
+    def deliver_due(self):
+        """Send one batch of due notifications. Return the number of notifications claimed."""
+        claimed = self._claim_batch()
+
+        groups = {}
+        for doc in claimed:
+            groups.setdefault((doc['webhook_url'], doc['username'], doc['avatar_url']), []).append(doc)
+
+        for (webhook_url, username, avatar_url), docs in groups.items():
+            for i in range(0, len(docs), DISCORD_MAX_EMBEDS):
+                chunk = docs[i:i + DISCORD_MAX_EMBEDS]
+                self._deliver_chunk(webhook_url, username, avatar_url, chunk)
+
+        return len(claimed)
+
+    def _deliver_chunk(self, webhook_url, username, avatar_url, chunk):
+        payload = self.build_payload([doc['embed'] for doc in chunk], username, avatar_url)
+        delivered, _, status = self.sender.send(webhook_url, payload)
+        if delivered:
+            self._mark_delivered(chunk)
+        elif len(chunk) > 1 and status and 400 <= status < 500 and status != 429:
+            # Message refusé : un seul embed invalide ne doit pas coûter un essai aux autres
+            for doc in chunk:
+                self._deliver_chunk(webhook_url, username, avatar_url, [doc])
+        else:
+            self._mark_failed(chunk)
+
+    def _mark_delivered(self, docs):
+        outbox_collection.update_many(
+            {'_id': {'$in': [doc['_id'] for doc in docs]}},
+            {'$set': {'status': 'delivered', 'delivered_at': datetime.now()},
+             '$unset': {'lease_until': ''}}
+        )
+
+    def _mark_failed(self, docs):
+        for doc in docs:
+            attempts = doc.get('attempts', 0) + 1
+            delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+            update = {
+                'status': 'failed' if attempts >= OUTBOX_MAX_ATTEMPTS else 'pending',
+                'attempts': attempts,
+                'next_attempt': datetime.now() + timedelta(seconds=delay),
+            }
+            if update['status'] == 'failed':
+                # Point de départ de l'expiration des notifications abandonnées
+                update['failed_at'] = datetime.now()
+            outbox_collection.update_one(
+                {'_id': doc['_id']},
+                {'$set': update, '$unset': {'lease_until': ''}}
+            )
+
+    def pending_count(self):
+        return outbox_collection.count_documents({'status': {'$in': ['pending', 'sending']}})
+
+    def failed_count(self):
+        return outbox_collection.count_documents({'status': 'failed'})
+
+    def flush(self, timeout=30):
+        """Deliver what is due now, from the calling thread, for at most `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+        try:
+            while time.monotonic() < deadline and self.deliver_due():
+                pass
+        except Exception as e:
+            print(f"Exception outbox flush: {e}")
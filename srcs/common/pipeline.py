@@ -0,0 +1,101 @@
+"""
+Small threaded pipeline: stages connected by bounded queues.
+Each stage has its own worker threads. put() blocks when the stage queue is full,
+which slows the producer down instead of letting work pile up in memory.
+"""
+
+import queue
+import threading
+import time
+import traceback
+
+
+class Stage:
+
+    def __init__(self, name, handler, workers=1, maxsize=100):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.next_stage = None
+        self.processed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        for i in range(len(self._threads), self.workers):
+            thread = threading.Thread(target=self._run, name=f'{self.name}-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def put(self, item):
+        self.queue.put(item)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            start = time.monotonic()
+            try:
+                result = self.handler(item)
+                ok = True
+            except Exception as e:
+                print(f"Pipeline stage '{self.name}' failed: {e}")
+                traceback.print_exc()
+                result, ok = None, False
+
+            with self._lock:
+                self.busy_time += time.monotonic() - start
+                if ok:
+                    self.processed += 1
+                else:
+                    self.failed += 1
+
+            try:
+                # A handler returning None drops the item
+                if ok and result is not None and self.next_stage:
+                    self.next_stage.put(result)
+            finally:
+                self.queue.task_done()
+
+    def stats(self, elapsed):
+        with self._lock:
+            done = self.processed + self.failed
+            return {
+                'workers': self.workers,
+                'queue_depth': self.queue.qsize(),
+                'processed': self.processed,
+                'failed': self.failed,
+                'per_second': self.processed / elapsed if elapsed > 0 else 0,
+                'avg_seconds': self.busy_time / done if done else 0,
+            }
+
+
+class Pipeline:
+
+    def __init__(self, stages):
+        self.stages = stages
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next_stage = next_stage
+        self.started_at = None
+        self._lock = threading.Lock()
+
+    def submit(self, item):
+        """Feed an item to the first stage, blocking while its queue is full."""
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = time.monotonic()
+            for stage in self.stages:
+                stage.start()
+        self.stages[0].put(item)
+
+    def join(self):
+        """Wait until every submitted item went through all the stages."""
+        for stage in self.stages:
+            stage.queue.join()
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0
+        return {stage.name: stage.stats(elapsed) for stage in self.stages}
@@ -0,0 +1,143 @@
+"""
+Profiling hooks, off by default (PROFILE=1 or `python srcs/main.py --profile`).
+Each iteration gets a directory PROFILE_DIR/<timestamp>/ with, per site:
+  - <site>.prof / <site>.txt: cProfile of the site scrap (listing pages, parsing,
+    send_embed), as a pstats file and its top PROFILE_TOP functions by cumulative time
+  - <site>.alloc.txt: tracemalloc peak and top PROFILE_TOP allocation sites
+    still alive at the end of the scrap (pipeline threads included)
+  - <site>.pipeline.prof / .pipeline.txt: cProfile of the pipeline work of the
+    site's jobs (notification, job page analysis, routing, save), all workers merged
+Only the last PROFILE_KEEP iterations are kept. When disabled, the hooks only cost
+a flag check.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import shutil
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from common.constants import PROFILE, PROFILE_DIR, PROFILE_KEEP, PROFILE_TOP
+from common.recorder import site_slug
+
+_enabled = PROFILE
+_iteration_dir = None
+_pipeline_stats = {}  # site -> pstats.Stats des jobs de l'itération
+_lock = threading.Lock()
+_local = threading.local()  # site profilé par le thread courant
+
+
+def enable_profiling():
+    global _enabled
+    _enabled = True
+
+
+def _rotate():
+    if not os.path.isdir(PROFILE_DIR):
+        return
+    iterations = sorted(name for name in os.listdir(PROFILE_DIR) if os.path.isdir(os.path.join(PROFILE_DIR, name)))
+    for name in iterations[:max(0, len(iterations) - PROFILE_KEEP)]:
+        shutil.rmtree(os.path.join(PROFILE_DIR, name), ignore_errors=True)
+
+
+def start_profiled_iteration():
+    """Open the report directory of a new iteration and drop the oldest ones."""
+    global _iteration_dir
+    if not _enabled:
+        return
+    _iteration_dir = os.path.join(PROFILE_DIR, datetime.now().strftime('%Y%m%dT%H%M%S'))
+    os.makedirs(_iteration_dir, exist_ok=True)
+    _rotate()
+    with _lock:
+        _pipeline_stats.clear()
+    print(f"🔬 Profiling enabled, reports in {_iteration_dir}")
+
+
+def _write_stats(stats, path):
+    stats.dump_stats(path + '.prof')
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+    with open(path + '.txt', 'w', encoding='utf-8') as f:
+        f.write(out.getvalue())
+
+
+def _write_allocations(snapshot, peak, path):
+    with open(path + '.alloc.txt', 'w', encoding='utf-8') as f:
+        f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n")
+        f.write(f"Top {PROFILE_TOP} allocation sites still alive at the end of the scrap:\n")
+        for stat in snapshot.statistics('lineno')[:PROFILE_TOP]:
+            f.write(f"{stat}\n")
+
+
+@contextmanager
+def _profile_site(site):
+    profile = cProfile.Profile()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    _local.site = site
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        _local.site = None
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+        path = os.path.join(_iteration_dir, site_slug(site))
+        try:
+            _write_stats(pstats.Stats(profile), path)
+            _write_allocations(snapshot, peak, path)
+        except Exception as e:
+            print(f"Could not write profile of {site}: {e}")
+
+
+def profile_site(site):
+    """Context manager profiling the scrap of `site`; a no-op when profiling is off."""
+    if not _enabled or _iteration_dir is None:
+        return nullcontext()
+    return _profile_site(site)
+
+
+def profile_call(site, func, *args):
+    """Call func(*args), adding its profile to the pipeline profile of `site` when profiling is on."""
+    if not _enabled or _iteration_dir is None or getattr(_local, 'site', None):
+        # Déjà couvert par le profil du site (rejeu) : un second profiler remplacerait le premier
+        return func(*args)
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Un autre profiler est déjà actif
+        return func(*args)
+    try:
+        return func(*args)
+    finally:
+        profile.disable()
+        with _lock:
+            if site in _pipeline_stats:
+                _pipeline_stats[site].add(profile)
+            else:
+                _pipeline_stats[site] = pstats.Stats(profile)
+
+
+def finish_profiled_iteration():
+    """Write the pipeline profiles of the iteration, once its jobs are processed."""
+    if not _enabled or _iteration_dir is None:
+        return
+    with _lock:
+        stats = dict(_pipeline_stats)
+        _pipeline_stats.clear()
+    for site, site_stats in stats.items():
+        try:
+            _write_stats(site_stats, os.path.join(_iteration_dir, f'{site_slug(site)}.pipeline'))
+        except Exception as e:
+            print(f"Could not write pipeline profile of {site}: {e}")
@@ -0,0 +1,123 @@
+"""
+Record and replay of fetched pages.
+With RECORD_MODE=record, every listing page_source and job page HTML is saved
+gzip-compressed under RECORDINGS_DIR/<site>/<url hash>/<timestamp>.html.gz, and
+listed in RECORDINGS_DIR/manifest.jsonl. With RECORD_MODE=replay, Website and
+fetch_job_page read the latest recording of each URL instead of using Chrome or
+the network, so parsing and analysis can be measured on the same pages every time.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+from common.constants import RECORD_MODE, RECORDINGS_DIR
+
+JOB_PAGES_SITE = 'job_pages'  # Les fiches de poste, toutes sources confondues
+
+
+class RecordingNotFound(LookupError):
+    pass
+
+
+def site_slug(site):
+    return re.sub(r'[^a-z0-9]+', '_', site.lower()).strip('_')
+
+
+def _url_key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+
+
+class PageRecorder:
+
+    def __init__(self, directory=RECORDINGS_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _url_dir(self, site, url):
+        return os.path.join(self.directory, site_slug(site), _url_key(url))
+
+    def record(self, site, url, html):
+        """Save a page and add it to the manifest. Return the file path."""
+        timestamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        url_dir = self._url_dir(site, url)
+        os.makedirs(url_dir, exist_ok=True)
+        path = os.path.join(url_dir, f'{timestamp}.html.gz')
+        data = html.encode('utf-8')
+        with gzip.open(path, 'wb') as f:
+            f.write(data)
+        with self._lock, open(os.path.join(self.directory, 'manifest.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'site': site,
+                'url': url,
+                'timestamp': timestamp,
+                'path': os.path.relpath(path, self.directory),
+                'bytes': len(data),
+            }) + '\n')
+        return path
+
+    def load(self, site, url):
+        """Return the latest recording of `url`, or None."""
+        url_dir = self._url_dir(site, url)
+        if not os.path.isdir(url_dir):
+            return None
+        recordings = sorted(name for name in os.listdir(url_dir) if name.endswith('.html.gz'))
+        if not recordings:
+            return None
+        with gzip.open(os.path.join(url_dir, recordings[-1]), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def entries(self, site=None):
+        """Manifest entries, optionally for one site only."""
+        path = os.path.join(self.directory, 'manifest.jsonl')
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        return [entry for entry in entries if site is None or entry['site'] == site]
+
+
+class _ReplayElement:
+
+    def click(self):
+        pass
+
+
+class ReplayDriver:
+    """Stands in for the Chrome driver: serves a recorded page_source, every browser action is a no-op."""
+
+    def __init__(self, page_source):
+        self.page_source = page_source
+
+    def get(self, url):
+        pass
+
+    def set_page_load_timeout(self, timeout):
+        pass
+
+    def execute_script(self, script, *args):
+        return 0
+
+    def find_element(self, *args):
+        return _ReplayElement()
+
+    def find_elements(self, *args):
+        return []
+
+    def quit(self):
+        pass
+
+
+def is_recording():
+    return RECORD_MODE == 'record'
+
+
+def is_replaying():
+    return RECORD_MODE == 'replay'
+
+
+page_recorder = PageRecorder()
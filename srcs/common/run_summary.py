@@ -0,0 +1,141 @@
+"""
+Per-iteration run summary and telemetry.
+Counters (pages and cards seen, new jobs, bytes fetched, errors by class) and stage
+durations (driver start, page load, waits, scroll, page_source, parse, analysis,
+database, Discord...) are accumulated per site during an iteration, then written
+as one document in the `runs` collection and sent as one Discord log embed,
+instead of a log message per event.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from common.database import runs_collection
+from common.discord_logger import log_run_summary
+from common.metrics import inc_error, inc_site_counter, observe_stage
+
+COUNTERS = ('pages', 'cards_seen', 'new_jobs', 'bytes_fetched', 'errors')
+
+_current = None
+
+
+class RunSummary:
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self._start = time.monotonic()
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def _site(self, site):
+        if site not in self._sites:
+            self._sites[site] = {
+                'site': site,
+                'status': 'not_run',
+                'error': None,
+                'durations': {},
+                'error_classes': {},
+                **{counter: 0 for counter in COUNTERS},
+            }
+        return self._sites[site]
+
+    def site_started(self, site):
+        with self._lock:
+            self._site(site)['status'] = 'running'
+
+    def site_finished(self, site, error=None):
+        with self._lock:
+            stats = self._site(site)
+            stats['status'] = 'error' if error else 'ok'
+            if error:
+                stats['error'] = str(error)[:500]
+        if error:
+            self.add_error(site, error)
+
+    def add_error(self, site, error):
+        """Count an error; exceptions are also counted by class."""
+        name = type(error).__name__ if isinstance(error, BaseException) else 'Error'
+        inc_error(site, name)
+        with self._lock:
+            stats = self._site(site)
+            stats['errors'] += 1
+            stats['error_classes'][name] = stats['error_classes'].get(name, 0) + 1
+
+    def add(self, site, counter, n=1):
+        inc_site_counter(site, counter, n)
+        with self._lock:
+            self._site(site)[counter] = self._site(site).get(counter, 0) + n
+
+    def add_duration(self, site, stage, seconds):
+        observe_stage(site, stage, seconds)
+        with self._lock:
+            durations = self._site(site)['durations']
+            durations[stage] = durations.get(stage, 0) + seconds
+
+    def to_document(self):
+        with self._lock:
+            sites = [dict(stats, durations=dict(stats['durations']), error_classes=dict(stats['error_classes']))
+                     for stats in self._sites.values()]
+        return {
+            'started_at': self.started_at,
+            'finished_at': datetime.now(),
+            'duration': time.monotonic() - self._start,
+            'sites': sites,
+            'totals': {counter: sum(site[counter] for site in sites) for counter in COUNTERS},
+        }
+
+    def finish(self, extra=None):
+        """Persist the run document and send the consolidated Discord embed."""
+        doc = self.to_document()
+        doc.update(extra or {})
+        try:
+            runs_collection.insert_one(doc)
+        except Exception as e:
+            print(f"Could not save run summary: {e}")
+        log_run_summary(doc)
+        return doc
+
+
+def run_failed(stats):
+    """
+    A site failed in a run when it raised or timed out, or saw no card without being
+    skipped by the listing probe. Shared by the scheduler and the circuit breakers.
+    """
+    return stats['status'] == 'error' or (not stats['cards_seen'] and not stats.get('probe_skips'))
+
+
+def start_run():
+    """Start collecting a new iteration and return its summary."""
+    global _current
+    _current = RunSummary()
+    return _current
+
+
+def record(site, counter, n=1):
+    """Add `n` to a counter of the current run, if any."""
+    if _current is not None:
+        _current.add(site, counter, n)
+
+
+def record_duration(site, stage, seconds):
+    """Add time spent by `site` in `stage` to the current run, if any."""
+    if _current is not None:
+        _current.add_duration(site, stage, seconds)
+
+
+def record_error(site, error):
+    """Count an error of `site` in the current run, by exception class."""
+    if _current is not None:
+        _current.add_error(site, error)
+
+
+@contextmanager
+def stage(site, name):
+    """Time the enclosed block as stage `name` of `site`."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        record_duration(site, name, time.monotonic() - start)
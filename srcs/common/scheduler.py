@@ -0,0 +1,118 @@
+"""
+Per-site scheduling: each site has its own interval and next run time instead of
+a global sleep after a full pass.
+After each run, the new-job rate of the site (exponential moving average, in jobs
+per hour) sets its interval so that a run finds about SCHEDULE_TARGET_NEW_JOBS
+new jobs; a failed run doubles the interval. Intervals stay within
+[SCHEDULE_MIN_INTERVAL, SCHEDULE_MAX_INTERVAL] and change by at most x2 per run.
+The schedule is kept in the `site_state` collection so a restart does not reset it.
+Sites whose circuit breaker is open are not due before the end of its cooldown.
+"""
+
+from datetime import datetime, timedelta
+
+from common.constants import (
+    SCHEDULE_DEFAULT_INTERVAL, SCHEDULE_MAX_INTERVAL, SCHEDULE_MIN_INTERVAL, SCHEDULE_TARGET_NEW_JOBS,
+)
+from common.database import get_site_states, update_site_state
+from common.metrics import observe_schedule
+from common.run_summary import run_failed
+
+RATE_SMOOTHING = 0.3  # Poids du dernier passage dans la moyenne du taux de nouveaux jobs
+
+
+def _clamp(interval):
+    return max(SCHEDULE_MIN_INTERVAL, min(SCHEDULE_MAX_INTERVAL, interval))
+
+
+class SiteScheduler:
+
+    def __init__(self, websites, breakers=None):
+        self.websites = websites
+        self.breakers = breakers
+        try:
+            states = get_site_states()
+        except Exception as e:
+            print(f"Could not load site schedules: {e}")
+            states = {}
+        self.schedules = {}
+        for website in websites:
+            self.load(website.name, states.get(website.name, {}))
+
+    def load(self, site, state):
+        """Set the schedule of `site` from its state document (other nodes may have run it)."""
+        schedule = state.get('schedule') or {}
+        self.schedules[site] = {
+            'interval': _clamp(schedule.get('interval', SCHEDULE_DEFAULT_INTERVAL)),
+            'next_run': schedule.get('next_run', datetime.now()),
+            'last_run': schedule.get('last_run'),
+            'job_rate': schedule.get('job_rate'),
+            'error_streak': schedule.get('error_streak', 0),
+        }
+        observe_schedule(site, self.schedules[site]['interval'])
+
+    def is_due(self, site, now=None):
+        return self.schedules[site]['next_run'] <= (now or datetime.now())
+
+    def postpone(self, site, seconds):
+        """Check `site` again in `seconds`, without saving it (another node is running it)."""
+        self.schedules[site]['next_run'] = datetime.now() + timedelta(seconds=seconds)
+
+    def due_sites(self, now=None):
+        """Websites whose next run time has passed, most overdue first."""
+        now = now or datetime.now()
+        due = [w for w in self.websites if self.schedules[w.name]['next_run'] <= now
+               and (self.breakers is None or self.breakers.allow(w.name, now))]
+        return sorted(due, key=lambda w: self.schedules[w.name]['next_run'])
+
+    def _next_run(self, site):
+        next_run = self.schedules[site]['next_run']
+        blocked_until = self.breakers.blocked_until(site) if self.breakers else None
+        return max(next_run, blocked_until) if blocked_until else next_run
+
+    def seconds_until_next_run(self, now=None):
+        now = now or datetime.now()
+        next_run = min(self._next_run(site) for site in self.schedules)
+        return max(0.0, (next_run - now).total_seconds())
+
+    def site_ran(self, site, new_jobs, failed, now=None, bootstrap=False):
+        """Adapt the interval of `site` to the outcome of the run that just finished."""
+        now = now or datetime.now()
+        schedule = self.schedules[site]
+        interval = schedule['interval']
+        if bootstrap and not failed:
+            # Tout le listing était nouveau : ce n'est pas le rythme de publication du site
+            schedule['error_streak'] = 0
+            schedule['last_run'] = now
+            new_interval = interval
+        elif failed:
+            schedule['error_streak'] += 1
+            new_interval = interval * 2
+        else:
+            schedule['error_streak'] = 0
+            elapsed = (now - schedule['last_run']).total_seconds() if schedule['last_run'] else interval
+            rate = new_jobs * 3600 / max(elapsed, 1)
+            if schedule['job_rate'] is not None:
+                rate = RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * schedule['job_rate']
+            schedule['job_rate'] = rate
+            new_interval = SCHEDULE_TARGET_NEW_JOBS * 3600 / rate if rate else interval * 2
+            new_interval = max(interval / 2, min(interval * 2, new_interval))
+            schedule['last_run'] = now
+        schedule['interval'] = _clamp(new_interval)
+        schedule['next_run'] = now + timedelta(seconds=schedule['interval'])
+        observe_schedule(site, schedule['interval'])
+        try:
+            update_site_state(site, {'schedule': schedule})
+        except Exception as e:
+            print(f"Could not save schedule of {site}: {e}")
+
+    def update(self, run):
+        """Reschedule the sites of a finished run summary document."""
+        for stats in run['sites']:
+            if stats['site'] not in self.schedules:
+                continue
+            self.site_ran(stats['site'], stats['new_jobs'], run_failed(stats), bootstrap=bool(stats.get('bootstrap')))
+            schedule = self.schedules[stats['site']]
+            rate = f"{schedule['job_rate']:.2f}/h" if schedule['job_rate'] is not None else 'n/a'
+            print(f"🗓 {stats['site']}: {stats['new_jobs']} new jobs, rate {rate}, "
+                  f"next run in {schedule['interval'] / 60:.0f} min")
@@ -0,0 +1,194 @@
+"""
+Canonical job URLs, used as the dedup key of the jobs (discovery claims, save_job).
+Listing links carry search and tracking parameters (?q=, refId, trackingId,
+position...) that change between runs, so the same job would look new every time.
+canonical_url() drops the fragment and the tracking parameters (utm_*, fbclid,
+ref...), lowercases the host, removes the default port and the trailing slash, and
+for each site reduces the link to the stable job ID:
+  - LinkedIn: /jobs/view/<slug>-<id>/?refId=...  ->  /jobs/view/<id>
+  - Indeed: /rc/clk?jk=<id>&..., /pagead/clk?...&jk=<id>  ->  /viewjob?jk=<id>
+  - Welcome to the Jungle, Job Teaser: the job path (its slug or uuid is the ID),
+    without query string, under the /fr/ locale
+  - APEC: .../detail-offre/<id>?motsCles=...  ->  .../detail-offre/<id>
+  - LesJeudis, Cadremploi, Station F: the job path, without query string
+    (Cadremploi's detail_offre?offreId=<id> keeps the offreId)
+Search parameters (q, page, start...) are only dropped on the sites that use them
+(SITE_SEARCH_PARAMS): elsewhere they may identify the page.
+The rules are matched on the path, so they also apply to the links of the fake job
+board (JOB_BOARD_BASE_URL).
+"""
+
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Paramètres de tracking, retirés quel que soit le site
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'xtor', 'ref', 'refid', 'src',
+    'trackingid', 'tracking_id', 'trk',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# Paramètres de recherche et de pagination propres à chaque site : ils changent d'une recherche à l'autre sans changer l'offre
+SITE_SEARCH_PARAMS = {
+    'LinkedIn': {'keywords', 'location', 'geoid', 'position', 'pagenum', 'start', 'currentjobid', 'f_tpr'},
+    'Indeed France': {'q', 'l', 'start', 'from', 'tk', 'vjk', 'sid', 'searchid', 'advn', 'fccid'},
+    'Welcome to the Jungle': {'q', 'o', 'query', 'page', 'metier', 'aroundquery'},
+    'Job Teaser': {'q', 'page', 'position_category_uuid', 'location', 'search_id'},
+    'APEC': {'motscles', 'lieux', 'page', 'selectedindex', 'sorttype', 'xtmc', 'xtnp', 'xtcr'},
+    'LesJeudis': {'q', 'l', 'p', 'page', 'start'},
+    'Cadremploi': {'recherche', 'page', 'p', 'o', 'origin'},
+    'Station F': {'query', 'page', 'p'},
+    'Keljob': {'q', 'l', 'p', 'page'},
+}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+LINKEDIN_JOB = re.compile(r'/jobs/view/(?:[^/]*-)?(\d+)(?:/|$)')
+INDEED_CLICK = re.compile(r'/(?:rc/clk|pagead/clk|viewjob)/?$')
+
+
+def _is_tracking(name, search_params=()):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name in search_params or name.startswith(TRACKING_PREFIXES)
+
+
+def _linkedin(host, path, params):
+    match = LINKEDIN_JOB.search(path)
+    if not match:
+        return host, path, params
+    if host.endswith('linkedin.com'):
+        host = 'www.linkedin.com'
+    return host, f'{path[:match.start()]}/jobs/view/{match.group(1)}', []
+
+
+def _indeed(host, path, params):
+    job_id = dict(params).get('jk') or dict(params).get('vjk')
+    if not job_id:
+        return host, path, params
+    return host, INDEED_CLICK.sub('/viewjob', path), [('jk', job_id)]
+
+
+def _job_path(marker):
+    # La locale précède le chemin de l'offre : /en/companies/... -> /fr/companies/...
+    locale = re.compile(r'/[a-z]{2}(?=' + re.escape(marker) + ')')
+
+    def rule(host, path, params):
+        if marker not in path:
+            return host, path, params
+        return host, locale.sub('/fr', path, count=1), []
+    return rule
+
+
+def _job_id(pattern, id_param=None):
+    """Rule of the sites whose job path ends with the ID: the path is cut after it and the query dropped."""
+    job = re.compile(pattern)
+
+    def rule(host, path, params):
+        if id_param:
+            for name, value in params:
+                if name.lower() == id_param and value:
+                    return host, path, [(name, value)]
+        match = job.search(path)
+        if not match:
+            return host, path, params
+        return host, path[:match.end()], []
+    return rule
+
+
+SITE_RULES = {
+    'LinkedIn': _linkedin,
+    'Indeed France': _indeed,
+    'Welcome to the Jungle': _job_path('/companies/'),
+    'Job Teaser': _job_path('/job-offers/'),
+    'APEC': _job_id(r'/detail-offre/[^/]+'),
+    'LesJeudis': _job_id(r'/job/[^/]+'),
+    'Cadremploi': _job_id(r'/(?:emploi/)?offre/[^/]+', id_param='offreid'),
+    'Station F': _job_id(r'/companies/[^/]+/jobs/[^/]+'),
+}
+
+SITE_DOMAINS = {
+    'linkedin.com': 'LinkedIn',
+    'indeed.com': 'Indeed France',
+    'welcometothejungle.com': 'Welcome to the Jungle',
+    'jobteaser.com': 'Job Teaser',
+    'apec.fr': 'APEC',
+    'lesjeudis.com': 'LesJeudis',
+    'cadremploi.fr': 'Cadremploi',
+    'stationf.co': 'Station F',
+    'keljob.com': 'Keljob',
+}
+
+
+def canonical_url(url, site=None):
+    """
+    Return the canonical form of a job URL. `site` is the website name; without it,
+    the rule of the site is guessed from the host. URLs that cannot be parsed are
+    returned as is.
+    """
+    if not url:
+        return url
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{port}'
+
+    if site not in SITE_SEARCH_PARAMS:
+        site = _guess_site(host)
+    rule = SITE_RULES.get(site)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    path = parts.path
+    if rule:
+        host, path, params = rule(host, path, params)
+
+    path = re.sub(r'/{2,}', '/', path).rstrip('/')
+    search_params = SITE_SEARCH_PARAMS.get(site, ())
+    params = sorted((name, value) for name, value in params if not _is_tracking(name, search_params))
+    return urlunsplit((scheme, host, path, urlencode(params), ''))
+
+
+def _guess_site(host):
+    host = host.split(':')[0]
+    for domain, site in SITE_DOMAINS.items():
+        if host == domain or host.endswith('.' + domain):
+            return site
+    return None
+
+
+# Test
+if __name__ == '__main__':
+    # Une même offre trouvée par deux recherches doit donner une seule clé (claims, _seen_urls du run)
+    same_offer = [
+        ('LinkedIn', 'https://www.linkedin.com/jobs/view/dev-python-at-acme-3791/?refId=a1&trackingId=b2&position=1&pageNum=0',
+                     'https://fr.linkedin.com/jobs/view/3791?keywords=backend&geoId=105015875&position=7'),
+        ('Indeed France', 'https://fr.indeed.com/rc/clk?jk=4f2a&from=serp&q=developpeur&l=Paris',
+                          'https://fr.indeed.com/pagead/clk?mo=r&vjk=4f2a&q=python&start=10'),
+        ('Welcome to the Jungle', 'https://www.welcometothejungle.com/fr/companies/acme/jobs/dev-python_paris?q=dev&o=1',
+                                  'https://www.welcometothejungle.com/en/companies/acme/jobs/dev-python_paris?q=python'),
+        ('Job Teaser', 'https://www.jobteaser.com/fr/job-offers/9b1c-dev?position_category_uuid=a&location=Paris',
+                       'https://www.jobteaser.com/en/job-offers/9b1c-dev?page=2'),
+        ('APEC', 'https://www.apec.fr/candidat/recherche-emploi.html/emploi/detail-offre/176543210W?motsCles=developpeur&lieux=91',
+                 'https://www.apec.fr/candidat/recherche-emploi.html/emploi/detail-offre/176543210W?motsCles=python&page=3&xtor=AL-1'),
+        ('LesJeudis', 'https://www.lesjeudis.com/job/5521-dev-python?q=developpeur&l=Paris',
+                      'https://www.lesjeudis.com/job/5521-dev-python?q=python&p=2'),
+        ('Cadremploi', 'https://www.cadremploi.fr/emploi/offre/8812-dev-python?recherche=developpeur_logiciel_paris',
+                       'https://www.cadremploi.fr/emploi/offre/8812-dev-python/?recherche=python&page=2&utm_source=mail'),
+        ('Station F', 'https://jobs.stationf.co/companies/acme/jobs/dev-python?query=dev',
+                      'https://jobs.stationf.co/companies/acme/jobs/dev-python?query=python&page=2'),
+    ]
+    for site, first, second in same_offer:
+        key = canonical_url(first, site)
+        assert key == canonical_url(second, site), f"{site}: {key} != {canonical_url(second, site)}"
+        # Sans le nom du site, la règle est retrouvée par le domaine
+        assert key == canonical_url(first), f"{site}: {key} != {canonical_url(first)}"
+        print(f"✓ {site}: {key}")
+
+    # Deux offres différentes gardent deux clés
+    assert canonical_url('https://www.lesjeudis.com/job/5521-dev-python') != canonical_url('https://www.lesjeudis.com/job/5522-dev-python')
+    # Hors des sites connus, les paramètres de recherche font partie de l'URL
+    assert canonical_url('https://example.com/jobs?q=1&utm_source=x') == 'https://example.com/jobs?q=1'
+    print("✅ URLs canoniques OK")
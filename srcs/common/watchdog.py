@@ -0,0 +1,136 @@
+"""
+Supervision of the site runs and of the Chrome processes they start.
+Each site runs in its own thread with a wall-clock deadline (SITE_DEADLINE). When
+it is exceeded, the site is cancelled: its chromedriver / Chrome process tree is
+killed, the main loop moves on and the run is counted as a SiteTimeout error.
+At startup, Chrome processes and temporary profiles left by a previous run are
+removed. Process lookups read /proc, so they only do something on Linux.
+"""
+
+import os
+import shutil
+import signal
+import tempfile
+import threading
+
+from common.constants import SITE_DEADLINE
+
+# Préfixe des profils Chrome temporaires : permet de reconnaître nos processus et dossiers
+CHROME_PROFILE_PREFIX = 'dev_jobs_scrapper-chrome-'
+
+
+class SiteTimeout(TimeoutError):
+    pass
+
+
+class ScrapCancelled(BaseException):
+    """
+    Raised in a site thread that kept running after its deadline. Not an Exception,
+    so the `except Exception` of the site loops (per page, per card) let it through.
+    """
+
+
+def _processes():
+    """(pid, ppid, cmdline) of the running processes, read from /proc."""
+    processes = []
+    if not os.path.isdir('/proc'):
+        return processes
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat', 'rb') as f:
+                stat = f.read().decode(errors='replace')
+            with open(f'/proc/{name}/cmdline', 'rb') as f:
+                cmdline = f.read().decode(errors='replace').split('\0')
+        except OSError:
+            continue
+        # Le nom du processus est entre parenthèses et peut contenir des espaces
+        ppid = int(stat[stat.rindex(')') + 2:].split()[1])
+        processes.append((int(name), ppid, cmdline))
+    return processes
+
+
+def _kill(pids):
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def reap_zombies():
+    """Collect exited children. Only needed when running as PID 1 (Docker), where killed Chrome processes end up."""
+    if os.getpid() != 1:
+        return
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+def kill_process_tree(pid):
+    """SIGKILL `pid` and all its descendants."""
+    children = {}
+    for child, parent, _ in _processes():
+        children.setdefault(parent, []).append(child)
+    tree = [pid]
+    for parent in tree:
+        tree.extend(children.get(parent, []))
+    _kill(tree)
+    reap_zombies()
+    return len(tree)
+
+
+def cleanup_orphans():
+    """Kill the Chrome processes and remove the temporary profiles left by a previous run."""
+    killed = [pid for pid, ppid, cmdline in _processes()
+              if pid != os.getpid() and any(CHROME_PROFILE_PREFIX in arg for arg in cmdline)]
+    # Les chromedriver orphelins (rattachés à init) n'ont pas le profil dans leur ligne de commande
+    killed += [pid for pid, ppid, cmdline in _processes()
+               if ppid == 1 and pid != os.getpid() and os.path.basename(cmdline[0]) == 'chromedriver']
+    _kill(killed)
+    reap_zombies()
+
+    profiles = [name for name in os.listdir(tempfile.gettempdir()) if name.startswith(CHROME_PROFILE_PREFIX)]
+    for name in profiles:
+        shutil.rmtree(os.path.join(tempfile.gettempdir(), name), ignore_errors=True)
+    if killed or profiles:
+        print(f"🧹 Cleaned up {len(killed)} leftover Chrome processes and {len(profiles)} temporary profiles")
+
+
+def run_with_deadline(website, func, deadline=SITE_DEADLINE):
+    """
+    Run func(website) in a thread and wait at most `deadline` seconds for it.
+    On timeout the website is cancelled (Chrome killed) and SiteTimeout is raised;
+    exceptions of func are raised in the caller. A deadline of 0 runs func inline.
+    """
+    if not deadline:
+        return func(website)
+
+    previous = website.watchdog_thread
+    if previous is not None and previous.is_alive():
+        raise SiteTimeout(f"{website.name}: the previous run is still hung, not starting another one")
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = func(website)
+        except BaseException as e:
+            outcome['error'] = e
+
+    website.reset_cancel()
+    thread = threading.Thread(target=target, name=f'scrap-{website.name}', daemon=True)
+    website.watchdog_thread = thread
+    thread.start()
+    thread.join(deadline)
+    if thread.is_alive():
+        website.cancel()
+        raise SiteTimeout(f"{website.name} did not finish within {deadline}s")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome.get('result')
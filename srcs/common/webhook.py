@@ -1,8 +1,195 @@
-from discord_webhook import DiscordWebhook, DiscordEmbed
-from common.constants import DISCORD_WEBHOOK
-from common.discord_logger import log_job_sent
-from common.database import save_job
+import queue
+import threading
+import time
+from collections import deque
+
+import requests
+from discord_webhook import DiscordEmbed
+from common.constants import (
+    DISCORD_WEBHOOK, DISCORD_SEND_RETRIES, DEDUP_THRESHOLD, BOOTSTRAP_BATCH_SIZE,
+    PIPELINE_QUEUE_SIZE, PIPELINE_NOTIFY_WORKERS, PIPELINE_ENRICH_WORKERS, PIPELINE_PERSIST_WORKERS
+)
+from common.database import complete_claims, release_claim, save_job, save_jobs
+from common.dedup import dedup_index, link_duplicate
+from common.metrics import observe_webhook
 from common.job_analyzer import analyze_job_page
+from common.alert_rules import SubscriptionRouter
+from common.outbox import OutboxWorker
+from common.pipeline import Pipeline, Stage
+from common.profiler import profile_call
+from common.recorder import is_replaying
+from common.log_sink import log_sink
+from common.run_summary import record, record_duration, record_error, stage
+
+
+def embed_to_dict(embed):
+    """Return the JSON form of a DiscordEmbed, as discord_webhook would send it."""
+    data = {key: value for key, value in vars(embed).items() if value}
+    if isinstance(data.get('color'), str):
+        data['color'] = int(data['color'], 16)
+    return data
+
+
+def build_payload(embeds, username, avatar_url):
+    """Build the JSON body of a webhook message holding several embeds."""
+    return {
+        'username': username,
+        'avatar_url': avatar_url,
+        'embeds': [embed if isinstance(embed, dict) else embed_to_dict(embed) for embed in embeds],
+    }
+
+
+class DiscordSender:
+    """
+    Posts webhook messages as fast as Discord allows.
+    The rate limit bucket of each webhook is tracked from the X-RateLimit-Remaining
+    and X-RateLimit-Reset-After headers, so we only wait when the bucket is empty.
+    A 429 is retried after Retry-After. Messages given to submit() are sent in order
+    by a background thread; send() posts from the calling thread.
+    """
+
+    def __init__(self, max_retries=DISCORD_SEND_RETRIES, timeout=10):
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.queue = queue.Queue()
+        self._buckets = {}  # webhook url -> {'remaining': int, 'reset_at': monotonic time}
+        self._global_reset_at = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._latencies = deque(maxlen=200)  # (queue wait, http time) of recent messages
+        self.sent = 0
+        self.failed = 0
+        self.rate_limited = 0
+
+    def _wait_for_bucket(self, url):
+        with self._lock:
+            bucket = self._buckets.get(url)
+            reset_at = self._global_reset_at
+            if bucket and bucket['remaining'] <= 0:
+                reset_at = max(reset_at, bucket['reset_at'])
+        delay = reset_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _update_bucket(self, url, response):
+        headers = response.headers
+        now = time.monotonic()
+        with self._lock:
+            if 'X-RateLimit-Remaining' in headers and 'X-RateLimit-Reset-After' in headers:
+                self._buckets[url] = {
+                    'remaining': int(headers['X-RateLimit-Remaining']),
+                    'reset_at': now + float(headers['X-RateLimit-Reset-After']),
+                }
+            if response.status_code == 429:
+                retry_after = self._retry_after(response)
+                if headers.get('X-RateLimit-Global') == 'true':
+                    self._global_reset_at = now + retry_after
+                else:
+                    self._buckets[url] = {'remaining': 0, 'reset_at': now + retry_after}
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.json()['retry_after'])
+        except Exception:
+            return float(response.headers.get('Retry-After', 1))
+
+    def send(self, url, payload, waited=0):
+        """
+        Post a message, waiting for the rate limit and retrying on 429.
+        Return (delivered, seconds spent in the successful HTTP call, HTTP status of
+        the last attempt or None on a network error). `waited` is the time the message spent queued, 0 for direct calls (outbox).
+        """
+        status = None
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_bucket(url)
+            start = time.monotonic()
+            try:
+                response = requests.post(url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                observe_webhook('error', None)
+                print(f"Exception sending to Discord: {e}")
+                time.sleep(2 ** attempt)
+                continue
+            status = response.status_code
+            observe_webhook(status, time.monotonic() - start)
+            self._update_bucket(url, response)
+
+            if response.status_code in (200, 204):
+                self.sent += 1
+                http_time = time.monotonic() - start
+                self._latencies.append((waited, http_time))
+                return True, http_time, status
+            if response.status_code == 429:
+                self.rate_limited += 1
+                continue
+            if response.status_code >= 500:
+                time.sleep(2 ** attempt)
+                continue
+
+            # 400, 401, 404... a retry won't help
+            print(f"Couldn't send message to the webhook ({response.status_code}): {response.text[:200]}")
+            break
+
+        self.failed += 1
+        return False, None, status
+
+    def submit(self, url, payload):
+        """Queue a message for the background thread."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='discord-sender', daemon=True)
+                self._thread.start()
+        self.queue.put((url, payload, time.monotonic()))
+
+    def _run(self):
+        while True:
+            url, payload, queued_at = self.queue.get()
+            try:
+                self.send(url, payload, waited=time.monotonic() - queued_at)
+            except Exception as e:
+                print(f"Exception in Discord sender: {e}")
+            finally:
+                self.queue.task_done()
+
+    def queue_depth(self):
+        return self.queue.qsize()
+
+    def stats(self):
+        """Counters and latencies (seconds) of the recent messages."""
+        latencies = list(self._latencies)
+        totals = sorted(waited + http_time for waited, http_time in latencies)
+        return {
+            'queue_depth': self.queue_depth(),
+            'sent': self.sent,
+            'failed': self.failed,
+            'rate_limited': self.rate_limited,
+            'avg_queue_wait': sum(w for w, _ in latencies) / len(latencies) if latencies else 0,
+            'avg_http_time': sum(h for _, h in latencies) / len(latencies) if latencies else 0,
+            'p95_latency': totals[int(len(totals) * 0.95)] if totals else 0,
+        }
+
+    def flush(self, timeout=30):
+        """Wait until the queue is drained, at most `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+
+discord_sender = DiscordSender()
+
+
+outbox_worker = OutboxWorker(discord_sender, build_payload)
+
+
+def flush_notifications():
+    """Deliver what the outbox, the log sink and the sender still hold. Registered at exit by main()."""
+    if is_replaying():
+        return  # Nothing is queued when replaying recorded pages
+    outbox_worker.flush()
+    # Les embeds de logs passent par discord_sender : le vider en dernier
+    log_sink.flush()
+    discord_sender.flush()
 
 def create_embed(job_name, job_company, job_location, job_link, job_thumbnail):
     """Create a discord embed object from the data of a Station F job listing."""
@@ -14,53 +201,169 @@ def create_embed(job_name, job_company, job_location, job_link, job_thumbnail):
     embed.set_thumbnail(url=job_thumbnail)
     return embed
 
-def send_embed(embed, website, job_name="", job_company="", job_location="", job_link="", job_thumbnail="", description=""):
-    """Send an embed to Discord and save to database with detailed analysis."""
-    webhook = DiscordWebhook(url=DISCORD_WEBHOOK, username=website.discord_username,
-                             avatar_url=website.discord_avatar_url)
-    webhook.add_embed(embed)
-    response = webhook.execute()
-    
-    if response.status_code == 404:
-        print('Couldn\'t send the embed to the webhook ' + DISCORD_WEBHOOK)
-        return False
-    
-    # Log the job sent
-    if job_name and job_company:
-        log_job_sent(job_name, job_company, website.name)
-    
-    # Analyze the job page for detailed information
-    print(f"🔍 Analyzing job page: {job_link}")
+def _timed(stage, handler):
+    """Wrap a pipeline handler so its time is added to the run summary of the job's site."""
+    def run(job):
+        start = time.monotonic()
+        try:
+            return profile_call(job['source'], handler, job)
+        except Exception as e:
+            record_error(job['source'], e)
+            if not is_replaying():
+                try:
+                    # Le job ne sera pas sauvegardé : le prochain passage doit pouvoir le reprendre
+                    release_claim(job['url'])
+                except Exception as release_error:
+                    print(f"❌ Could not release the claim of {job['url']}: {release_error}")
+            raise
+        finally:
+            record_duration(job['source'], stage, time.monotonic() - start)
+    return run
+
+class JobBatch:
+    """Jobs of bootstrap runs, saved with one bulk write every `size` jobs."""
+
+    def __init__(self, size=BOOTSTRAP_BATCH_SIZE):
+        self.size = size
+        self._jobs = []
+        self._lock = threading.Lock()
+
+    def add(self, job_data):
+        with self._lock:
+            self._jobs.append(job_data)
+            if len(self._jobs) < self.size:
+                return
+            batch, self._jobs = self._jobs, []
+        self._write(batch)
+
+    def flush(self):
+        """Save the jobs still buffered (end of an iteration)."""
+        with self._lock:
+            batch, self._jobs = self._jobs, []
+        if batch:
+            self._write(batch)
+
+    @staticmethod
+    def _write(batch):
+        saved = save_jobs(batch)
+        complete_claims([job_data['url'] for job_data in batch])
+        print(f"✓ Bootstrap: {saved} jobs saved")
+
+
+bootstrap_batch = JobBatch()
+
+def _notify_job(job):
+    """Pipeline stage: write the Discord notification to the outbox."""
+    if job['bootstrap']:
+        record(job['source'], 'bootstrapped_jobs')
+        return job
+    if outbox_worker.enqueue(job['url'], DISCORD_WEBHOOK, job['discord_username'],
+                             job['discord_avatar_url'], embed_to_dict(job['embed'])):
+        record(job['source'], 'new_jobs')
+    return job
+
+def _enrich_job(job):
+    """Pipeline stage: scrape the full job page for better data."""
     basic_info = {
+        'name': job['name'],
+        'company': job['company'],
+        'location': job['location'],
+        'thumbnail': job['thumbnail'],
+    }
+    fetch_stats = {}
+    job_data = analyze_job_page(job['url'], basic_info, fetch_stats)
+    record_duration(job['source'], 'detail_fetch', fetch_stats.get('fetch_time', 0))
+    record(job['source'], 'bytes_fetched', fetch_stats.get('bytes', 0))
+
+    # Override with basic info if analysis failed
+    for key in ('name', 'company', 'location', 'thumbnail'):
+        if not job_data[key]:
+            job_data[key] = job[key]
+    job_data['source'] = job['source']
+    # Technologies already read on the listing card (Indeed blocks page analysis)
+    if job['technologies']:
+        job_data['technologies'] = sorted(set(job_data['technologies']) | set(job['technologies']))
+    job['data'] = job_data
+    return job
+
+def _dedup_job(job):
+    """Pipeline stage: drop a near-duplicate of a known job, linking it to the job of its cluster."""
+    if not DEDUP_THRESHOLD:
+        return job
+    cluster = dedup_index.check(job['data'])
+    if cluster is None:
+        return job
+    link_duplicate(cluster, job['data'])
+    complete_claims([job['url']])
+    record(job['source'], 'duplicates')
+    print(f"🔗 Duplicate of {cluster}, not posted: {job['data']['name']} @ {job['data']['company']}")
+    return None
+
+def _route_job(job):
+    """Pipeline stage: fan the job out to the webhooks of the matching subscriptions."""
+    if job['bootstrap']:
+        return job
+    embed = embed_to_dict(job['embed'])
+    for subscription in subscription_router.match(job['data']):
+        outbox_worker.enqueue(f"{subscription.id}:{job['url']}", subscription.webhook_url,
+                              job['discord_username'], job['discord_avatar_url'], embed)
+    return job
+
+def _persist_job(job):
+    """Pipeline stage: save the enriched job to the database."""
+    job_data = job['data']
+    if job['bootstrap']:
+        bootstrap_batch.add(job_data)
+        return
+    save_job(job_data)
+    complete_claims([job['url']])
+    print(f"✓ Job saved: {job_data['name']} @ {job_data['company']} "
+          f"[{job_data['seniority']}, {job_data['contract_type']}, "
+          f"{', '.join(job_data['technologies'][:5])}]")
+
+subscription_router = SubscriptionRouter()
+
+# La page du job est analysée avant la notification : le dédoublonnage a besoin de sa description.
+# Une notification attend donc le chargement de la page du job (PIPELINE_ENRICH_WORKERS en parallèle)
+job_pipeline = Pipeline([
+    Stage('enrich', _timed('enrich', _enrich_job), PIPELINE_ENRICH_WORKERS, PIPELINE_QUEUE_SIZE),
+    # Un seul worker : la recherche et l'ajout d'une signature ne doivent pas se croiser
+    Stage('dedup', _timed('dedup', _dedup_job), 1, PIPELINE_QUEUE_SIZE),
+    Stage('notify', _timed('notify', _notify_job), PIPELINE_NOTIFY_WORKERS, PIPELINE_QUEUE_SIZE),
+    Stage('route', _timed('route', _route_job), 1, PIPELINE_QUEUE_SIZE),
+    Stage('persist', _timed('persist', _persist_job), PIPELINE_PERSIST_WORKERS, PIPELINE_QUEUE_SIZE),
+])
+
+def send_embed(embed, website, job_name="", job_company="", job_location="", job_link="", job_thumbnail="", description="",
+               technologies=None):
+    """
+    Hand a newly discovered job to the pipeline: job page analysis, cross-site
+    dedup, Discord notification, subscriber routing and database save happen on the
+    pipeline workers, not in the site loop.
+    Blocks only when the pipeline is full.
+    During a bootstrap run of the website, the job is neither notified nor routed,
+    and it is saved with the next bulk write of bootstrap_batch.
+    When replaying recorded pages, the job is only analysed, in the calling thread,
+    and kept in website.replayed_jobs: nothing is notified nor saved.
+    """
+    job = {
+        'embed': embed,
+        'discord_username': website.discord_username,
+        'discord_avatar_url': website.discord_avatar_url,
+        'source': website.name,
         'name': job_name,
         'company': job_company,
         'location': job_location,
+        'url': job_link,
         'thumbnail': job_thumbnail,
+        'description': description,
+        'technologies': technologies or [],
+        'bootstrap': website.bootstrap,
     }
-    
-    # Scrape the full job page for better data
-    job_data = analyze_job_page(job_link, basic_info)
-    
-    # Override with basic info if analysis failed
-    if not job_data['name']:
-        job_data['name'] = job_name
-    if not job_data['company']:
-        job_data['company'] = job_company
-    if not job_data['location']:
-        job_data['location'] = job_location
-    if not job_data['thumbnail']:
-        job_data['thumbnail'] = job_thumbnail
-    
-    # Save to database
-    save_job(job_data)
-    
-    # Print summary
-    print(f"✓ Job saved:")
-    print(f"  - Name: {job_data['name']}")
-    print(f"  - Company: {job_data['company']}")
-    print(f"  - Seniority: {job_data['seniority']} ({job_data['years_experience']} years)")
-    print(f"  - Technologies: {', '.join(job_data['technologies'][:5])}")
-    print(f"  - Contract: {job_data['contract_type']}")
-    print(f"  - Remote: {job_data['remote']}")
-    
+    if is_replaying():
+        website.replayed_jobs.append(_timed('enrich', _enrich_job)(job)['data'])
+        return True
+
+    with stage(website.name, 'pipeline_submit'):
+        job_pipeline.submit(job)
     return True
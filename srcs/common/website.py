@@ -1,28 +1,124 @@
+import hashlib
+import json
+import shutil
+import tempfile
+
+import requests
+from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from datetime import datetime, timedelta
 from time import sleep
+from urllib.parse import urlsplit
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 
-from common.constants import CHROMEDRIVER_PATH, GOOGLE_CHROME_BIN
+from common.constants import (
+    CHROMEDRIVER_PATH, CRAWL_DEEP_INTERVAL, CRAWL_KNOWN_PAGES_STOP, GOOGLE_CHROME_BIN, JOB_BOARD_BASE_URL,
+    LISTING_PROBE, LISTING_PROBE_CARDS, SITE_QUERIES,
+)
+from common.database import claim_url, get_site_state, update_site_state
+from common.metrics import observe_crawl_depth
+from common.recorder import ReplayDriver, RecordingNotFound, is_recording, is_replaying, page_recorder, site_slug
+from common.run_summary import record, record_error, stage
+from common.urls import canonical_url
+from common.watchdog import CHROME_PROFILE_PREFIX, ScrapCancelled, kill_process_tree
+from common.webhook import create_embed, send_embed
+
+
+def _configured_queries(name, queries):
+    """Query configs of a site: its entry in SITE_QUERIES (by site slug), else `queries`."""
+    if SITE_QUERIES:
+        try:
+            configured = json.loads(SITE_QUERIES).get(site_slug(name))
+        except (ValueError, AttributeError) as e:
+            print(f"Invalid SITE_QUERIES, using the default queries: {e}")
+            configured = None
+        if configured and queries:
+            return configured
+    return queries or [None]
+
+
+def _query_key(query):
+    """Short stable key of a query config, used in the site state."""
+    if not query:
+        return 'default'
+    return hashlib.sha1(json.dumps(query, sort_keys=True).encode('utf-8')).hexdigest()[:12]
 
 
 class Website:
 
-    def __init__(self, name, url, discord_username, discord_avatar_url, should_scroll_page):
+    def __init__(self, name, url, discord_username, discord_avatar_url, should_scroll_page, queries=None):
+        """
+        `url` is the listing URL, with {} for the page. With `queries`, it is a template
+        whose named fields ({motsCles}, {lieux}...) are filled by each query config, a
+        dict of URL-encoded values; SITE_QUERIES replaces these default queries.
+        """
         self.name = name
+        self.url_template = url
         self.url = url
+        # Origin of the site, prefix of its relative job links
+        parts = urlsplit(url)
+        self.base_url = f"{parts.scheme}://{parts.netloc}"
+        if JOB_BOARD_BASE_URL:
+            # Same paths, served under /<site slug>/ by the local stand-in job board
+            local_base_url = f"{JOB_BOARD_BASE_URL.rstrip('/')}/{site_slug(name)}"
+            self.url_template = local_base_url + url[len(self.base_url):]
+            self.base_url = local_base_url
+        self.queries = _configured_queries(name, queries)
+        self.query = None  # Recherche en cours, voir run_scrap()
+        self._query_key = 'default'
+        self._seen_urls = set()  # Liens déjà traités pendant le run, toutes recherches confondues
+        self.url = self._query_url(self.queries[0])
         self.discord_username = discord_username
         self.discord_avatar_url = discord_avatar_url
         self.should_scroll_page = should_scroll_page
         self.driver = None
         self.extra_chrome_options = []
         self.page_load_timeout = 15
+        self.first_page = 1  # Valeur de self.url.format() pour la première page du listing
+        self.replayed_jobs = []  # Jobs found in replay mode, instead of being notified
+        self._driver_url = None
+        self._profile_dir = None  # Profil Chrome temporaire du driver courant
+        self._cancelled = False
+        self.watchdog_thread = None  # Thread du run en cours, voir common.watchdog
+        self.force_bootstrap = False  # Runs en bootstrap jusqu'au premier run complet, voir request_bootstrap()
+        self._bootstrap_requested_at = None
+        self.bootstrap = False  # Run en cours sans notification, voir _needs_bootstrap()
+        # Incremental crawl and listing probe, see run_scrap()
+        self._site_state = {}
+        self._fingerprints = {}  # Empreinte de la 1re page de chaque recherche
+        self._run_cards = 0  # Cartes lues et erreurs du run : un listing qui n'a rien donné n'est pas un scrap complet
+        self._run_errors = 0
+        self._deep_crawl = True
+        self._crawl_pages = 0
+        self._crawl_known_streak = 0
+        self._crawl_page_new_jobs = 0
 
     def _get_Driver(self):
         return self.driver
 
     def _init_driver(self, url):
+        """Load `url`. Chrome is started once per run, then shared by all pages and queries."""
+        self._check_cancelled()
+        self._driver_url = url
+        if is_replaying():
+            page_source = page_recorder.load(self.name, url)
+            if page_source is None:
+                raise RecordingNotFound(f"No recording of {url} for {self.name}")
+            self.driver = ReplayDriver(page_source)
+            return
+        if self.driver is not None:
+            try:
+                with self.stage('page_load'):
+                    self.driver.get(url)
+                    self._wait(3)
+                return
+            except Exception:
+                # Chrome dans un état inconnu : le prochain chargement repart d'un driver neuf
+                self._quit_driver()
+                raise
+
         service = Service(executable_path=CHROMEDRIVER_PATH) if CHROMEDRIVER_PATH else Service()
         options = Options()
         options.headless = True
@@ -59,36 +155,349 @@ class Website:
         for opt in self.extra_chrome_options:
             options.add_argument(opt)
 
-        self.driver = webdriver.Chrome(options=options, service=service)
-        self.driver.set_page_load_timeout(self.page_load_timeout)
+        # Profil dédié : les processus et dossiers oubliés sont retrouvés au démarrage
+        self._profile_dir = tempfile.mkdtemp(prefix=CHROME_PROFILE_PREFIX)
+        options.add_argument(f"--user-data-dir={self._profile_dir}")
+
+        with self.stage('driver_start'):
+            self.driver = webdriver.Chrome(options=options, service=service)
+            self.driver.set_page_load_timeout(self.page_load_timeout)
 
-        # Remove webdriver property to avoid detection
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            # Remove webdriver property to avoid detection
+            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
-        # Advanced stealth scripts
-        self.driver.execute_script("""
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5]
-            });
-            window.chrome = { runtime: {} };
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['fr-FR', 'fr', 'en-US', 'en']
-            });
-        """)
+            # Advanced stealth scripts
+            self.driver.execute_script("""
+                Object.defineProperty(navigator, 'plugins', {
+                    get: () => [1, 2, 3, 4, 5]
+                });
+                window.chrome = { runtime: {} };
+                Object.defineProperty(navigator, 'languages', {
+                    get: () => ['fr-FR', 'fr', 'en-US', 'en']
+                });
+            """)
 
-        self.driver.get(url)
-        sleep(3)  # Let JS frameworks initialize
+        with self.stage('page_load'):
+            self.driver.get(url)
+            self._wait(3)  # Let JS frameworks initialize
 
     def _get_chrome_page_data(self):
-        if self.should_scroll_page:
-            for _ in range(100):
-                self.driver.execute_script(
-                    "window.scrollTo(0, window.scrollY + 200)")
-                sleep(0.1)
-        sleep(8)
-        page_data = self.driver.page_source
-        self.driver.quit()
+        with self.stage('scroll'):
+            if self.should_scroll_page:
+                for _ in range(100):
+                    self.driver.execute_script(
+                        "window.scrollTo(0, window.scrollY + 200)")
+                    self._wait(0.1)
+        with self.stage('wait'):
+            self._wait(8)
+        return self._read_page_source()
+
+    def _read_page_source(self):
+        """Return the rendered HTML. The driver stays open for the next page, run_scrap() closes it."""
+        with self.stage('page_source'):
+            page_data = self.driver.page_source
+        if is_recording():
+            page_recorder.record(self.name, self._driver_url, page_data)
+        self.report('pages')
+        self.report('bytes_fetched', len(page_data.encode('utf-8')))
         return page_data
 
+    def _quit_driver(self):
+        """Close the current driver, killing its process tree if quit() fails, and remove its profile."""
+        driver, self.driver = self.driver, None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Could not quit the driver of {self.name}: {e}")
+                self._kill_driver(driver)
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+    @staticmethod
+    def _kill_driver(driver):
+        process = getattr(getattr(driver, 'service', None), 'process', None)
+        if process is not None and process.poll() is None:
+            kill_process_tree(process.pid)
+            try:
+                process.wait(timeout=5)
+            except Exception:
+                pass
+
+    def cancel(self):
+        """Stop a hung run from another thread: kill Chrome, later calls of the run raise ScrapCancelled."""
+        self._cancelled = True
+        driver = self.driver
+        if driver is not None:
+            self._kill_driver(driver)
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+    def reset_cancel(self):
+        self._cancelled = False
+
+    def _check_cancelled(self):
+        if self._cancelled:
+            raise ScrapCancelled(f"{self.name} run cancelled after its deadline")
+
+    def _parse(self, page_data):
+        """Parse a listing page, timed as the 'parse' stage."""
+        with self.stage('parse'):
+            return BeautifulSoup(page_data, 'html.parser')
+
+    def _wait(self, seconds):
+        """Give the page time to render. No-op when replaying recorded pages."""
+        self._check_cancelled()
+        if not is_replaying():
+            sleep(seconds)
+
+    def _claim_url(self, url):
+        """
+        Return True if the job is new and this run won its claim, timed as the
+        'db_lookup' stage. The claim is an insert on a unique key, so a card seen by
+        two workers or nodes at the same time is only handled by one of them.
+        """
+        if is_replaying():
+            return True
+        with self.stage('db_lookup'):
+            return claim_url(url, self.name)
+
+    def _find_job_cards(self, page_soup):
+        """Return the job cards of a parsed listing page."""
+        raise NotImplementedError
+
+    def _parse_job_card(self, card):
+        """
+        Return the job of a listing card as a dict (name, company, location, link,
+        thumbnail, description and optionally technologies), or None to skip it.
+        """
+        raise NotImplementedError
+
+    def _handle_job(self, job):
+        """Send a job parsed from a card to the pipeline if it is new. Return True if it was."""
+        self._check_cancelled()
+        # Les liens des listings portent des paramètres de recherche et de tracking
+        job['link'] = canonical_url(job['link'], self.name)
+        if job['link'] in self._seen_urls:
+            # Carte d'une recherche précédente du même run
+            print("✗ Already seen in this run")
+            return False
+        self._seen_urls.add(job['link'])
+        if not self._claim_url(job['link']):
+            print("✗ Already in database")
+            return False
+
+        print("✓ New job!")
+        self._crawl_page_new_jobs += 1
+        embed = create_embed(job['name'], job['company'], job['location'], job['link'], job['thumbnail'])
+        return send_embed(embed, self, job['name'], job['company'], job['location'], job['link'],
+                          job['thumbnail'], job['description'], technologies=job.get('technologies'))
+
+    def run_scrap(self):
+        """
+        Scrap the site with the incremental crawl policy. Listings are sorted newest
+        first, so pagination stops after CRAWL_KNOWN_PAGES_STOP consecutive pages
+        without a new job, except during the deep crawl run every CRAWL_DEEP_INTERVAL
+        hours, which goes as deep as the site loop allows (to catch reordered listings).
+        The depth reached is saved in the site state.
+        After request_bootstrap() (main.py --bootstrap, or an empty database at
+        startup) the runs are bootstraps until one completes, here or on another node:
+        deep crawls whose jobs are enriched and bulk-saved without any notification.
+        The following runs are incremental.
+        The site loop runs once per query config, one after the other, with the same
+        Chrome; a job already seen by a previous query of the run is skipped before the
+        database lookup. Before each query, a probe of its first listing page skips it
+        when that page did not change since the last completed scrap (not during deep
+        crawls).
+        A query is only complete when its listing gave cards without any error: the
+        site loops stop on a page that fails to load, and saving its fingerprint or
+        the deep crawl date would then hide new jobs until the next deep crawl.
+        """
+        self._start_crawl()
+        scraped = completed = False
+        listings_read = True
+        try:
+            for query in self.queries:
+                self._start_query(query)
+                if self._listing_unchanged():
+                    print(f"⏭ {self.name}{self._query_label()}: first listing page unchanged since the last scrap, skipping")
+                    self.report('probe_skips')
+                    continue
+                scraped = True
+                cards, errors = self._run_cards, self._run_errors
+                self.scrap()
+                if self._run_cards == cards or self._run_errors > errors:
+                    print(f"⚠️ {self.name}{self._query_label()}: listing not fully read, its fingerprint and the deep crawl date are not saved")
+                    self._fingerprints.pop(self._query_key, None)
+                    listings_read = False
+            completed = listings_read
+        finally:
+            self._quit_driver()
+            # Run annulé : main est passé à la suite, l'état du site ne doit plus bouger
+            if scraped and not self._cancelled:
+                self._finish_crawl(completed)
+
+    def _query_url(self, query):
+        """Listing URL of a query config, with {} left for the page."""
+        if query is None:
+            return self.url_template
+        return self.url_template.format('{}', **query)
+
+    def _start_query(self, query):
+        self.query = query
+        self._query_key = _query_key(query)
+        self.url = self._query_url(query)
+        # L'arrêt anticipé de la pagination se décide par recherche
+        self._crawl_known_streak = 0
+        self._crawl_page_new_jobs = 0
+        if len(self.queries) > 1:
+            print(f"🔍 {self.name}{self._query_label()}")
+
+    def _query_label(self):
+        if len(self.queries) < 2 or not self.query:
+            return ''
+        return ' [' + ', '.join(f"{field}={value}" for field, value in self.query.items()) + ']'
+
+    def _start_crawl(self):
+        self._crawl_pages = 0
+        self._crawl_known_streak = 0
+        self._crawl_page_new_jobs = 0
+        self._site_state = {}
+        self._fingerprints = {}
+        self._run_cards = 0
+        self._run_errors = 0
+        self._seen_urls = set()
+        self.bootstrap = False
+        if is_replaying():
+            self._deep_crawl = True
+            return
+        try:
+            self._site_state = get_site_state(self.name)
+        except Exception as e:
+            print(f"Could not load crawl state of {self.name}: {e}")
+        last_deep_crawl = self._site_state.get('crawl', {}).get('last_deep_crawl')
+        self._deep_crawl = (last_deep_crawl is None or
+                            datetime.now() - last_deep_crawl >= timedelta(hours=CRAWL_DEEP_INTERVAL))
+        self.bootstrap = self._needs_bootstrap()
+        if self.bootstrap:
+            self._deep_crawl = True
+            self.report('bootstrap')
+            print(f"🌱 Bootstrap of {self.name}: every job is saved, none is notified")
+        elif self._deep_crawl:
+            print(f"🔎 Deep crawl of {self.name}")
+
+    def request_bootstrap(self):
+        """Make the next runs bootstraps, until one of them completes (see run_scrap())."""
+        self.force_bootstrap = True
+        self._bootstrap_requested_at = datetime.now()
+
+    def _needs_bootstrap(self):
+        """
+        True after request_bootstrap(), unless a bootstrap of the site completed since
+        the request (another replica that started on the same empty database). A site
+        added to a running install is not bootstrapped on its own: its jobs are
+        notified unless --bootstrap is given.
+        """
+        if not self.force_bootstrap:
+            return False
+        done_at = self._site_state.get('bootstrap', {}).get('done_at')
+        if done_at and self._bootstrap_requested_at and done_at >= self._bootstrap_requested_at:
+            print(f"{self.name} was bootstrapped by another node, running incrementally")
+            self.force_bootstrap = False
+            return False
+        return True
+
+    def _probe_fingerprint(self):
+        """
+        Fetch the first listing page without Chrome and hash the links of its first
+        LISTING_PROBE_CARDS cards. None when the page has no card: the cards of the
+        sites rendered by JavaScript (APEC, WTTJ, Job Teaser) are not in the HTML, and
+        its headers would only describe the static shell.
+        """
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept-Language': 'fr-FR,fr',
+        }
+        response = requests.get(self.url.format(self.first_page), headers=headers, timeout=10)
+        response.raise_for_status()
+        self.report('bytes_fetched', len(response.content))
+        cards = self._find_job_cards(BeautifulSoup(response.text, "html.parser"))
+        links = [a['href'] for card in cards[:LISTING_PROBE_CARDS] for a in card.find_all('a', href=True)]
+        if not links:
+            return None
+        return 'cards:' + hashlib.sha1('\n'.join(links).encode('utf-8')).hexdigest()
+
+    def _listing_unchanged(self):
+        """Return True when the probe matches the fingerprint of the last completed scrap."""
+        if not LISTING_PROBE or is_replaying():
+            return False
+        if type(self)._find_job_cards is Website._find_job_cards:
+            # Site sans parseur de cartes (Keljob) : la sonde ne saurait rien comparer
+            return False
+        try:
+            with self.stage('probe'):
+                fingerprint = self._probe_fingerprint()
+        except Exception as e:
+            print(f"Listing probe of {self.name} failed: {e}")
+            return False
+        if fingerprint is None:
+            return False
+        self._fingerprints[self._query_key] = fingerprint
+        previous = self._site_state.get('fingerprint', {}).get(self._query_key, {}).get('value')
+        return not self._deep_crawl and fingerprint == previous
+
+    def crawl_next_page(self):
+        """Call at the end of each listing page. Return False when pagination should stop."""
+        self._crawl_pages += 1
+        if self._crawl_page_new_jobs:
+            self._crawl_known_streak = 0
+        else:
+            self._crawl_known_streak += 1
+        self._crawl_page_new_jobs = 0
+        if self._deep_crawl or self._crawl_known_streak < CRAWL_KNOWN_PAGES_STOP:
+            return True
+        print(f"⏹ {self._crawl_known_streak} page(s) without a new job, stopping pagination")
+        return False
+
+    def _finish_crawl(self, completed):
+        self.report('crawl_depth', self._crawl_pages)
+        observe_crawl_depth(self.name, self._crawl_pages)
+        if is_replaying():
+            return
+        now = datetime.now()
+        state = {'crawl.last_depth': self._crawl_pages, 'crawl.last_run': now, 'crawl.deep': self._deep_crawl}
+        if self._deep_crawl and completed:
+            state['crawl.last_deep_crawl'] = now
+        if completed and self.bootstrap:
+            # Les runs suivants sont incrémentaux, sur ce nœud comme sur les autres
+            state['bootstrap.done_at'] = now
+            self.force_bootstrap = False
+        if completed:
+            # Seulement après un scrap complet : sinon un échec masquerait les jobs de la page
+            for key, fingerprint in self._fingerprints.items():
+                state[f'fingerprint.{key}'] = {'value': fingerprint, 'updated_at': now}
+        try:
+            update_site_state(self.name, state)
+        except Exception as e:
+            print(f"Could not save crawl state of {self.name}: {e}")
+
+    def stage(self, name):
+        """Context manager timing the enclosed block as stage `name` of this site."""
+        return stage(self.name, name)
+
+    def report(self, counter, n=1):
+        """Add to a counter of this site in the current run summary (cards_seen, errors...)."""
+        if counter == 'cards_seen':
+            self._run_cards += n
+        record(self.name, counter, n)
+
+    def report_error(self, error):
+        """Count an error of this site in the current run summary, by exception class."""
+        if isinstance(error, ScrapCancelled):
+            return  # Déjà compté comme SiteTimeout
+        self._run_errors += 1
+        record_error(self.name, error)
+
     def scrap(self):
         print("Scrap function is not implemented in website '{}'!".format(self.name))
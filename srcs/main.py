@@ -1,4 +1,6 @@
-from time import sleep
+import argparse
+import atexit
+from time import sleep, monotonic
 
 from websites.stationf import StationF
 from websites.wttj import WTTJ
@@ -9,12 +11,19 @@ from websites.apec import APEC
 from websites.lesjeudis import LesJeudis
 from websites.cadremploi import Cadremploi
 from websites.keljob import Keljob
-from common.discord_logger import (
-    log_iteration_start, log_scrap_start,
-    log_scrap_end, log_error
-)
+from common.constants import LEASE_TTL
+from common.database import ensure_indexes, get_site_state, is_database_empty
+from common.recorder import site_slug
+from common.webhook import bootstrap_batch, discord_sender, flush_notifications, job_pipeline, outbox_worker
+from common.discord_logger import log_error
+from common.run_summary import start_run
+from common.metrics import observe_run, start_metrics_server, track_queues
+from common.profiler import enable_profiling, finish_profiled_iteration, profile_site, start_profiled_iteration
+from common.circuit_breaker import CircuitBreakers
+from common.leases import LeaseManager
+from common.scheduler import SiteScheduler
+from common.watchdog import cleanup_orphans, reap_zombies, run_with_deadline
 
-SLEEP_TIME = 900
 WEBSITES_TO_SCRAP = [
     WTTJ(),
     JobTeaser(),
@@ -26,39 +35,131 @@ WEBSITES_TO_SCRAP = [
 ]
 
 
+def scrap_website(website):
+    with profile_site(website.name):
+        website.run_scrap()
+
+
+def claim_website(website, leases, scheduler, breakers):
+    """Take the lease of a due site. Return False if it runs, or just ran, on another node."""
+    if not leases.acquire(website):
+        print(f"⏭ {website.name} is running on another node")
+        scheduler.postpone(website.name, LEASE_TTL)
+        return False
+    # Un autre nœud a pu le scraper depuis le dernier chargement de son état
+    try:
+        state = get_site_state(website.name)
+    except Exception as e:
+        print(f"Could not reload the state of {website.name}: {e}")
+        return True
+    scheduler.load(website.name, state)
+    breakers.load(website.name, state)
+    if scheduler.is_due(website.name) and breakers.allow(website.name):
+        return True
+    leases.release(website)
+    return False
+
+
 def main():
     """
     Main function of the program.
-    Looping every $SLEEP_TIME seconds on the websites to scrap, and send notifications on Discord
-    when a new job is found.
+    Looping on the websites to scrap, each one when its schedule says it is due, and send
+    notifications on Discord when a new job is found.
     """
 
     print("Starting Developer Job Scrapper..")
     print(f"Websites configured: {[w.name for w in WEBSITES_TO_SCRAP]}")
+    ensure_indexes()
+    cleanup_orphans()
+    start_metrics_server()
+    track_queues(discord_sender, job_pipeline)
+    # Reprend les notifications restées en attente au dernier arrêt
+    outbox_worker.start()
+    # Seul le scraper livre l'outbox et les logs à l'arrêt : les scripts et le dashboard importent webhook sans Mongo
+    atexit.register(flush_notifications)
+    breakers = CircuitBreakers(WEBSITES_TO_SCRAP)
+    scheduler = SiteScheduler(WEBSITES_TO_SCRAP, breakers)
+    leases = LeaseManager()
 
     while True:
+        due_websites = scheduler.due_sites()
+        if not due_websites:
+            sleep(scheduler.seconds_until_next_run())
+            continue
 
-        print("Running another iteration..")
-        log_iteration_start()
+        print(f"Running another iteration: {[w.name for w in due_websites]}")
+        run = start_run()
+        start_profiled_iteration()
 
-        for website in WEBSITES_TO_SCRAP:
+        for website in due_websites:
+            if not claim_website(website, leases, scheduler, breakers):
+                continue
+            run.site_started(website.name)
+            start = monotonic()
             try:
-                log_scrap_start(website.name)
                 print("== SCRAPING {} ===".format(website.name))
-                website.scrap()
-                log_scrap_end(website.name)
+                run_with_deadline(website, scrap_website)
+                run.site_finished(website.name)
                 print("SCRAP OF {} FINISHED!\n".format(website.name))
             except Exception as e:
                 error_msg = str(e)
+                run.site_finished(website.name, error=e)
                 log_error(website.name, error_msg)
                 print("Unable to scrap {}:".format(website.name))
                 print(e)
                 import traceback
                 traceback.print_exc()
+            finally:
+                run.add_duration(website.name, 'scrap', monotonic() - start)
+                reap_zombies()
+
+        # Attendre que les jobs trouvés soient notifiés, analysés et sauvegardés
+        job_pipeline.join()
+        try:
+            bootstrap_batch.flush()
+        except Exception as e:
+            print(f"Could not save the bootstrap jobs: {e}")
+        finish_profiled_iteration()
+        pipeline_stats = job_pipeline.stats()
+        for stage, stats in pipeline_stats.items():
+            print(f"Pipeline {stage}: {stats}")
 
-        print(f"Iteration complete. Sleeping for {SLEEP_TIME} seconds...")
-        sleep(SLEEP_TIME)
+        # Un seul message Discord et un seul document pour toute l'itération
+        summary = run.finish(extra={'pipeline': pipeline_stats, 'discord': discord_sender.stats()})
+        try:
+            observe_run(summary, outbox_worker.pending_count(), outbox_worker.failed_count())
+        except Exception as e:
+            print(f"Could not update run metrics: {e}")
+
+        breakers.update(summary)
+        scheduler.update(summary)
+        # Les baux ne sont rendus qu'une fois le nouvel état des sites sauvegardé
+        leases.release_all()
+        print(f"Iteration complete. Next site due in {scheduler.seconds_until_next_run():.0f} seconds...")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Developer Job Scrapper')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile every site at each iteration (same as PROFILE=1)')
+    parser.add_argument('--bootstrap', nargs='*', metavar='SITE',
+                        help='Save the jobs found by the next run of these sites (all if none given, '
+                             'by name or slug) without notifying them, then go on incrementally. '
+                             'Done for every site when the database is empty')
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+    if args.bootstrap is None:
+        try:
+            # Première installation : on enregistre l'existant sans notifier des centaines de jobs
+            if is_database_empty():
+                print("📦 Empty database: the first run of every site is a bootstrap")
+                args.bootstrap = []
+        except Exception as e:
+            print(f"Could not count the saved jobs: {e}")
+    if args.bootstrap is not None:
+        wanted = {site_slug(name) for name in args.bootstrap}
+        for website in WEBSITES_TO_SCRAP:
+            if not wanted or site_slug(website.name) in wanted:
+                website.request_bootstrap()
     main()
@@ -1,12 +1,8 @@
-import time
 import re
-from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 
-from common.webhook import create_embed, send_embed
-from common.database import is_url_in_database, add_url_in_database
 from common.website import Website
 
 
@@ -16,12 +12,14 @@ class APEC(Website):
     def __init__(self):
         super().__init__(
             'APEC',
-            'https://www.apec.fr/candidat/recherche-emploi.html/emploi?lieux=91&motsCles=developpeur&page={}',
+            'https://www.apec.fr/candidat/recherche-emploi.html/emploi?lieux={lieux}&motsCles={motsCles}&page={}',
             'APEC JOBS',
             'https://www.apec.fr/fileadmin/user_upload/Logos/Apec-Logo.svg',
             True,
+            queries=[{'motsCles': 'developpeur', 'lieux': '91'}],
         )
         self.page_load_timeout = 30
+        self.first_page = 0
 
     def _is_valid_company_name(self, text, job_title=None):
         """Check if text is a valid company name"""
@@ -145,7 +143,7 @@ class APEC(Website):
             href = link['href']
             if '/offre-emploi/' in href or '/emploi/' in href:
                 if href.startswith('/'):
-                    return 'https://www.apec.fr' + href
+                    return self.base_url + href
                 return href
 
         # Fallback: first link
@@ -153,7 +151,7 @@ class APEC(Website):
         if link:
             href = link['href']
             if href.startswith('/'):
-                return 'https://www.apec.fr' + href
+                return self.base_url + href
             return href
 
         return None
@@ -166,11 +164,73 @@ class APEC(Website):
                     'article.card-offer, div.card-offer, div[data-cy="offer-card"], article, .offer'
                 ))
             )
-            time.sleep(3)
+            self._wait(3)
             return True
-        except:
+        except Exception:
             return False
 
+    def _find_job_cards(self, page_soup):
+        # Try multiple selectors
+        job_listings = []
+        selectors_to_try = [
+            'article.card-offer',
+            'div.card-offer',
+            'div[data-cy="offer-card"]',
+            'article[data-cy="offer"]',
+            'div.offer-card',
+            'article.offer',
+            'article',
+            'div[class*="offer"]',
+        ]
+
+        for selector in selectors_to_try:
+            job_listings = page_soup.select(selector)
+            if job_listings:
+                print(f"Found {len(job_listings)} jobs with selector: {selector}")
+                break
+
+        # Fallback: search by job links
+        if not job_listings:
+            job_links = page_soup.find_all('a', href=re.compile(r'/offre-emploi/'))
+            seen_parents = set()
+            for link in job_links:
+                parent = link.find_parent(['article', 'div', 'li'])
+                if parent and id(parent) not in seen_parents:
+                    seen_parents.add(id(parent))
+                    job_listings.append(parent)
+            if job_listings:
+                print(f"Found {len(job_listings)} jobs via link search")
+        return job_listings
+
+    def _parse_job_card(self, job):
+        """Extract a job from a listing card, or None if it can't be used."""
+        job_name = self._extract_job_title(job)
+        if job_name == "Unknown Position":
+            print("Could not extract job title, skipping")
+            return None
+        print(f"Job: {job_name}")
+
+        job_company = self._extract_company_name(job, job_title=job_name)
+        print(f"Company: {job_company}")
+
+        job_location = self._extract_location(job)
+        print(f"Location: {job_location}")
+
+        job_link = self._extract_job_link(job)
+        if not job_link:
+            print("No link found, skipping")
+            return None
+        print(f"Link: {job_link}")
+
+        return {
+            'name': job_name,
+            'company': job_company,
+            'location': job_location,
+            'link': job_link,
+            'thumbnail': '',
+            'description': f"{job_name} - {job_company} - {job_location}",
+        }
+
     def scrap(self):
         page = 0
         jobs_found_this_run = 0
@@ -186,9 +246,11 @@ class APEC(Website):
 
             try:
                 self._init_driver(self.page_url)
-                self._wait_for_jobs_to_load()
+                with self.stage('wait'):
+                    self._wait_for_jobs_to_load()
                 page_data = self._get_chrome_page_data()
             except Exception as e:
+                self.report_error(e)
                 print(f"Error loading page: {e}")
                 break
 
@@ -198,89 +260,35 @@ class APEC(Website):
                     f.write(page_data)
                 print("Saved debug HTML to /tmp/apec_debug.html")
 
-            page_soup = BeautifulSoup(page_data, 'html.parser')
-
-            # Try multiple selectors
-            job_listings = []
-            selectors_to_try = [
-                'article.card-offer',
-                'div.card-offer',
-                'div[data-cy="offer-card"]',
-                'article[data-cy="offer"]',
-                'div.offer-card',
-                'article.offer',
-                'article',
-                'div[class*="offer"]',
-            ]
-
-            for selector in selectors_to_try:
-                job_listings = page_soup.select(selector)
-                if job_listings:
-                    print(f"Found {len(job_listings)} jobs with selector: {selector}")
-                    break
-
-            # Fallback: search by job links
-            if not job_listings:
-                job_links = page_soup.find_all('a', href=re.compile(r'/offre-emploi/'))
-                seen_parents = set()
-                for link in job_links:
-                    parent = link.find_parent(['article', 'div', 'li'])
-                    if parent and id(parent) not in seen_parents:
-                        seen_parents.add(id(parent))
-                        job_listings.append(parent)
-                if job_listings:
-                    print(f"Found {len(job_listings)} jobs via link search")
+            page_soup = self._parse(page_data)
+
+            job_listings = self._find_job_cards(page_soup)
 
             if not job_listings:
                 print("No jobs found on this page")
                 break
 
             print(f"Processing {len(job_listings)} jobs...")
+            self.report('cards_seen', len(job_listings[:20]))
 
             for i, job in enumerate(job_listings[:20]):
                 try:
                     print(f"\n--- Job {i+1}/{len(job_listings)} ---")
 
-                    job_name = self._extract_job_title(job)
-                    if job_name == "Unknown Position":
-                        print("Could not extract job title, skipping")
-                        continue
-                    print(f"Job: {job_name}")
-
-                    job_company = self._extract_company_name(job, job_title=job_name)
-                    print(f"Company: {job_company}")
-
-                    job_location = self._extract_location(job)
-                    print(f"Location: {job_location}")
-
-                    job_link = self._extract_job_link(job)
-                    if not job_link:
-                        print("No link found, skipping")
-                        continue
-                    print(f"Link: {job_link}")
-
-                    if not is_url_in_database(job_link):
-                        print("✓ New job!")
-                        add_url_in_database(job_link)
-
-                        description = f"{job_name} - {job_company} - {job_location}"
-                        embed = create_embed(job_name, job_company, job_location, job_link, '')
-
-                        success = send_embed(embed, self, job_name, job_company, job_location, job_link, '', description)
-
-                        if success:
-                            jobs_found_this_run += 1
-                        time.sleep(4)
-                    else:
-                        print("✗ Already in database")
+                    job_data = self._parse_job_card(job)
+                    if job_data and self._handle_job(job_data):
+                        jobs_found_this_run += 1
 
                 except Exception as e:
+                    self.report_error(e)
                     print(f"Error processing job: {e}")
                     import traceback
                     traceback.print_exc()
                     continue
 
             print(f'APEC page finished - Total new jobs: {jobs_found_this_run}')
+            if not self.crawl_next_page():
+                break
             page += 1
 
         print(f"\n{'='*50}")
@@ -1,9 +1,5 @@
-import time
 import re
-from bs4 import BeautifulSoup
 
-from common.webhook import create_embed, send_embed
-from common.database import is_url_in_database, add_url_in_database
 from common.website import Website
 
 
@@ -13,10 +9,11 @@ class Cadremploi(Website):
     def __init__(self):
         super().__init__(
             'Cadremploi',
-            'https://www.cadremploi.fr/emploi/developpeur_logiciel_paris_{}',
+            'https://www.cadremploi.fr/emploi/{recherche}_{}',
             'CADREEMPLOI',
             'https://www.cadremploi.fr/assets/images/logo-cadremploi.svg',
             True,
+            queries=[{'recherche': 'developpeur_logiciel_paris'}],
         )
         self.page_load_timeout = 30
 
@@ -127,7 +124,7 @@ class Cadremploi(Website):
         if link:
             href = link['href']
             if href.startswith('/'):
-                return 'https://www.cadremploi.fr' + href
+                return self.base_url + href
             return href
 
         # Fallback: premier lien
@@ -135,7 +132,7 @@ class Cadremploi(Website):
         if link:
             href = link['href']
             if href.startswith('/'):
-                return 'https://www.cadremploi.fr' + href
+                return self.base_url + href
             return href
         return None
 
@@ -145,6 +142,68 @@ class Cadremploi(Website):
             return img.get('src', '')
         return ''
 
+    def _find_job_cards(self, soup):
+        # Chercher les offres avec sélecteurs multiples
+        jobs = []
+        selectors_to_try = [
+            'article.job-card',
+            'div.job-card',
+            'article.offer-card',
+            'div.offer-card',
+            'article[data-offer-id]',
+            'div[class*="job"]',
+            'div[class*="offer"]',
+            'article',
+            'li[class*="result"]',
+        ]
+
+        for selector in selectors_to_try:
+            jobs = soup.select(selector)
+            if jobs:
+                print(f"Found {len(jobs)} jobs with selector: {selector}")
+                break
+
+        # Fallback: recherche par liens
+        if not jobs:
+            job_links = soup.find_all('a', href=re.compile(r'/offre/'))
+            seen_parents = set()
+            for link in job_links:
+                parent = link.find_parent(['article', 'div', 'li'])
+                if parent and id(parent) not in seen_parents:
+                    seen_parents.add(id(parent))
+                    jobs.append(parent)
+            if jobs:
+                print(f"Found {len(jobs)} jobs via link search")
+        return jobs
+
+    def _parse_job_card(self, job):
+        """Extract a job from a listing card, or None if it can't be used."""
+        job_name = self._extract_job_title(job)
+        print(f"Job: {job_name}")
+
+        job_company = self._extract_company_name(job, job_title=job_name)
+        print(f"Company: {job_company}")
+
+        job_location = self._extract_location(job)
+        print(f"Location: {job_location}")
+
+        job_link = self._extract_job_link(job)
+        if not job_link:
+            print("No link found, skipping")
+            return None
+        print(f"Link: {job_link}")
+
+        job_thumbnail = self._extract_thumbnail(job)
+
+        return {
+            'name': job_name,
+            'company': job_company,
+            'location': job_location,
+            'link': job_link,
+            'thumbnail': job_thumbnail,
+            'description': f"{job_name} - {job_company}",
+        }
+
     def scrap(self):
         page = 1
         jobs_found = 0
@@ -160,9 +219,11 @@ class Cadremploi(Website):
 
             try:
                 self._init_driver(self.page_url)
-                time.sleep(4)  # Extra wait for Cloudflare
+                with self.stage('wait'):
+                    self._wait(4)  # Extra wait for Cloudflare
                 page_data = self._get_chrome_page_data()
             except Exception as e:
+                self.report_error(e)
                 print(f"Error: {e}")
                 break
 
@@ -171,39 +232,9 @@ class Cadremploi(Website):
                     f.write(page_data)
                 print("Saved debug HTML")
 
-            soup = BeautifulSoup(page_data, 'html.parser')
-
-            # Chercher les offres avec sélecteurs multiples
-            jobs = []
-            selectors_to_try = [
-                'article.job-card',
-                'div.job-card',
-                'article.offer-card',
-                'div.offer-card',
-                'article[data-offer-id]',
-                'div[class*="job"]',
-                'div[class*="offer"]',
-                'article',
-                'li[class*="result"]',
-            ]
-
-            for selector in selectors_to_try:
-                jobs = soup.select(selector)
-                if jobs:
-                    print(f"Found {len(jobs)} jobs with selector: {selector}")
-                    break
-
-            # Fallback: recherche par liens
-            if not jobs:
-                job_links = soup.find_all('a', href=re.compile(r'/offre/'))
-                seen_parents = set()
-                for link in job_links:
-                    parent = link.find_parent(['article', 'div', 'li'])
-                    if parent and id(parent) not in seen_parents:
-                        seen_parents.add(id(parent))
-                        jobs.append(parent)
-                if jobs:
-                    print(f"Found {len(jobs)} jobs via link search")
+            soup = self._parse(page_data)
+
+            jobs = self._find_job_cards(soup)
 
             if not jobs:
                 # Check if Cloudflare blocked us
@@ -213,45 +244,24 @@ class Cadremploi(Website):
                     print("No jobs found")
                 break
 
+            self.report('cards_seen', len(jobs[:20]))
+
             for i, job in enumerate(jobs[:20]):
                 try:
                     print(f"\n--- Job {i+1} ---")
 
-                    job_name = self._extract_job_title(job)
-                    print(f"Job: {job_name}")
-
-                    job_company = self._extract_company_name(job, job_title=job_name)
-                    print(f"Company: {job_company}")
-
-                    job_location = self._extract_location(job)
-                    print(f"Location: {job_location}")
-
-                    job_link = self._extract_job_link(job)
-                    if not job_link:
-                        print("No link found, skipping")
-                        continue
-                    print(f"Link: {job_link}")
-
-                    job_thumbnail = self._extract_thumbnail(job)
-
-                    if not is_url_in_database(job_link):
-                        print("✓ New job!")
-                        add_url_in_database(job_link)
-
-                        embed = create_embed(job_name, job_company, job_location, job_link, job_thumbnail)
-                        desc = f"{job_name} - {job_company}"
-
-                        if send_embed(embed, self, job_name, job_company, job_location, job_link, job_thumbnail, desc):
-                            jobs_found += 1
-                        time.sleep(3)
-                    else:
-                        print("✗ Already in database")
+                    job_data = self._parse_job_card(job)
+                    if job_data and self._handle_job(job_data):
+                        jobs_found += 1
 
                 except Exception as e:
+                    self.report_error(e)
                     print(f"Error: {e}")
                     continue
 
             print(f"Page {page} done - Total new: {jobs_found}")
+            if not self.crawl_next_page():
+                break
             page += 1
 
         print(f"\nCadremploi complete: {jobs_found} jobs")
@@ -1,9 +1,5 @@
-import time
 import re
-from bs4 import BeautifulSoup
 
-from common.webhook import create_embed, send_embed
-from common.database import is_url_in_database, add_url_in_database
 from common.website import Website
 
 
@@ -13,11 +9,13 @@ class Indeed(Website):
     def __init__(self):
         super().__init__(
             'Indeed France',
-            'https://fr.indeed.com/jobs?q=developpeur+software&l=Paris&sort=date&start={}',
+            'https://fr.indeed.com/jobs?q={q}&l={l}&sort=date&start={}',
             'INDEED JOBS',
             'https://upload.wikimedia.org/wikipedia/commons/thumb/f/fc/Indeed_logo.svg/1200px-Indeed_logo.svg.png',
             True,
+            queries=[{'q': 'developpeur+software', 'l': 'Paris'}],
         )
+        self.first_page = 0
         # Add extra Chrome options to avoid bot detection
         self.extra_chrome_options = [
             '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -176,7 +174,7 @@ class Indeed(Website):
             href = link['href']
             if '/rc/clk' in href or '/pagead/' in href or '/viewjob' in href or '/jobs/view' in href:
                 if href.startswith('/'):
-                    return 'https://fr.indeed.com' + href
+                    return self.base_url + href
                 elif href.startswith('http'):
                     return href
         return None
@@ -238,6 +236,87 @@ class Indeed(Website):
                     return text
         return None
 
+    def _find_job_cards(self, page_soup):
+        # Indeed job cards - be very flexible with selectors
+        job_listings = []
+
+        # Try many different selectors
+        selectors_to_try = [
+            ('div', {'data-testid': 'job-title'}),  # Modern Indeed
+            ('div', {'class': lambda x: x and 'job_seen_beacon' in str(x)}),
+            ('div', {'class': lambda x: x and 'slider_container' in str(x)}),
+            ('div', {'class': lambda x: x and 'slider' in str(x) and 'item' in str(x)}),
+            ('div', {'class': lambda x: x and 'tapItem' in str(x)}),
+            ('a', {'class': lambda x: x and 'tapItem' in str(x)}),
+            ('li', {'class': lambda x: x and 'css-5lfssm' in str(x)}),
+            ('div', {'class': lambda x: x and 'jobTitle' in str(x)}),
+        ]
+
+        for tag, attrs in selectors_to_try:
+            job_listings = page_soup.find_all(tag, attrs)
+            if job_listings:
+                print(f"Found {len(job_listings)} jobs with selector: {tag}")
+                break
+
+        # Alternative: look for any element containing job data
+        if not job_listings:
+            job_listings = page_soup.find_all('div', {'class': lambda x: x and 'job' in str(x).lower()})
+
+        return job_listings
+
+    def _parse_job_card(self, job):
+        """Extract a job from a listing card, or None if it can't be used."""
+        # Extract job title first
+        job_name = self._extract_job_title(job)
+        if job_name == "Unknown Position":
+            print("Could not extract job title, skipping")
+            return None
+        print(f"Job: {job_name}")
+
+        # Extract company
+        job_company = self._extract_company_name(job, job_title=job_name)
+        print(f"Company: {job_company}")
+
+        # Extract location
+        job_location = self._extract_location(job)
+        print(f"Location: {job_location}")
+
+        # Extract link
+        job_link = self._extract_job_link(job)
+        if not job_link:
+            print("No link found, skipping")
+            return None
+        print(f"Link: {job_link}")
+
+        # Extract thumbnail
+        job_thumbnail = self._extract_thumbnail(job)
+        if job_thumbnail:
+            print(f"Thumbnail found: {job_thumbnail[:60]}...")
+
+        # Extract technologies from snippet (since Indeed blocks page analysis)
+        techs = self._extract_technologies_from_snippet(job)
+        if techs:
+            print(f"Technologies detected from snippet: {', '.join(techs)}")
+
+        # Extract salary if available
+        salary = self._extract_salary(job)
+        if salary:
+            print(f"Salary: {salary}")
+
+        description = f"{job_name} - {job_company} - {job_location}"
+        if salary:
+            description += f" - {salary}"
+
+        return {
+            'name': job_name,
+            'company': job_company,
+            'location': job_location,
+            'link': job_link,
+            'thumbnail': job_thumbnail,
+            'description': description,
+            'technologies': techs,  # Indeed blocks page analysis
+        }
+
     def scrap(self):
         page = 0
         jobs_found_this_run = 0
@@ -254,6 +333,7 @@ class Indeed(Website):
                 self._init_driver(self.page_url)
                 page_data = self._get_chrome_page_data()
             except Exception as e:
+                self.report_error(e)
                 print(f"Error loading page: {e}")
                 break
             
@@ -270,116 +350,35 @@ class Indeed(Website):
                     f.write(page_data)
                 print("Saved debug HTML to /tmp/indeed_debug.html")
             
-            page_soup = BeautifulSoup(page_data, 'html.parser')
-            
-            # Indeed job cards - be very flexible with selectors
-            job_listings = []
-            
-            # Try many different selectors
-            selectors_to_try = [
-                ('div', {'data-testid': 'job-title'}),  # Modern Indeed
-                ('div', {'class': lambda x: x and 'job_seen_beacon' in str(x)}),
-                ('div', {'class': lambda x: x and 'slider_container' in str(x)}),
-                ('div', {'class': lambda x: x and 'slider' in str(x) and 'item' in str(x)}),
-                ('div', {'class': lambda x: x and 'tapItem' in str(x)}),
-                ('a', {'class': lambda x: x and 'tapItem' in str(x)}),
-                ('li', {'class': lambda x: x and 'css-5lfssm' in str(x)}),
-                ('div', {'class': lambda x: x and 'jobTitle' in str(x)}),
-            ]
-            
-            for tag, attrs in selectors_to_try:
-                job_listings = page_soup.find_all(tag, attrs)
-                if job_listings:
-                    print(f"Found {len(job_listings)} jobs with selector: {tag}")
-                    break
-            
-            # Alternative: look for any element containing job data
-            if not job_listings:
-                job_listings = page_soup.find_all('div', {'class': lambda x: x and 'job' in str(x).lower()})
+            page_soup = self._parse(page_data)
             
+            job_listings = self._find_job_cards(page_soup)
+
             if not job_listings or page >= 20:  # Limit to 2 pages
                 print("No more jobs found or page limit reached")
                 break
 
             print(f"Processing {len(job_listings)} jobs...")
+            self.report('cards_seen', len(job_listings))
             
             for i, job in enumerate(job_listings):
                 try:
                     print(f"\n--- Job {i+1}/{len(job_listings)} ---")
                     
-                    # Extract job title first
-                    job_name = self._extract_job_title(job)
-                    if job_name == "Unknown Position":
-                        print("Could not extract job title, skipping")
-                        continue
-                    print(f"Job: {job_name}")
-                    
-                    # Extract company
-                    job_company = self._extract_company_name(job, job_title=job_name)
-                    print(f"Company: {job_company}")
-                    
-                    # Extract location
-                    job_location = self._extract_location(job)
-                    print(f"Location: {job_location}")
-                    
-                    # Extract link
-                    job_link = self._extract_job_link(job)
-                    if not job_link:
-                        print("No link found, skipping")
-                        continue
-                    print(f"Link: {job_link}")
-                    
-                    # Extract thumbnail
-                    job_thumbnail = self._extract_thumbnail(job)
-                    if job_thumbnail:
-                        print(f"Thumbnail found: {job_thumbnail[:60]}...")
-                    
-                    # Extract technologies from snippet (since Indeed blocks page analysis)
-                    techs = self._extract_technologies_from_snippet(job)
-                    if techs:
-                        print(f"Technologies detected from snippet: {', '.join(techs)}")
-                    
-                    # Extract salary if available
-                    salary = self._extract_salary(job)
-                    if salary:
-                        print(f"Salary: {salary}")
-                    
-                    # Check database
-                    if not is_url_in_database(job_link):
-                        print("✓ New job!")
-                        add_url_in_database(job_link)
-                        
-                        # Build description
-                        description = f"{job_name} - {job_company} - {job_location}"
-                        if salary:
-                            description += f" - {salary}"
-                        
-                        embed = create_embed(job_name, job_company, job_location, job_link, job_thumbnail)
-                        
-                        # Pass technologies to be saved
-                        success = send_embed(embed, self, job_name, job_company, job_location, job_link, job_thumbnail, description)
-                        
-                        if success and techs:
-                            # Update the job with technologies we found
-                            from common.database import jobs_collection
-                            jobs_collection.update_one(
-                                {'url': job_link},
-                                {'$set': {'technologies': techs}}
-                            )
-                        
-                        if success:
-                            jobs_found_this_run += 1
-                        time.sleep(4)
-                    else:
-                        print("✗ Already in database")
+                    job_data = self._parse_job_card(job)
+                    if job_data and self._handle_job(job_data):
+                        jobs_found_this_run += 1
                         
                 except Exception as e:
+                    self.report_error(e)
                     print(f"Error processing job: {e}")
                     import traceback
                     traceback.print_exc()
                     continue
 
             print(f'Indeed page finished - Total new jobs: {jobs_found_this_run}')
+            if not self.crawl_next_page():
+                break
             page += 10
             
         print(f"\n{'='*50}")
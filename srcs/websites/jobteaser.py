@@ -1,13 +1,9 @@
-import time
 import re
-from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from urllib.parse import unquote
 
-from common.webhook import create_embed, send_embed
-from common.database import is_url_in_database, add_url_in_database
 from common.website import Website
 
 
@@ -17,21 +13,24 @@ class JobTeaser(Website):
     def __init__(self):
         super().__init__(
             'Job Teaser',
-            'https://www.jobteaser.com/fr/job-offers?p={}&contract=cdd,cdi&position_category_uuid=ddc0460c-ce0b-4d98-bc5d-d8829ff9cf11&location=France%3A%3A%C3%8Ele-de-France..%C3%8Ele-de-France%20(France)&locale=en,fr',
+            'https://www.jobteaser.com/fr/job-offers?p={}&contract=cdd,cdi&position_category_uuid={position_category_uuid}&location={location}&locale=en,fr',
             'JOB TEASER JOBS',
             'https://d1guu6n8gz71j.cloudfront.net/system/asset/logos/27460/logo_mobile.png',
-            False
+            False,
+            queries=[{'position_category_uuid': 'ddc0460c-ce0b-4d98-bc5d-d8829ff9cf11',
+                      'location': 'France%3A%3A%C3%8Ele-de-France..%C3%8Ele-de-France%20(France)'}],
         )
         self.page_load_timeout = 30
+        self.first_page = 0
 
     def _click_agree_button(self):
         """Click the cookie consent button if present"""
         try:
-            time.sleep(2)
+            self._wait(2)
             agree_button = self.driver.find_element(By.XPATH, '//*[@id="didomi-notice-agree-button"]')
             agree_button.click()
             print("Clicked on cookie consent button.")
-            time.sleep(1)
+            self._wait(1)
         except Exception:
             print("No cookie button found, continuing...")
 
@@ -41,7 +40,7 @@ class JobTeaser(Website):
             WebDriverWait(self.driver, 15).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="jobad-card"], article, .job-card, [class*="job"]'))
             )
-            time.sleep(3)
+            self._wait(3)
             print("Job cards loaded successfully")
             return True
         except Exception as e:
@@ -111,7 +110,7 @@ class JobTeaser(Website):
                 title = link.get_text(strip=True)
                 if len(title) > 5:
                     if href.startswith('/'):
-                        href = 'https://www.jobteaser.com' + href
+                        href = self.base_url + href
                     return title, href
 
         # Fallback: any link with significant text
@@ -120,7 +119,7 @@ class JobTeaser(Website):
             if 10 < len(title) < 120 and any(kw in title.lower() for kw in ['développeur', 'developpeur', 'developer', 'engineer']):
                 href = link['href']
                 if href.startswith('/'):
-                    href = 'https://www.jobteaser.com' + href
+                    href = self.base_url + href
                 return title, href
 
         return None, None
@@ -135,6 +134,64 @@ class JobTeaser(Website):
                 return thumbnail_url
         return ''
 
+    def _find_job_cards(self, page_soup):
+        # Try multiple selectors for job container
+        job_ads_wrapper = None
+        for selector in [
+            {'data-testid': 'job-ads-wrapper'},
+            {'data-testid': 'search-results-list'},
+            {'class': lambda x: x and 'results' in str(x).lower()},
+        ]:
+            job_ads_wrapper = page_soup.find('ul', selector) or page_soup.find('div', selector)
+            if job_ads_wrapper:
+                break
+
+        # Find all jobs
+        all_jobs_raw = []
+        if job_ads_wrapper:
+            all_jobs_raw = job_ads_wrapper.find_all(attrs={'data-testid': 'jobad-card'})
+            if not all_jobs_raw:
+                all_jobs_raw = job_ads_wrapper.find_all('article')
+            if not all_jobs_raw:
+                all_jobs_raw = job_ads_wrapper.find_all('li')
+
+        # Fallback: search entire page for job links
+        if not all_jobs_raw:
+            job_links = page_soup.find_all('a', href=re.compile(r'/job_offers/|/job-offer'))
+            seen_parents = set()
+            for link in job_links:
+                parent = link.find_parent(['article', 'div', 'li'])
+                if parent and id(parent) not in seen_parents:
+                    seen_parents.add(id(parent))
+                    all_jobs_raw.append(parent)
+        return all_jobs_raw
+
+    def _parse_job_card(self, jobs):
+        """Extract a job from a listing card, or None if it can't be used."""
+        job_company = self._extract_company(jobs)
+        if not job_company:
+            print('Could not find company name, skipping job')
+            return None
+        print(f'Company: {job_company}')
+
+        job_name, job_link = self._extract_job_title_and_link(jobs)
+        if not job_name or not job_link:
+            print('Could not find job title/link, skipping job')
+            return None
+        print(f'Job: {job_name}')
+        print(f'Link: {job_link}')
+
+        job_thumbnail = self._extract_thumbnail(jobs)
+
+        return {
+            'name': job_name,
+            'company': job_company,
+            'location': 'Paris',
+            'link': job_link,
+            'thumbnail': job_thumbnail,
+            'description': f"{job_name} {job_company}",
+        }
+
     def scrap(self):
         page = 0
         total_jobs_found = 0
@@ -150,9 +207,12 @@ class JobTeaser(Website):
 
             try:
                 self._init_driver(self.page_url)
-                self._click_agree_button()
-                self._wait_for_jobs_to_load()
+                with self.stage('cookie_consent'):
+                    self._click_agree_button()
+                with self.stage('wait'):
+                    self._wait_for_jobs_to_load()
             except Exception as e:
+                self.report_error(e)
                 print(f"Error initializing driver: {e}")
                 break
 
@@ -160,6 +220,7 @@ class JobTeaser(Website):
             try:
                 page_data = self._get_chrome_page_data()
             except Exception as e:
+                self.report_error(e)
                 print(f"Error getting page data: {e}")
                 break
 
@@ -169,81 +230,35 @@ class JobTeaser(Website):
                     f.write(page_data)
                 print("Saved debug HTML to /tmp/jobteaser_debug.html")
 
-            page_soup = BeautifulSoup(page_data, 'html.parser')
-
-            # Try multiple selectors for job container
-            job_ads_wrapper = None
-            for selector in [
-                {'data-testid': 'job-ads-wrapper'},
-                {'data-testid': 'search-results-list'},
-                {'class': lambda x: x and 'results' in str(x).lower()},
-            ]:
-                job_ads_wrapper = page_soup.find('ul', selector) or page_soup.find('div', selector)
-                if job_ads_wrapper:
-                    break
-
-            # Find all jobs
-            all_jobs_raw = []
-            if job_ads_wrapper:
-                all_jobs_raw = job_ads_wrapper.find_all(attrs={'data-testid': 'jobad-card'})
-                if not all_jobs_raw:
-                    all_jobs_raw = job_ads_wrapper.find_all('article')
-                if not all_jobs_raw:
-                    all_jobs_raw = job_ads_wrapper.find_all('li')
+            page_soup = self._parse(page_data)
 
-            # Fallback: search entire page for job links
-            if not all_jobs_raw:
-                job_links = page_soup.find_all('a', href=re.compile(r'/job_offers/|/job-offer'))
-                seen_parents = set()
-                for link in job_links:
-                    parent = link.find_parent(['article', 'div', 'li'])
-                    if parent and id(parent) not in seen_parents:
-                        seen_parents.add(id(parent))
-                        all_jobs_raw.append(parent)
+            all_jobs_raw = self._find_job_cards(page_soup)
 
             if not all_jobs_raw:
                 print("No job cards found")
                 break
 
             print(f"\nProcessing {len(all_jobs_raw)} jobs...")
+            self.report('cards_seen', len(all_jobs_raw))
 
             for i, jobs in enumerate(all_jobs_raw):
                 try:
                     print(f"\n--- Job {i+1}/{len(all_jobs_raw)} ---")
 
-                    job_company = self._extract_company(jobs)
-                    if not job_company:
-                        print('Could not find company name, skipping job')
-                        continue
-                    print(f'Company: {job_company}')
-
-                    job_name, job_link = self._extract_job_title_and_link(jobs)
-                    if not job_name or not job_link:
-                        print('Could not find job title/link, skipping job')
-                        continue
-                    print(f'Job: {job_name}')
-                    print(f'Link: {job_link}')
-
-                    job_thumbnail = self._extract_thumbnail(jobs)
-
-                    if not is_url_in_database(job_link):
-                        print(f"✓ New job found!")
-                        add_url_in_database(job_link)
-                        embed = create_embed(job_name, job_company, 'Paris', job_link, job_thumbnail)
-                        description = f"{job_name} {job_company}"
-                        send_embed(embed, self, job_name, job_company, 'Paris', job_link, job_thumbnail, description)
+                    job_data = self._parse_job_card(jobs)
+                    if job_data and self._handle_job(job_data):
                         total_jobs_found += 1
-                        time.sleep(4)
-                    else:
-                        print(f"✗ Job already in database")
 
                 except Exception as e:
+                    self.report_error(e)
                     print(f"Error processing job: {e}")
                     import traceback
                     traceback.print_exc()
                     continue
 
             print(f'\nJob Teaser page #{page} finished - Total jobs this run: {total_jobs_found}')
+            if not self.crawl_next_page():
+                break
             page += 1
 
         print(f"\n{'='*50}")
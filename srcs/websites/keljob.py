@@ -1,9 +1,3 @@
-import time
-import re
-from bs4 import BeautifulSoup
-
-from common.webhook import create_embed, send_embed
-from common.database import is_url_in_database, add_url_in_database
 from common.website import Website
 
 
@@ -1,9 +1,5 @@
-import time
 import re
-from bs4 import BeautifulSoup
 
-from common.webhook import create_embed, send_embed
-from common.database import is_url_in_database, add_url_in_database
 from common.website import Website
 
 
@@ -13,10 +9,11 @@ class LesJeudis(Website):
     def __init__(self):
         super().__init__(
             'LesJeudis',
-            'https://www.lesjeudis.com/recherche?f=1&q=developpeur&l=Paris&p={}',
+            'https://www.lesjeudis.com/recherche?f=1&q={q}&l={l}&p={}',
             'LES JEUDIS',
             'https://www.lesjeudis.com/assets/images/logo-lesjeudis.svg',
             True,
+            queries=[{'q': 'developpeur', 'l': 'Paris'}],
         )
         # Options Chrome avancées pour contourner Cloudflare
         self.extra_chrome_options = [
@@ -139,7 +136,7 @@ class LesJeudis(Website):
         if link:
             href = link['href']
             if href.startswith('/'):
-                return 'https://www.lesjeudis.com' + href
+                return self.base_url + href
             return href
         
         # Fallback: premier lien
@@ -147,7 +144,7 @@ class LesJeudis(Website):
         if link:
             href = link['href']
             if href.startswith('/'):
-                return 'https://www.lesjeudis.com' + href
+                return self.base_url + href
             return href
         return None
 
@@ -157,6 +154,54 @@ class LesJeudis(Website):
             return img.get('src', '')
         return ''
 
+    def _find_job_cards(self, soup):
+        # Chercher les offres avec sélecteurs 2025
+        jobs = []
+        selectors_to_try = [
+            'article.job-card',
+            'div.job-card',
+            'article[data-testid]',
+            'div[data-testid*="job"]',
+            'li.job-item',
+            'article',
+            'div[class*="job"]',
+        ]
+
+        for selector in selectors_to_try:
+            jobs = soup.select(selector)
+            if jobs:
+                print(f"Found {len(jobs)} jobs with selector: {selector}")
+                break
+        return jobs
+
+    def _parse_job_card(self, job):
+        """Extract a job from a listing card, or None if it can't be used."""
+        job_name = self._extract_job_title(job)
+        print(f"Job: {job_name}")
+
+        job_company = self._extract_company_name(job, job_title=job_name)
+        print(f"Company: {job_company}")
+
+        job_location = self._extract_location(job)
+        print(f"Location: {job_location}")
+
+        job_link = self._extract_job_link(job)
+        if not job_link:
+            print("No link found, skipping")
+            return None
+        print(f"Link: {job_link}")
+
+        job_thumbnail = self._extract_thumbnail(job)
+
+        return {
+            'name': job_name,
+            'company': job_company,
+            'location': job_location,
+            'link': job_link,
+            'thumbnail': job_thumbnail,
+            'description': f"{job_name} - {job_company}",
+        }
+
     def scrap(self):
         page = 1
         jobs_found = 0
@@ -174,10 +219,12 @@ class LesJeudis(Website):
                 self._init_driver(self.page_url)
                 
                 # Attendre que la page charge complètement
-                time.sleep(5)
+                with self.stage('wait'):
+                    self._wait(5)
                 
                 page_data = self._get_chrome_page_data()
             except Exception as e:
+                self.report_error(e)
                 print(f"Error: {e}")
                 break
 
@@ -186,25 +233,9 @@ class LesJeudis(Website):
                     f.write(page_data)
                 print("Saved debug HTML")
 
-            soup = BeautifulSoup(page_data, 'html.parser')
+            soup = self._parse(page_data)
             
-            # Chercher les offres avec sélecteurs 2025
-            jobs = []
-            selectors_to_try = [
-                'article.job-card',
-                'div.job-card',
-                'article[data-testid]',
-                'div[data-testid*="job"]',
-                'li.job-item',
-                'article',
-                'div[class*="job"]',
-            ]
-            
-            for selector in selectors_to_try:
-                jobs = soup.select(selector)
-                if jobs:
-                    print(f"Found {len(jobs)} jobs with selector: {selector}")
-                    break
+            jobs = self._find_job_cards(soup)
 
             if not jobs:
                 # Vérifier si c'est une page de challenge Cloudflare
@@ -214,45 +245,24 @@ class LesJeudis(Website):
                     print("No jobs found")
                 break
 
+            self.report('cards_seen', len(jobs[:20]))
+
             for i, job in enumerate(jobs[:20]):
                 try:
                     print(f"\n--- Job {i+1} ---")
                     
-                    job_name = self._extract_job_title(job)
-                    print(f"Job: {job_name}")
-                    
-                    job_company = self._extract_company_name(job, job_title=job_name)
-                    print(f"Company: {job_company}")
-                    
-                    job_location = self._extract_location(job)
-                    print(f"Location: {job_location}")
-                    
-                    job_link = self._extract_job_link(job)
-                    if not job_link:
-                        print("No link found, skipping")
-                        continue
-                    print(f"Link: {job_link}")
-                    
-                    job_thumbnail = self._extract_thumbnail(job)
-
-                    if not is_url_in_database(job_link):
-                        print("✓ New job!")
-                        add_url_in_database(job_link)
-                        
-                        embed = create_embed(job_name, job_company, job_location, job_link, job_thumbnail)
-                        desc = f"{job_name} - {job_company}"
-                        
-                        if send_embed(embed, self, job_name, job_company, job_location, job_link, job_thumbnail, desc):
-                            jobs_found += 1
-                        time.sleep(3)
-                    else:
-                        print("✗ Already in database")
+                    job_data = self._parse_job_card(job)
+                    if job_data and self._handle_job(job_data):
+                        jobs_found += 1
                         
                 except Exception as e:
+                    self.report_error(e)
                     print(f"Error: {e}")
                     continue
 
             print(f"Page {page} done - Total new: {jobs_found}")
+            if not self.crawl_next_page():
+                break
             page += 1
 
         print(f"\nLesJeudis complete: {jobs_found} jobs")
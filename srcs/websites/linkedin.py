@@ -1,9 +1,5 @@
-import time
 import re
-from bs4 import BeautifulSoup
 
-from common.webhook import create_embed, send_embed
-from common.database import is_url_in_database, add_url_in_database
 from common.website import Website
 
 
@@ -13,11 +9,13 @@ class LinkedIn(Website):
     def __init__(self):
         super().__init__(
             'LinkedIn',
-            'https://www.linkedin.com/jobs/search?keywords=D%C3%A9veloppeur%20Software&location=Paris%2C%20France&geoId=105015875&f_TPR=r86400&start={}',
+            'https://www.linkedin.com/jobs/search?keywords={keywords}&location={location}&geoId={geoId}&f_TPR=r86400&start={}',
             'LINKEDIN JOBS',
             'https://content.linkedin.com/content/dam/me/business/en-us/amp/brand-site/v2/bg/LI-Logo.svg.original.svg',
             True,
+            queries=[{'keywords': 'D%C3%A9veloppeur%20Software', 'location': 'Paris%2C%20France', 'geoId': '105015875'}],
         )
+        self.first_page = 0
         # Add extra Chrome options
         self.extra_chrome_options = [
             '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -130,7 +128,7 @@ class LinkedIn(Website):
             href = link['href']
             if '/jobs/view/' in href:
                 if href.startswith('/'):
-                    return 'https://www.linkedin.com' + href
+                    return self.base_url + href
                 return href
         return None
 
@@ -160,6 +158,72 @@ class LinkedIn(Website):
         
         return ''
 
+    def _find_job_cards(self, page_soup):
+        # LinkedIn job cards
+        job_listings = []
+
+        selectors_to_try = [
+            ('div', {'class': lambda x: x and 'job-card-container' in str(x)}),
+            ('li', {'class': lambda x: x and 'jobs-search-results__list-item' in str(x)}),
+            ('div', {'class': lambda x: x and 'base-card' in str(x)}),
+            ('div', {'data-job-id': True}),
+            ('div', {'class': lambda x: x and 'job-search-card' in str(x)}),
+        ]
+
+        for tag, attrs in selectors_to_try:
+            job_listings = page_soup.find_all(tag, attrs)
+            if job_listings:
+                print(f"Found {len(job_listings)} jobs with selector: {tag}")
+                break
+
+        # Alternative: find by job links
+        if not job_listings:
+            job_links = page_soup.find_all('a', href=re.compile(r'/jobs/view/'))
+            job_listings = [link.find_parent(['div', 'li', 'article']) for link in job_links if link.find_parent()]
+            job_listings = [j for j in job_listings if j]
+            if job_listings:
+                print(f"Found {len(job_listings)} jobs via link search")
+
+        return job_listings
+
+    def _parse_job_card(self, job):
+        """Extract a job from a listing card, or None if it can't be used."""
+        # Extract job title first
+        job_name = self._extract_job_title(job)
+        if job_name == "Unknown Position":
+            print("Could not extract job title, skipping")
+            return None
+        print(f"Job: {job_name}")
+
+        # Extract company
+        job_company = self._extract_company_name(job, job_title=job_name)
+        print(f"Company: {job_company}")
+
+        # Extract location
+        job_location = self._extract_location(job)
+        print(f"Location: {job_location}")
+
+        # Extract link
+        job_link = self._extract_job_link(job)
+        if not job_link:
+            print("No link found, skipping")
+            return None
+        print(f"Link: {job_link}")
+
+        # Extract thumbnail
+        job_thumbnail = self._extract_thumbnail(job)
+        if job_thumbnail:
+            print(f"Thumbnail: {job_thumbnail[:80]}...")
+
+        return {
+            'name': job_name,
+            'company': job_company,
+            'location': job_location,
+            'link': job_link,
+            'thumbnail': job_thumbnail,
+            'description': f"{job_name} - {job_company} - {job_location}",
+        }
+
     def scrap(self):
         page = 0
         jobs_found_this_run = 0
@@ -176,6 +240,7 @@ class LinkedIn(Website):
                 self._init_driver(self.page_url)
                 page_data = self._get_chrome_page_data()
             except Exception as e:
+                self.report_error(e)
                 print(f"Error loading page: {e}")
                 break
             
@@ -192,94 +257,35 @@ class LinkedIn(Website):
                     f.write(page_data)
                 print("Saved debug HTML to /tmp/linkedin_debug.html")
             
-            page_soup = BeautifulSoup(page_data, 'html.parser')
-            
-            # LinkedIn job cards
-            job_listings = []
-            
-            selectors_to_try = [
-                ('div', {'class': lambda x: x and 'job-card-container' in str(x)}),
-                ('li', {'class': lambda x: x and 'jobs-search-results__list-item' in str(x)}),
-                ('div', {'class': lambda x: x and 'base-card' in str(x)}),
-                ('div', {'data-job-id': True}),
-                ('div', {'class': lambda x: x and 'job-search-card' in str(x)}),
-            ]
-            
-            for tag, attrs in selectors_to_try:
-                job_listings = page_soup.find_all(tag, attrs)
-                if job_listings:
-                    print(f"Found {len(job_listings)} jobs with selector: {tag}")
-                    break
-            
-            # Alternative: find by job links
-            if not job_listings:
-                job_links = page_soup.find_all('a', href=re.compile(r'/jobs/view/'))
-                job_listings = [link.find_parent(['div', 'li', 'article']) for link in job_links if link.find_parent()]
-                job_listings = [j for j in job_listings if j]
-                if job_listings:
-                    print(f"Found {len(job_listings)} jobs via link search")
+            page_soup = self._parse(page_data)
             
+            job_listings = self._find_job_cards(page_soup)
+
             if not job_listings or page >= 25:  # Limit to ~1 page
                 print("No more jobs found or page limit reached")
                 break
 
             print(f"Processing {len(job_listings)} jobs...")
+            self.report('cards_seen', len(job_listings))
             
             for i, job in enumerate(job_listings):
                 try:
                     print(f"\n--- Job {i+1}/{len(job_listings)} ---")
                     
-                    # Extract job title first
-                    job_name = self._extract_job_title(job)
-                    if job_name == "Unknown Position":
-                        print("Could not extract job title, skipping")
-                        continue
-                    print(f"Job: {job_name}")
-                    
-                    # Extract company
-                    job_company = self._extract_company_name(job, job_title=job_name)
-                    print(f"Company: {job_company}")
-                    
-                    # Extract location
-                    job_location = self._extract_location(job)
-                    print(f"Location: {job_location}")
-                    
-                    # Extract link
-                    job_link = self._extract_job_link(job)
-                    if not job_link:
-                        print("No link found, skipping")
-                        continue
-                    print(f"Link: {job_link}")
-                    
-                    # Extract thumbnail
-                    job_thumbnail = self._extract_thumbnail(job)
-                    if job_thumbnail:
-                        print(f"Thumbnail: {job_thumbnail[:80]}...")
-                    
-                    # Check database
-                    if not is_url_in_database(job_link):
-                        print("✓ New job!")
-                        add_url_in_database(job_link)
-                        
-                        description = f"{job_name} - {job_company} - {job_location}"
-                        
-                        embed = create_embed(job_name, job_company, job_location, job_link, job_thumbnail)
-                        
-                        success = send_embed(embed, self, job_name, job_company, job_location, job_link, job_thumbnail, description)
-                        
-                        if success:
-                            jobs_found_this_run += 1
-                        time.sleep(4)
-                    else:
-                        print("✗ Already in database")
+                    job_data = self._parse_job_card(job)
+                    if job_data and self._handle_job(job_data):
+                        jobs_found_this_run += 1
                         
                 except Exception as e:
+                    self.report_error(e)
                     print(f"Error processing job: {e}")
                     import traceback
                     traceback.print_exc()
                     continue
 
             print(f'LinkedIn page finished - Total new jobs: {jobs_found_this_run}')
+            if not self.crawl_next_page():
+                break
             page += 25
             
         print(f"\n{'='*50}")
@@ -1,9 +1,5 @@
-import time
 import re
-from bs4 import BeautifulSoup
 
-from common.webhook import create_embed, send_embed
-from common.database import is_url_in_database, add_url_in_database
 from common.website import Website
 
 
@@ -12,11 +8,13 @@ class StationF(Website):
     def __init__(self):
         super().__init__(
             'Station F',
-            'https://jobs.stationf.co/search?query=dev{}&departments%5B0%5D=Tech&departments%5B1%5D=Tech%20%26%20Dev&departments%5B2%5D=Tech%2FDev&departments%5B3%5D=Dev&contract_types%5B0%5D=Full-Time&contract_types%5B1%5D=Freelance&contract_types%5B2%5D=Temporary',
+            'https://jobs.stationf.co/search?query={query}{}&departments%5B0%5D=Tech&departments%5B1%5D=Tech%20%26%20Dev&departments%5B2%5D=Tech%2FDev&departments%5B3%5D=Dev&contract_types%5B0%5D=Full-Time&contract_types%5B1%5D=Freelance&contract_types%5B2%5D=Temporary',
             'STATION F JOBS',
             'https://mbem.fr/wp-content/uploads/2018/06/station-f-logo-copie.png',
-            False
+            False,
+            queries=[{'query': 'dev'}],
         )
+        self.first_page = ''  # Pas de paramètre de page pour la première
 
     def _is_valid_company_name(self, text):
         """Check if text is a valid company name (not a phrase or generic text)"""
@@ -82,6 +80,61 @@ class StationF(Website):
 
         return "Entreprise non spécifiée"
 
+    def _find_job_cards(self, page_soup):
+        return page_soup.find_all('li', attrs={'class': 'ais-Hits-item'})
+
+    def _parse_job_card(self, jobs):
+        """Extract a job from a listing card, or None if it can't be used."""
+        # Find job title
+        job_title_h4 = jobs.find('h4', attrs={'class': 'job-title'})
+        if not job_title_h4:
+            print('Could not find job title, skipping job')
+            return None
+        job_name = job_title_h4.text.strip()
+        print('Job : ' + job_name)
+
+        # Find company name with validation
+        job_company = self._extract_company_name(jobs)
+        print('Company : ' + job_company)
+
+        # Find location
+        job_location_li = jobs.find(
+            'li', attrs={'class': 'job-office'})
+        if not job_location_li:
+            print('Could not find location, using default')
+            job_location = 'Paris'
+        else:
+            job_location = job_location_li.text.strip()
+        print('Location : ' + job_location)
+
+        # Find job link
+        job_link_a = jobs.find(
+            'a', attrs={'class': 'jobs-item-link'}, href=True)
+        if not job_link_a:
+            print('Could not find job link, skipping job')
+            return None
+        job_link = self.base_url + job_link_a['href']
+        print(f'Link : {job_link}')
+
+        # Find thumbnail
+        job_thumbnail = ''
+        company_logo_div = jobs.find(
+            'div', attrs={'class': 'company-logo'})
+        if company_logo_div and 'style' in company_logo_div.attrs:
+            thumbnail_match = re.search(
+                "(?P<url>https?://[^\s]+)", company_logo_div['style'])
+            if thumbnail_match:
+                job_thumbnail = thumbnail_match.group("url")[:-2]
+
+        return {
+            'name': job_name,
+            'company': job_company,
+            'location': job_location,
+            'link': job_link,
+            'thumbnail': job_thumbnail,
+            'description': f"{job_name} {job_company} {job_location}",
+        }
+
     def scrap(self):
         page = 1
         total_jobs_found = 0
@@ -95,81 +148,33 @@ class StationF(Website):
                 '&page={}'.format(page) if page != 1 else '')
             self._init_driver(self.page_url)
             page_data = self._get_chrome_page_data()
-            page_soup = BeautifulSoup(page_data, 'html.parser')
-            all_jobs_raw = page_soup.find_all(
-                'li', attrs={'class': 'ais-Hits-item'})
+            page_soup = self._parse(page_data)
+            all_jobs_raw = self._find_job_cards(page_soup)
 
             if len(all_jobs_raw) == 0 or page >= 2:  # Scrap finished
                 print("No more jobs found")
                 break
 
             print(f"\nStation F found {len(all_jobs_raw)} jobs")
+            self.report('cards_seen', len(all_jobs_raw))
             for i, jobs in enumerate(all_jobs_raw):
                 try:
                     print(f"\n--- Job {i+1}/{len(all_jobs_raw)} ---")
 
-                    # Find job title
-                    job_title_h4 = jobs.find('h4', attrs={'class': 'job-title'})
-                    if not job_title_h4:
-                        print('Could not find job title, skipping job')
-                        continue
-                    job_name = job_title_h4.text.strip()
-                    print('Job : ' + job_name)
-
-                    # Find company name with validation
-                    job_company = self._extract_company_name(jobs)
-                    print('Company : ' + job_company)
-
-                    # Find location
-                    job_location_li = jobs.find(
-                        'li', attrs={'class': 'job-office'})
-                    if not job_location_li:
-                        print('Could not find location, using default')
-                        job_location = 'Paris'
-                    else:
-                        job_location = job_location_li.text.strip()
-                    print('Location : ' + job_location)
-
-                    # Find job link
-                    job_link_a = jobs.find(
-                        'a', attrs={'class': 'jobs-item-link'}, href=True)
-                    if not job_link_a:
-                        print('Could not find job link, skipping job')
-                        continue
-                    job_link = 'https://jobs.stationf.co' + job_link_a['href']
-                    print(f'Link : {job_link}')
-
-                    # Find thumbnail
-                    job_thumbnail = ''
-                    company_logo_div = jobs.find(
-                        'div', attrs={'class': 'company-logo'})
-                    if company_logo_div and 'style' in company_logo_div.attrs:
-                        thumbnail_match = re.search(
-                            "(?P<url>https?://[^\s]+)", company_logo_div['style'])
-                        if thumbnail_match:
-                            job_thumbnail = thumbnail_match.group("url")[:-2]
-
-                    if not is_url_in_database(job_link):
-                        print("✓ New job!")
-                        add_url_in_database(job_link)
-                        embed = create_embed(
-                            job_name, job_company, job_location, job_link, job_thumbnail)
-
-                        description = f"{job_name} {job_company} {job_location}"
-                        send_embed(embed, self, job_name, job_company,
-                                   job_location, job_link, job_thumbnail, description)
+                    job_data = self._parse_job_card(jobs)
+                    if job_data and self._handle_job(job_data):
                         total_jobs_found += 1
-                        time.sleep(4)
-                    else:
-                        print("✗ Already in database")
 
                 except Exception as e:
+                    self.report_error(e)
                     print(f"Error processing job: {e}")
                     import traceback
                     traceback.print_exc()
                     continue
 
             print(f'Station F page #{page} finished - New jobs this page: {total_jobs_found}')
+            if not self.crawl_next_page():
+                break
             page += 1
 
         print(f"\n{'='*50}")
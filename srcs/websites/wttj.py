@@ -1,9 +1,5 @@
-import time
 import re
-from bs4 import BeautifulSoup
 
-from common.webhook import create_embed, send_embed
-from common.database import is_url_in_database, add_url_in_database
 from common.website import Website
 
 
@@ -17,10 +13,11 @@ class WTTJ(Website):
     def __init__(self):
         super().__init__(
             'Welcome to the Jungle',
-            'https://www.welcometothejungle.com/fr/pages/emploi-developpeur?page={}',
+            'https://www.welcometothejungle.com/fr/pages/emploi-{metier}?page={}',
             'WTTJ JOBS',
             'https://www.startupbegins.com/wp-content/uploads/2018/05/Logo-Welcome-to-the-Jungle.jpg',
             True,
+            queries=[{'metier': 'developpeur'}],
         )
         self.page_load_timeout = 45
 
@@ -42,7 +39,7 @@ class WTTJ(Website):
                     return True
             except Exception:
                 pass
-            time.sleep(1)
+            self._wait(1)
         print("Warning: minimal content, continuing anyway...")
         return True
 
@@ -51,23 +48,23 @@ class WTTJ(Website):
         print("Scrolling to trigger lazy loading...")
         for _ in range(80):
             self.driver.execute_script("window.scrollTo(0, window.scrollY + 400)")
-            time.sleep(0.15)
+            self._wait(0.15)
         # Scroll back to top then down again
         self.driver.execute_script("window.scrollTo(0, 0)")
-        time.sleep(2)
+        self._wait(2)
         for _ in range(40):
             self.driver.execute_script("window.scrollTo(0, window.scrollY + 500)")
-            time.sleep(0.25)
-        time.sleep(5)
+            self._wait(0.25)
+        self._wait(5)
         print("Scrolling complete")
 
     def _get_page_data(self):
         """Get page data with extended waits for SPA"""
-        self._wait_for_content()
-        self._scroll_and_wait()
-        page_data = self.driver.page_source
-        self.driver.quit()
-        return page_data
+        with self.stage('wait'):
+            self._wait_for_content()
+        with self.stage('scroll'):
+            self._scroll_and_wait()
+        return self._read_page_source()
 
     def _extract_job_title(self, job_element):
         """Extract job title - h2 anywhere in the job card"""
@@ -134,7 +131,7 @@ class WTTJ(Website):
             if href:
                 if href.startswith('http'):
                     return href
-                return 'https://www.welcometothejungle.com' + href
+                return self.base_url + href
         return None
 
     def _extract_location(self, job_element):
@@ -196,6 +193,48 @@ class WTTJ(Website):
                 return text
         return ""
 
+    def _find_job_cards(self, page_soup):
+        return page_soup.find_all('li', {'data-testid': 'jobs-results-list-list-item-wrapper'})
+
+    def _parse_job_card(self, job):
+        """Extract a job from a listing card, or None if it can't be used."""
+        job_name = self._extract_job_title(job)
+        print(f"Job: {job_name}")
+
+        job_company = self._extract_company_name(job)
+        print(f"Company: {job_company}")
+
+        job_link = self._extract_job_link(job)
+        if not job_link:
+            print("No link found, skipping")
+            return None
+        print(f"Link: {job_link}")
+
+        job_location = self._extract_location(job)
+        print(f"Location: {job_location}")
+
+        job_contract = self._extract_contract(job)
+        print(f"Contract: {job_contract}")
+
+        job_thumbnail = self._extract_thumbnail(job)
+
+        job_description = self._extract_description(job)
+        if job_description:
+            print(f"Description: {job_description[:80]}...")
+
+        description = f"{job_name} - {job_company} - {job_contract}"
+        if job_description:
+            description += f" | {job_description[:100]}"
+
+        return {
+            'name': job_name,
+            'company': job_company,
+            'location': job_location,
+            'link': job_link,
+            'thumbnail': job_thumbnail,
+            'description': description,
+        }
+
     def scrap(self):
         page = 1
         jobs_found_this_run = 0
@@ -213,6 +252,7 @@ class WTTJ(Website):
                 self._init_driver(self.page_url)
                 page_data = self._get_page_data()
             except Exception as e:
+                self.report_error(e)
                 print(f"Error loading page: {e}")
                 break
 
@@ -222,63 +262,28 @@ class WTTJ(Website):
                     f.write(page_data)
                 print("Saved debug HTML to /tmp/wttj_debug.html")
 
-            page_soup = BeautifulSoup(page_data, 'html.parser')
+            page_soup = self._parse(page_data)
 
             # Find all job listing items
-            job_items = page_soup.find_all('li', {'data-testid': 'jobs-results-list-list-item-wrapper'})
+            job_items = self._find_job_cards(page_soup)
 
             if not job_items:
                 print("No jobs found on this page")
                 break
 
             print(f"Found {len(job_items)} jobs on page {page}")
+            self.report('cards_seen', len(job_items))
 
             for i, job in enumerate(job_items):
                 try:
                     print(f"\n--- Job {i+1}/{len(job_items)} ---")
 
-                    job_name = self._extract_job_title(job)
-                    print(f"Job: {job_name}")
-
-                    job_company = self._extract_company_name(job)
-                    print(f"Company: {job_company}")
-
-                    job_link = self._extract_job_link(job)
-                    if not job_link:
-                        print("No link found, skipping")
-                        continue
-                    print(f"Link: {job_link}")
-
-                    job_location = self._extract_location(job)
-                    print(f"Location: {job_location}")
-
-                    job_contract = self._extract_contract(job)
-                    print(f"Contract: {job_contract}")
-
-                    job_thumbnail = self._extract_thumbnail(job)
-
-                    job_description = self._extract_description(job)
-                    if job_description:
-                        print(f"Description: {job_description[:80]}...")
-
-                    if not is_url_in_database(job_link):
-                        print("✓ New job!")
-                        add_url_in_database(job_link)
-
-                        embed = create_embed(job_name, job_company, job_location, job_link, job_thumbnail)
-                        description = f"{job_name} - {job_company} - {job_contract}"
-                        if job_description:
-                            description += f" | {job_description[:100]}"
-
-                        success = send_embed(embed, self, job_name, job_company, job_location, job_link, job_thumbnail, description)
-
-                        if success:
-                            jobs_found_this_run += 1
-                        time.sleep(4)
-                    else:
-                        print("✗ Already in database")
+                    job_data = self._parse_job_card(job)
+                    if job_data and self._handle_job(job_data):
+                        jobs_found_this_run += 1
 
                 except Exception as e:
+                    self.report_error(e)
                     print(f"Error processing job: {e}")
                     import traceback
                     traceback.print_exc()
@@ -293,6 +298,8 @@ class WTTJ(Website):
                     has_next = True
 
             print(f'WTTJ page #{page} finished - New jobs this run: {jobs_found_this_run}')
+            if not self.crawl_next_page():
+                break
             
             if not has_next:
                 print("No more pages")